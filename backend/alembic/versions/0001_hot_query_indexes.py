@@ -0,0 +1,63 @@
+"""Composite indexes for the hot CRUD queries
+
+Revision ID: 0001_hot_query_indexes
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_hot_query_indexes"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, MySQL prefix lengths for TEXT columns)
+INDEXES = [
+    # Latest calling status per (repayment, calling type, contact type)
+    ("ix_calling_repayment_type_contact_created", "calling",
+     ["repayment_id", "Calling_id", "contact_type", "created_at"], {"repayment_id": 32}),
+    # Comments of one type per repayment, newest first
+    ("ix_comments_repayment_type_commented_at", "comments",
+     ["repayment_id", "comment_type", "commented_at"], {"repayment_id": 32}),
+    # Per-loan lookups and EMI month (demand_date range) filters
+    ("ix_payment_details_loan_demand_date", "payment_details",
+     ["loan_application_id", "demand_date"], None),
+    # Status lists (e.g. paid pending) ordered by demand_date
+    ("ix_payment_details_status_demand_date", "payment_details",
+     ["repayment_status_id", "demand_date"], None),
+    # PTP date filters and the plan vs achievement report
+    ("ix_payment_details_ptp_date", "payment_details",
+     ["ptp_date"], None),
+    # Monthly summaries: month filter plus per-status count
+    ("ix_payment_details_year_month_status", "payment_details",
+     ["demand_year", "demand_month", "repayment_status_id"], None),
+    # Payment history since a moment (plan vs achievement report)
+    ("ix_audit_payment_details_application_changed_at", "audit_payment_details",
+     ["application_id", "changed_at"], {"application_id": 32}),
+    ("ix_audit_payment_details_changed_at", "audit_payment_details",
+     ["changed_at"], None),
+]
+
+# Declared on PaymentDetails since the EMI month range filter; InnoDB may use it for
+# the loan_application_id foreign key, so downgrade leaves it in place
+KEEP_ON_DOWNGRADE = {"ix_payment_details_loan_demand_date"}
+
+def _has_index(table, name, offline_default):
+    if op.get_context().as_sql:
+        return offline_default  # Offline (--sql) mode cannot inspect the database
+    return any(index["name"] == name for index in sa.inspect(op.get_bind()).get_indexes(table))
+
+def upgrade():
+    for name, table, columns, prefix_lengths in INDEXES:
+        if _has_index(table, name, offline_default=False):
+            continue  # Already created by init_db from the model declaration
+        kwargs = {"mysql_length": prefix_lengths} if prefix_lengths else {}
+        op.create_index(name, table, columns, **kwargs)
+
+def downgrade():
+    for name, table, columns, prefix_lengths in reversed(INDEXES):
+        if name in KEEP_ON_DOWNGRADE:
+            continue
+        if _has_index(table, name, offline_default=True):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,84 @@
+"""Integer payment_id foreign keys next to the text repayment_id columns
+
+Revision ID: 0002_payment_id_keys
+Revises: 0001_hot_query_indexes
+Create Date: 2026-10-17
+
+Expand step of the repayment_id -> payment_id move. The new columns are nullable, so
+MySQL adds them instantly, and the indexes are built in place without blocking writes.
+The foreign keys are added with foreign_key_checks off: the columns are still empty,
+so there is nothing to validate, and MySQL can then skip copying the table.
+The app dual-writes both columns from this release on; existing rows are filled by
+`python -m app.db.backfill_payment_id_keys`, after which READ_PAYMENT_ID_KEYS=true
+switches reads over. The text columns are dropped in a later migration.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_payment_id_keys"
+down_revision = "0001_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+TABLES = ["calling", "comments", "co_applicant", "guarantor", "reference"]
+
+# (index name, table, columns) for the hot lookups, mirroring the repayment_id ones
+INDEXES = [
+    ("ix_calling_payment_type_contact_created", "calling",
+     ["payment_id", "Calling_id", "contact_type", "created_at"]),
+    ("ix_comments_payment_type_commented_at", "comments",
+     ["payment_id", "comment_type", "commented_at"]),
+]
+
+def _is_mysql():
+    return op.get_context().dialect.name == "mysql"
+
+def _inspector():
+    # Offline (--sql) mode cannot inspect the database and emits everything
+    return None if op.get_context().as_sql else sa.inspect(op.get_bind())
+
+def upgrade():
+    inspector = _inspector()
+
+    # Tables created by init_db from the current models already have the column,
+    # its index and its foreign key
+    tables = [
+        table for table in TABLES
+        if inspector is None or "payment_id" not in {column["name"] for column in inspector.get_columns(table)}
+    ]
+    if not tables:
+        return
+
+    for table in tables:
+        op.add_column(table, sa.Column("payment_id", sa.Integer(), nullable=True))
+
+    for name, table, columns in INDEXES:
+        if table in tables:
+            op.create_index(name, table, columns)
+
+    if _is_mysql():
+        op.execute("SET foreign_key_checks = 0")
+    for table in tables:
+        op.create_foreign_key(
+            f"fk_{table}_payment_id", table, "payment_details",
+            ["payment_id"], ["id"], ondelete="SET NULL"
+        )
+    if _is_mysql():
+        op.execute("SET foreign_key_checks = 1")
+
+def downgrade():
+    inspector = _inspector()
+    for table in TABLES:
+        if inspector is not None:
+            foreign_keys = [
+                foreign_key["name"] for foreign_key in inspector.get_foreign_keys(table)
+                if foreign_key["constrained_columns"] == ["payment_id"]
+            ]
+        else:
+            foreign_keys = [f"fk_{table}_payment_id"]
+        for foreign_key in foreign_keys:
+            op.drop_constraint(foreign_key, table, type_="foreignkey")
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    for table in TABLES:
+        op.drop_column(table, "payment_id")
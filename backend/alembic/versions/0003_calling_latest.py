@@ -0,0 +1,33 @@
+"""calling_latest projection of the latest call per payment, calling type and contact type
+
+Revision ID: 0003_calling_latest
+Revises: 0002_payment_id_keys
+Create Date: 2026-10-17
+
+Fill it afterwards with `python -m app.db.backfill_calling_latest`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_calling_latest"
+down_revision = "0002_payment_id_keys"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("calling_latest"):
+        return  # Already created by init_db
+
+    op.create_table(
+        "calling_latest",
+        sa.Column("payment_id", sa.Integer(), sa.ForeignKey("payment_details.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("Calling_id", sa.Integer(), primary_key=True),
+        sa.Column("contact_type", sa.Integer(), primary_key=True),
+        sa.Column("calling_row_id", sa.Integer(), nullable=False),
+        sa.Column("status_id", sa.Integer()),
+        sa.Column("called_at", sa.TIMESTAMP()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now())
+    )
+
+def downgrade():
+    op.drop_table("calling_latest")
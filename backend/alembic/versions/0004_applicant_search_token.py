@@ -0,0 +1,32 @@
+"""applicant_search_token index of applicant name, applicant_id, loan id and mobile tokens
+
+Revision ID: 0004_applicant_search_token
+Revises: 0003_calling_latest
+Create Date: 2026-10-17
+
+Fill it afterwards with `python -m app.db.rebuild_applicant_search`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_applicant_search_token"
+down_revision = "0003_calling_latest"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("applicant_search_token"):
+        return  # Already created by init_db
+
+    op.create_table(
+        "applicant_search_token",
+        sa.Column("token", sa.String(64), primary_key=True),
+        sa.Column(
+            "loan_application_id", sa.Integer(),
+            sa.ForeignKey("loan_details.loan_application_id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("weight", sa.Integer(), nullable=False)
+    )
+
+def downgrade():
+    op.drop_table("applicant_search_token")
@@ -0,0 +1,34 @@
+"""phone_directory of normalized mobile numbers of applicants, co-applicants, guarantors and references
+
+Revision ID: 0005_phone_directory
+Revises: 0004_applicant_search_token
+Create Date: 2026-10-17
+
+Fill it afterwards with `python -m app.db.rebuild_phone_directory`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_phone_directory"
+down_revision = "0004_applicant_search_token"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("phone_directory"):
+        return  # Already created by init_db
+
+    op.create_table(
+        "phone_directory",
+        sa.Column("phone", sa.String(15), primary_key=True),
+        sa.Column(
+            "loan_application_id", sa.Integer(),
+            sa.ForeignKey("loan_details.loan_application_id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("contact_type", sa.Integer(), primary_key=True),
+        sa.Column("contact_id", sa.Integer(), primary_key=True)
+    )
+    op.create_index("ix_phone_directory_loan_application_id", "phone_directory", ["loan_application_id"])
+
+def downgrade():
+    op.drop_table("phone_directory")
@@ -0,0 +1,36 @@
+"""loan_current_demand pointer from each loan to its latest payment_details row
+
+Revision ID: 0006_loan_current_demand
+Revises: 0005_phone_directory
+Create Date: 2026-10-17
+
+Fill it afterwards with `python -m app.db.backfill_loan_current_demand`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_loan_current_demand"
+down_revision = "0005_phone_directory"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("loan_current_demand"):
+        return  # Already created by init_db
+
+    op.create_table(
+        "loan_current_demand",
+        sa.Column(
+            "loan_application_id", sa.Integer(),
+            sa.ForeignKey("loan_details.loan_application_id"), primary_key=True
+        ),
+        sa.Column(
+            "payment_id", sa.Integer(),
+            sa.ForeignKey("payment_details.id", ondelete="CASCADE"), nullable=False, unique=True
+        ),
+        sa.Column("demand_date", sa.DATE()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now())
+    )
+
+def downgrade():
+    op.drop_table("loan_current_demand")
@@ -0,0 +1,36 @@
+"""collection_summary_snapshot of payment_details counts and amounts per month and dimension
+
+Revision ID: 0007_collection_summary_snapshot
+Revises: 0006_loan_current_demand
+Create Date: 2026-10-17
+
+Fill it afterwards with `python -m app.db.rebuild_collection_summary_snapshot`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_collection_summary_snapshot"
+down_revision = "0006_loan_current_demand"
+branch_labels = None
+depends_on = None
+
+# Missing dimension ids are stored as 0, so every slice column is part of the key
+KEY_COLUMNS = [
+    "demand_year", "demand_month", "branch_id", "dealer_id", "lender_id", "rm_id", "tl_id", "repayment_status_id"
+]
+
+def upgrade():
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("collection_summary_snapshot"):
+        return  # Already created by init_db
+
+    op.create_table(
+        "collection_summary_snapshot",
+        *[sa.Column(column, sa.Integer(), primary_key=True, autoincrement=False) for column in KEY_COLUMNS],
+        sa.Column("payment_count", sa.Integer(), nullable=False),
+        sa.Column("demand_amount", sa.DECIMAL(14, 2), nullable=False),
+        sa.Column("amount_collected", sa.DECIMAL(14, 2), nullable=False),
+        sa.Column("refreshed_at", sa.TIMESTAMP(), server_default=sa.func.now())
+    )
+
+def downgrade():
+    op.drop_table("collection_summary_snapshot")
@@ -0,0 +1,35 @@
+"""audit_outbox of payment_details changes waiting to be moved to audit_payment_details
+
+Revision ID: 0008_audit_outbox
+Revises: 0007_collection_summary_snapshot
+Create Date: 2026-10-17
+
+Drain it by hand with `python -m app.db.flush_audit_outbox` before downgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_audit_outbox"
+down_revision = "0007_collection_summary_snapshot"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("audit_outbox"):
+        return  # Already created by init_db
+
+    op.create_table(
+        "audit_outbox",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("application_id", sa.Text()),
+        sa.Column("changed_by_user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        # Same member names as audit_payment_details.action (AuditActionEnum)
+        sa.Column("action", sa.Enum("insert", "update", "delete", name="auditactionenum")),
+        sa.Column("old_data", sa.JSON()),
+        sa.Column("new_data", sa.JSON()),
+        sa.Column("changed_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now())
+    )
+
+def downgrade():
+    op.drop_table("audit_outbox")
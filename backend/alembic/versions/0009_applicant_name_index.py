@@ -0,0 +1,28 @@
+"""Index on applicant_details(first_name, last_name) for the applications list keyset
+
+Revision ID: 0009_applicant_name_index
+Revises: 0008_audit_outbox
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_applicant_name_index"
+down_revision = "0008_audit_outbox"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_applicant_details_name"
+
+def _has_index(offline_default):
+    if op.get_context().as_sql:
+        return offline_default  # Offline (--sql) mode cannot inspect the database
+    return any(index["name"] == INDEX_NAME for index in sa.inspect(op.get_bind()).get_indexes("applicant_details"))
+
+def upgrade():
+    if not _has_index(offline_default=False):
+        op.create_index(INDEX_NAME, "applicant_details", ["first_name", "last_name"])
+
+def downgrade():
+    if _has_index(offline_default=True):
+        op.drop_index(INDEX_NAME, table_name="applicant_details")
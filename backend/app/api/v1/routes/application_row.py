@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.deps import get_db, get_current_user
+from app.core.deps import get_read_db, run_db, get_current_user
+from app.db.session import SessionLocal
 from app.schemas.application_row import AppplicationFilterResponse
-from app.crud.application_row import get_filtered_applications
+from app.crud.application_row import get_filtered_applications, build_applications_query, iter_application_items
+from app.crud.application_bundle import get_application_bundle, parse_bundle_sections
+from app.schemas.comments import CommentTypeEnum
+from app.services.export import iter_applications_csv, write_applications_xlsx
+from datetime import date
+import tempfile
 
 router = APIRouter()
 
 @router.get("/", response_model=AppplicationFilterResponse)
-def filter_applications(
+async def filter_applications(
     loan_id: str = Query("", description="Filter by specific loan ID"),  # 🎯 ADDED! Filter by loan_id
     emi_month: str = Query("", description="EMI month in format 'Jul-25'"),
-    search: str = Query("", description="Search in applicant name or application ID"),
+    search: str = Query("", description="Search by prefix of applicant name, applicant ID, loan ID or mobile"),
     branch: str = Query("", description="Filter by branch name"),
     dealer: str = Query("", description="Filter by dealer name"),
     lender: str = Query("", description="Filter by lender name"),
@@ -22,7 +29,10 @@ def filter_applications(
     demand_num: str = Query("", description="Filter by demand number"),  # 🎯 ADDED! Filter by demand_num
     offset: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=1000, description="Maximum number of records to return"),
-    db: Session = Depends(get_db),
+    cursor: str = Query("", description="Keyset cursor (next_cursor from the previous page); when set, offset is ignored"),
+    include_total: bool = Query(True, description="Set to false to skip counting the total number of matches"),
+    search_order: str = Query("name", pattern="^(name|relevance)$", description="Order of search results: 'name' or 'relevance' (best matches first; offset paging only; name order until the search index is enabled)"),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -35,10 +45,94 @@ def filter_applications(
     - Status, RM, Team Lead
     - PTP date categories
     - Demand number
+    
+    Pagination:
+    - offset/limit for classic paging
+    - cursor/limit for keyset paging, where every page costs the same as the first
+    """
+    try:
+        return await run_db(
+            db,
+            get_filtered_applications,
+            loan_id=loan_id,  # 🎯 ADDED! Pass loan_id parameter
+            emi_month=emi_month,
+            search=search,
+            branch=branch,
+            dealer=dealer,
+            lender=lender,
+            status=status,
+            rm_name=rm_name,
+            tl_name=tl_name,
+            ptp_date_filter=ptp_date_filter,
+            repayment_id=repayment_id,  # 🎯 ADDED! Pass repayment_id parameter
+            demand_num=demand_num,  # 🎯 ADDED! Pass demand_num parameter
+            offset=offset,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total,
+            search_order=search_order
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid data: {str(e)}")
+
+@router.get("/{loan_id}/bundle")
+async def get_application_bundle_route(
+    loan_id: str,
+    repayment_id: str = Query("", description="Repayment ID (payment details ID) of the selected month; defaults to the current month"),
+    sections: str = Query("", description="Comma separated sections to return: contacts, months, status, comments, comment_counts (default: all)"),
+    comment_type: CommentTypeEnum = Query(CommentTypeEnum.application_details, description="Comment type for the comments section: 1 for application details, 2 for paid pending"),
+    comment_limit: int = Query(100, ge=1, le=1000, description="Maximum number of comments to return"),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Everything the application details panel needs for a loan in one response, instead of
+    separate contacts, month dropdown, status, comments and comment count requests.
+    """
+    try:
+        bundle = await run_db(
+            db,
+            get_application_bundle,
+            loan_id,
+            repayment_id=repayment_id,
+            sections=parse_bundle_sections(sections),
+            comment_type=comment_type,
+            comment_limit=comment_limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid data: {str(e)}")
+    
+    if bundle is None:
+        raise HTTPException(status_code=404, detail=f"Loan not found for loan_id: {loan_id}")
+    return bundle
+
+@router.get("/export")
+def export_applications(
+    loan_id: str = Query("", description="Filter by specific loan ID"),
+    emi_month: str = Query("", description="EMI month in format 'Jul-25'"),
+    search: str = Query("", description="Search by prefix of applicant name, applicant ID, loan ID or mobile"),
+    branch: str = Query("", description="Filter by branch name"),
+    dealer: str = Query("", description="Filter by dealer name"),
+    lender: str = Query("", description="Filter by lender name"),
+    status: str = Query("", description="Filter by repayment status"),
+    rm_name: str = Query("", description="Filter by RM name"),
+    tl_name: str = Query("", description="Filter by Team Lead name"),
+    ptp_date_filter: str = Query("", description="Filter by PTP date: 'overdue', 'today', 'tomorrow', 'future', 'no_ptp'"),
+    repayment_id: str = Query("", description="Filter by repayment ID (payment details ID)"),
+    demand_num: str = Query("", description="Filter by demand number"),
+    format: str = Query("csv", pattern="^(csv|xlsx)$", description="Export format: 'csv' or 'xlsx'"),
+    batch_size: int = Query(1000, ge=100, le=5000, description="Rows fetched and enriched per batch"),
+    current_user: dict = Depends(get_current_user)
+):
     """
-    return get_filtered_applications(
-        db=db,
-        loan_id=loan_id,  # 🎯 ADDED! Pass loan_id parameter
+    Export every application matching the same filters as the list endpoint.
+    
+    Rows are streamed from a server-side cursor and enriched in batches, so memory
+    stays flat regardless of row count. The sessions are opened here rather than via
+    get_db because they must stay open until the response body has been fully sent.
+    """
+    filters = dict(
+        loan_id=loan_id,
         emi_month=emi_month,
         search=search,
         branch=branch,
@@ -48,8 +142,53 @@ def filter_applications(
         rm_name=rm_name,
         tl_name=tl_name,
         ptp_date_filter=ptp_date_filter,
-        repayment_id=repayment_id,  # 🎯 ADDED! Pass repayment_id parameter
-        demand_num=demand_num,  # 🎯 ADDED! Pass demand_num parameter
-        offset=offset,
-        limit=limit
-    )
\ No newline at end of file
+        repayment_id=repayment_id,
+        demand_num=demand_num
+    )
+    
+    if format == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=400, detail="XLSX export requires openpyxl to be installed; use format=csv")
+    
+    db = SessionLocal()
+    enrich_db = SessionLocal()
+    
+    # Validate filters before the response starts; errors can't be reported mid-stream
+    try:
+        build_applications_query(db, **filters)
+    except ValueError as e:
+        db.close()
+        enrich_db.close()
+        raise HTTPException(status_code=400, detail=f"Invalid data: {str(e)}")
+    
+    def generate():
+        try:
+            items = iter_application_items(db, enrich_db, batch_size=batch_size, **filters)
+            if format == "csv":
+                yield from iter_applications_csv(items)
+            else:
+                # XLSX is a zip archive, so it is built in a temp file and then streamed
+                with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as workbook_file:
+                    write_applications_xlsx(items, workbook_file)
+                    workbook_file.seek(0)
+                    while True:
+                        chunk = workbook_file.read(64 * 1024)
+                        if not chunk:
+                            break
+                        yield chunk
+        finally:
+            db.close()
+            enrich_db.close()
+    
+    media_types = {
+        "csv": "text/csv",
+        "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    }
+    filename = f"applications_{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        generate(),
+        media_type=media_types[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
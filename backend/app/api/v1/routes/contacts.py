@@ -1,19 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy.orm import Session
-from app.core.deps import get_db, get_current_user
-from app.models.co_applicant import CoApplicant
-from app.models.guarantor import Guarantor
-from app.models.reference import Reference
-from app.models.applicant_details import ApplicantDetails
-from app.models.loan_details import LoanDetails
-from typing import Dict, Any
+from typing import List
+from app.core.deps import get_read_db, run_db, get_current_user
+from app.crud.contacts import get_application_contacts, get_application_contacts_batch, find_contacts_by_phone
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+@router.get("/")
+async def get_application_contacts_batch_route(
+    loan_id: List[int] = Query(..., description="Loan IDs to get contacts for (repeat the parameter, up to 200)"),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the contacts of many applications at once, keyed by loan ID"""
+    try:
+        contacts = await run_db(db, get_application_contacts_batch, loan_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid data: {str(e)}")
+    
+    return {
+        "contacts": contacts,
+        "not_found": sorted(set(loan_id) - set(contacts))  # Loans without an applicant
+    }
+
+@router.get("/by-phone/{phone}")
+async def find_contacts_by_phone_route(
+    phone: str = Path(..., max_length=32, description="Mobile number, with or without country code and separators"),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Find the loans whose applicant, co-applicant, guarantor or reference has this mobile number"""
+    try:
+        return await run_db(db, find_contacts_by_phone, phone)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid data: {str(e)}")
+
 @router.get("/{loan_id}")
-def get_application_contacts(
+async def get_application_contacts_route(
     loan_id: str = Path(..., description="The loan ID to get contacts for"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Get all contacts (applicant, co-applicants, guarantors, references) for an application"""
@@ -24,102 +52,18 @@ def get_application_contacts(
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid loan_id: {loan_id}. Must be a valid integer.")
         
-        # Get main applicant details
-        applicant = db.query(ApplicantDetails).join(
-            LoanDetails, ApplicantDetails.applicant_id == LoanDetails.applicant_id
-        ).filter(
-            LoanDetails.loan_application_id == loan_id_int
-        ).first()
+        response = await run_db(db, get_application_contacts, loan_id_int)
         
-        if not applicant:
+        if not response:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Applicant not found for loan_id: {loan_id_int}"
             )
         
-        # Get co-applicants - these definitely exist in the database
-        co_applicants = db.query(CoApplicant).filter(
-            CoApplicant.loan_application_id == loan_id_int
-        ).all()
-        
-        # Get guarantors - these definitely exist in the database
-        guarantors = db.query(Guarantor).filter(
-            Guarantor.loan_application_id == loan_id_int
-        ).all()
-        
-        # Get references - now using the correct Reference model
-        references = db.query(Reference).filter(
-            Reference.loan_application_id == loan_id_int
-        ).all()
-        
-        # Helper function to extract contact info based on actual database structure
-        def extract_contact_info(contact, contact_type):
-            try:
-                # Based on DDL, we have first_name, middle_name, last_name, mobile
-                name_parts = []
-                
-                if hasattr(contact, 'first_name') and contact.first_name:
-                    name_parts.append(contact.first_name)
-                if hasattr(contact, 'middle_name') and contact.middle_name:
-                    name_parts.append(contact.middle_name)
-                if hasattr(contact, 'last_name') and contact.last_name:
-                    name_parts.append(contact.last_name)
-                
-                name = " ".join(name_parts) if name_parts else "Unknown Name"
-                
-                # Get mobile (this is the correct column name from DDL)
-                mobile = getattr(contact, 'mobile', None)
-                
-                # Try to get email from different possible columns
-                email = None
-                for email_col in ['email', 'email_id']:
-                    if hasattr(contact, email_col):
-                        email_val = getattr(contact, email_col)
-                        if email_val:
-                            email = email_val
-                            break
-                
-                return {
-                    "id": getattr(contact, 'id', None),
-                    "name": name,
-                    "phone": mobile,  # Use mobile from DDL
-                    "email": email,
-                    "type": contact_type
-                }
-            except Exception as e:
-                print(f"Error extracting contact info for {contact_type}: {e}")
-                return {
-                    "id": None,
-                    "name": "Unknown",
-                    "phone": None,
-                    "email": None,
-                    "type": contact_type
-                }
-        
-        # Build response with actual data
-        response = {
-            "loan_id": loan_id_int,
-            "applicant": {
-                "id": applicant.applicant_id,
-                "name": f"{applicant.first_name or ''} {applicant.last_name or ''}".strip(),
-                "phone": getattr(applicant, 'mobile', None) or getattr(applicant, 'phone', None),
-                "email": getattr(applicant, 'email', None),
-                "type": "applicant"
-            },
-            "co_applicants": [extract_contact_info(co, "co_applicant") for co in co_applicants],
-            "guarantors": [extract_contact_info(gu, "guarantor") for gu in guarantors],
-            "references": [extract_contact_info(ref, "reference") for ref in references]
-        }
-        
-        # Debug logging
-        print(f"🔍 Contacts API Debug for loan_id {loan_id_int}:")
-        print(f"   - Applicant: {response['applicant']['name']}")
-        print(f"   - Co-applicants found: {len(co_applicants)}")
-        print(f"   - Guarantors found: {len(guarantors)}")
-        print(f"   - References found: {len(references)}")
-        
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in get_application_contacts: {e}")
+        logger.exception("Failed to get contacts for loan_id %s", loan_id)
         raise HTTPException(status_code=400, detail=f"Failed to get contacts: {str(e)}")
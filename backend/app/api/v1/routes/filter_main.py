@@ -1,14 +1,32 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.core.deps import get_db, get_current_user
+from app.core.deps import get_read_db, run_db, get_current_user, require_admin
 from app.schemas.filters_main import FiltersOptionsResponse
-from app.crud.filter_main import filter_options
+from app.crud.filter_main import filter_options, invalidate_filter_options_cache, filter_options_cache_stats
 
 router = APIRouter()
 
 @router.get("/options", response_model=FiltersOptionsResponse)
-def get_filter_options(
-    db: Session = Depends(get_db),
+async def get_filter_options(
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
-    return filter_options(db)
\ No newline at end of file
+    return await run_db(db, filter_options)
+
+@router.get("/options/cache")
+def get_filter_options_cache_stats(
+    current_user: dict = Depends(require_admin)
+):
+    """Get filter options cache hit/miss counters (Admin only)"""
+    return filter_options_cache_stats()
+
+@router.post("/options/cache/invalidate")
+def invalidate_filter_options(
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Drop the cached filter options (Admin only).
+    Use after branches, dealers or lenders are changed directly in the database.
+    """
+    invalidate_filter_options_cache()
+    return {"message": "Filter options cache invalidated"}
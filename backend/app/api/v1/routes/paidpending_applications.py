@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.core.deps import get_db, require_admin
 from app.schemas.paidpending_applications import PaidPendingApplicationsResponse
 from app.crud.paidpending_applications import get_paid_pending_applications
@@ -10,6 +11,12 @@ router = APIRouter()
 def get_paid_pending_applications_list(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    branch: str = Query("", description="Filter by branch name"),
+    rm_name: str = Query("", description="Filter by RM name"),
+    emi_month: str = Query("", description="EMI month in format 'Jul-25'"),
+    cursor: str = Query("", description="Keyset cursor (next_cursor from the previous page); when set, skip is ignored"),
+    include_total: bool = Query(True, description="Set to false to skip counting the total number of matches"),
+    max_comments: Optional[int] = Query(None, ge=1, le=100, description="Newest paid pending comments returned per application (default: all)"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
@@ -20,15 +27,19 @@ def get_paid_pending_applications_list(
     Only shows comments with comment_type = 2 (paid pending comments).
     """
     try:
-        results = get_paid_pending_applications(db, skip, limit)
-        
-        # Count total for pagination
-        total = len(results) if len(results) < limit else limit * 10  # Approximate total
-        
-        return PaidPendingApplicationsResponse(
-            total=total,
-            results=results
+        return get_paid_pending_applications(
+            db,
+            skip=skip,
+            limit=limit,
+            branch=branch,
+            rm_name=rm_name,
+            emi_month=emi_month,
+            cursor=cursor,
+            include_total=include_total,
+            max_comments=max_comments
         )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid data: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get paid pending applications: {str(e)}")
@@ -1,87 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.core.deps import get_db, require_admin
-from app.schemas.paidpending_approval import PaidPendingApprovalRequest, PaidPendingApprovalResponse
-from app.crud.paidpending_approval import process_paidpending_approval
+from app.schemas.paidpending_approval import (
+    PaidPendingApprovalRequest,
+    PaidPendingApprovalResponse,
+    PaidPendingBulkApprovalRequest,
+    PaidPendingBulkApprovalResponse
+)
+from app.schemas.paidpending_applications import PaidPendingApplicationsResponse
+from app.crud.paidpending_approval import process_paidpending_approval, bulk_process_paidpending_approval
+from app.crud.paidpending_applications import get_paid_pending_applications
+from app.services.audit import set_audit_user
 from app.models.payment_details import PaymentDetails
-from app.models.repayment_status import RepaymentStatus
+from app.crud.lookups import lookups
 from app.models.loan_details import LoanDetails
 from app.models.applicant_details import ApplicantDetails
 from sqlalchemy import and_
 
 router = APIRouter()
 
-@router.get("/")
+@router.get("/", response_model=PaidPendingApplicationsResponse)
 def get_paidpending_applications_list(
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    branch: str = Query("", description="Filter by branch name"),
+    rm_name: str = Query("", description="Filter by RM name"),
+    emi_month: str = Query("", description="EMI month in format 'Jul-25'"),
+    cursor: str = Query("", description="Keyset cursor (next_cursor from the previous page); when set, skip is ignored"),
+    include_total: bool = Query(True, description="Set to false to skip counting the total number of matches"),
+    max_comments: Optional[int] = Query(None, ge=1, le=100, description="Newest paid pending comments returned per application (default: all)"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """
-    Get all applications currently in "Paid(Pending Approval)" status
+    Get applications currently in "Paid(Pending Approval)" status, newest demand first.
     
-    Shows:
-    - Loan ID
-    - Applicant details
-    - Current status
-    - Amount collected
-    - PTP date
-    - Demand date
+    Same listing as GET /paidpending-applications/: one joined query per page,
+    with classic skip/limit or keyset (cursor) paging.
     """
     try:
-        # Get the "Paid(Pending Approval)" status ID
-        paid_pending_status = db.query(RepaymentStatus).filter(
-            RepaymentStatus.repayment_status == "Paid(Pending Approval)"
-        ).first()
-        
-        if not paid_pending_status:
-            return {"message": "No 'Paid(Pending Approval)' status found", "applications": []}
-        
-        # Get all payment details with this status
-        payment_records = db.query(PaymentDetails).filter(
-            PaymentDetails.repayment_status_id == paid_pending_status.id
-        ).all()
-        
-        applications = []
-        
-        for payment in payment_records:
-            # Get loan details
-            loan = db.query(LoanDetails).filter(
-                LoanDetails.loan_application_id == payment.loan_application_id
-            ).first()
-            
-            if loan:
-                # Get applicant details
-                applicant = db.query(ApplicantDetails).filter(
-                    ApplicantDetails.applicant_id == loan.applicant_id
-                ).first()
-                
-                # Get current status name
-                current_status = db.query(RepaymentStatus).filter(
-                    RepaymentStatus.id == payment.repayment_status_id
-                ).first()
-                
-                application_data = {
-                    "loan_id": payment.loan_application_id,
-                    "repayment_id": str(payment.id),  # 🎯 ADDED! Repayment ID
-                    "applicant_id": loan.applicant_id,
-                    "applicant_name": f"{applicant.first_name or ''} {applicant.last_name or ''}".strip() if applicant else "Unknown",
-                    "current_status": current_status.repayment_status if current_status else "Unknown",
-                    "amount_collected": float(payment.amount_collected) if payment.amount_collected else 0,
-                    "ptp_date": payment.ptp_date.isoformat() if payment.ptp_date else None,
-                    "demand_date": payment.demand_date.isoformat() if payment.demand_date else None,
-                    "demand_amount": float(payment.demand_amount) if payment.demand_amount else 0,
-                    "payment_date": payment.payment_date.isoformat() if payment.payment_date else None,
-                    "updated_at": payment.updated_at.isoformat() if payment.updated_at else None
-                }
-                
-                applications.append(application_data)
-        
-        return {
-            "total_applications": len(applications),
-            "status": "Paid(Pending Approval)",
-            "applications": applications
-        }
+        return get_paid_pending_applications(
+            db,
+            skip=skip,
+            limit=limit,
+            branch=branch,
+            rm_name=rm_name,
+            emi_month=emi_month,
+            cursor=cursor,
+            include_total=include_total,
+            max_comments=max_comments
+        )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid data: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get paid pending applications: {str(e)}")
 
@@ -120,14 +92,10 @@ def get_paidpending_application_status(
             )
         
         # Get current status name
-        current_status = db.query(RepaymentStatus).filter(
-            RepaymentStatus.id == payment_record.repayment_status_id
-        ).first()
+        current_status = lookups.name(db, "repayment_status", payment_record.repayment_status_id)
         
         # Check if it's in "Paid(Pending Approval)" status
-        is_paid_pending = False
-        if current_status:
-            is_paid_pending = current_status.repayment_status == "Paid(Pending Approval)"
+        is_paid_pending = current_status == "Paid(Pending Approval)"
         
         # Get loan and applicant details
         loan = db.query(LoanDetails).filter(
@@ -145,7 +113,7 @@ def get_paidpending_application_status(
             "repayment_id": str(payment_record.id),  # 🎯 ADDED! Repayment ID
             "applicant_id": loan.applicant_id if loan else None,
             "applicant_name": f"{applicant.first_name or ''} {applicant.last_name or ''}".strip() if applicant else "Unknown",
-            "current_status": current_status.repayment_status if current_status else "Unknown",
+            "current_status": current_status or "Unknown",
             "status_id": payment_record.repayment_status_id,
             "is_paid_pending": is_paid_pending,
             "amount_collected": float(payment_record.amount_collected) if payment_record.amount_collected else 0,
@@ -177,6 +145,7 @@ def approve_reject_paidpending(
        - If no amount → Status becomes "Paid Rejected"
     """
     try:
+        set_audit_user(db, current_user["id"])  # Recorded as changed_by in the audit trail
         result = process_paidpending_approval(db=db, approval_data=approval_data)
         return result
         
@@ -184,3 +153,25 @@ def approve_reject_paidpending(
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process approval: {str(e)}")
+
+
+@router.post("/approve/bulk", response_model=PaidPendingBulkApprovalResponse)
+def bulk_approve_reject_paidpending(
+    bulk_request: PaidPendingBulkApprovalRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Accept or reject many paidpending payments in one transaction, with the same
+    transitions as /approve. Returns an outcome per item; items that are not
+    currently 'Paid(Pending Approval)' are reported and left unchanged.
+    """
+    try:
+        set_audit_user(db, current_user["id"])  # Recorded as changed_by in the audit trail
+        return bulk_process_paidpending_approval(db=db, items=bulk_request.items)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to process approvals: {str(e)}")
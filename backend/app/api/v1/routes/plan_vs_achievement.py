@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.core.deps import get_current_user
+from app.db.session import SessionLocal
+from app.crud.plan_vs_achievement import iter_plan_vs_achievement, to_local_naive, PLAN_VS_ACHIEVEMENT_COLUMNS
+from app.services.export import iter_csv, iter_json_lines
+from datetime import datetime
+from typing import Optional
+
+router = APIRouter()
+
+@router.get("/plan-vs-achievement")
+def plan_vs_achievement_report(
+    planned_at: datetime = Query(..., description="When the plan was taken, e.g. 2025-07-15T09:00:00; its date is the planned PTP date"),
+    until: Optional[datetime] = Query(None, description="When achievement is measured (default: now)"),
+    format: str = Query("jsonl", pattern="^(jsonl|csv)$", description="Report format: 'jsonl' or 'csv'"),
+    batch_size: int = Query(500, ge=50, le=2000, description="Payments enriched per batch"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Plan vs achievement across all branches: every payment whose PTP date at `planned_at`
+    was that day, with its PTP date and status then and at `until`, the calls and comment
+    trail in between, and applicant, co-applicant, guarantor and reference details.
+    """
+    # Everything that can fail is checked before the streamed response sends its headers
+    planned_at = to_local_naive(planned_at)
+    until = to_local_naive(until) if until is not None else datetime.now()
+    if until < planned_at:
+        raise HTTPException(status_code=400, detail="Invalid data: until must not be earlier than planned_at")
+
+    # The session must stay open until the response body has been fully sent
+    db = SessionLocal()
+
+    def generate():
+        try:
+            items = iter_plan_vs_achievement(db, planned_at, until, batch_size=batch_size)
+            if format == "csv":
+                yield from iter_csv(items, PLAN_VS_ACHIEVEMENT_COLUMNS)
+            else:
+                yield from iter_json_lines(items)
+        finally:
+            db.close()
+
+    media_types = {
+        "jsonl": "application/x-ndjson",
+        "csv": "text/csv"
+    }
+    filename = f"plan_vs_achievement_{planned_at.date().isoformat()}.{format}"
+    return StreamingResponse(
+        generate(),
+        media_type=media_types[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.core.deps import get_db, get_current_user
-from app.schemas.status_management import StatusManagementUpdate, StatusManagementResponse
-from app.crud.status_management import update_status_management
+from app.schemas.status_management import (
+    StatusManagementUpdate,
+    StatusManagementResponse,
+    StatusManagementBulkRequest,
+    StatusManagementBulkResponse
+)
+from app.crud.status_management import update_status_management, bulk_update_status_management, get_payment_status
+from app.services.audit import set_audit_user
 from app.models.payment_details import PaymentDetails
-from app.models.repayment_status import RepaymentStatus
-from app.models.demand_calling import DemandCalling
-from app.models.contact_calling import ContactCalling
-from app.models.calling import Calling
 from sqlalchemy import and_
 from typing import Optional
 
@@ -33,6 +35,8 @@ def update_application_status(
     Only the fields provided will be updated.
     """
     try:
+        set_audit_user(db, current_user["id"])  # Recorded as changed_by in the audit trail
+        
         # Update status management
         result = update_status_management(
             db=db,
@@ -47,6 +51,31 @@ def update_application_status(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to update status: {str(e)}")
 
+@router.post("/bulk", response_model=StatusManagementBulkResponse)
+def bulk_update_application_status(
+    bulk_update: StatusManagementBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Apply a batch of status management updates (same fields as the single PUT) in one
+    transaction. Invalid items are reported per item and skipped; the rest are applied.
+    """
+    try:
+        set_audit_user(db, current_user["id"])  # Recorded as changed_by in the audit trail
+        
+        return bulk_update_status_management(
+            db=db,
+            items=bulk_update.items,
+            caller_user_id=current_user["id"]
+        )
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid data: {str(e)}")
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to update statuses: {str(e)}")
+
 @router.get("/{loan_id}")
 def get_application_status(
     loan_id: str,
@@ -82,56 +111,7 @@ def get_application_status(
                 detail=f"Payment details not found for loan_id: {loan_id_int} and repayment_id: {repayment_id}"
             )
         
-        # Get repayment status name
-        repayment_status_name = None
-        if payment_details.repayment_status_id:
-            repayment_status_record = db.query(RepaymentStatus).filter(
-                RepaymentStatus.id == payment_details.repayment_status_id
-            ).first()
-            if repayment_status_record:
-                repayment_status_name = repayment_status_record.repayment_status
-        
-        # Get latest calling records for this application
-        latest_demand_calling = db.query(Calling).filter(
-            and_(
-                Calling.repayment_id == str(payment_details.id),
-                Calling.Calling_id == 2  # Demand calling
-            )
-        ).order_by(Calling.created_at.desc()).first()
-        
-        latest_contact_calling = db.query(Calling).filter(
-            and_(
-                Calling.repayment_id == str(payment_details.id),
-                Calling.Calling_id == 1  # Contact calling
-            )
-        ).order_by(Calling.created_at.desc()).first()
-        
-        # Get status names from calling records
-        demand_calling_status = None
-        if latest_demand_calling:
-            demand_calling_record = db.query(DemandCalling).filter(
-                DemandCalling.id == latest_demand_calling.status_id
-            ).first()
-            if demand_calling_record:
-                demand_calling_status = demand_calling_record.demand_calling_status
-        
-        contact_calling_status = None
-        if latest_contact_calling:
-            contact_calling_record = db.query(ContactCalling).filter(
-                ContactCalling.id == latest_contact_calling.status_id
-            ).first()
-            if contact_calling_record:
-                contact_calling_status = contact_calling_record.contact_calling_status
-        
-        return {
-            "loan_id": loan_id_int,
-            "repayment_id": repayment_id,  # 🎯 ADDED! Return the repayment_id
-            "demand_calling_status": demand_calling_status,
-            "repayment_status": repayment_status_name,
-            "ptp_date": payment_details.ptp_date.isoformat() if payment_details.ptp_date else None,
-            "amount_collected": float(payment_details.amount_collected) if payment_details.amount_collected else None,
-            "contact_calling_status": contact_calling_status
-        }
+        return get_payment_status(db, loan_id_int, repayment_id, payment_details)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
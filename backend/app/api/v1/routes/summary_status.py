@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Query, HTTPException, Depends
 from sqlalchemy.orm import Session
-from app.core.deps import get_db, get_current_user
-from app.crud.summary_status import get_summary_status, get_summary_status_with_filters
-from app.schemas.summary_status import SummaryStatusResponse
+from app.core.deps import get_read_db, run_db, get_current_user
+from app.crud.summary_status import get_summary_status, get_summary_status_with_filters, get_summary_status_by_months
+from app.schemas.summary_status import SummaryStatusResponse, SummaryStatusByMonthResponse
+from typing import List
 
 router = APIRouter()
 
 @router.get('/summary', response_model=SummaryStatusResponse)
-def summary_status_route(
+async def summary_status_route(
     emi_month: str = Query(..., description="EMI month in format 'Jul-25'"),
     branch: str = Query(None, description="Filter by branch name"),
     dealer: str = Query(None, description="Filter by dealer name"),
@@ -18,14 +19,19 @@ def summary_status_route(
     ptp_date_filter: str = Query(None, description="Filter by PTP date category"),
     repayment_id: str = Query(None, description="Filter by repayment ID"),
     demand_num: str = Query(None, description="Filter by demand number"),
-    db: Session = Depends(get_db),
+    live: bool = Query(False, description="Count live from payment_details even when the summary snapshot is enabled"),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Get summary status with optional filters applied
+    Get summary status with optional filters applied.
+    
+    Answered from collection_summary_snapshot when READ_SUMMARY_SNAPSHOT is on, unless
+    live=true or a PTP date, repayment ID or demand number filter is set.
     """
-    return get_summary_status_with_filters(
-        db=db,
+    return await run_db(
+        db,
+        get_summary_status_with_filters,
         emi_month=emi_month,
         branch=branch,
         dealer=dealer,
@@ -35,5 +41,41 @@ def summary_status_route(
         tl_name=tl_name,
         ptp_date_filter=ptp_date_filter,
         repayment_id=repayment_id,
-        demand_num=demand_num
-    ) 
\ No newline at end of file
+        demand_num=demand_num,
+        use_snapshot=not live
+    )
+
+@router.get('/summary/by-month', response_model=SummaryStatusByMonthResponse)
+async def summary_status_by_month_route(
+    emi_month: List[str] = Query(..., description="One or more EMI months in format 'Jul-25' (repeat the parameter)"),
+    branch: str = Query(None, description="Filter by branch name"),
+    dealer: str = Query(None, description="Filter by dealer name"),
+    lender: str = Query(None, description="Filter by lender name"),
+    status: str = Query(None, description="Filter by repayment status"),
+    rm_name: str = Query(None, description="Filter by RM name"),
+    tl_name: str = Query(None, description="Filter by TL name"),
+    ptp_date_filter: str = Query(None, description="Filter by PTP date category"),
+    repayment_id: str = Query(None, description="Filter by repayment ID"),
+    demand_num: str = Query(None, description="Filter by demand number"),
+    live: bool = Query(False, description="Count live from payment_details even when the summary snapshot is enabled"),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get summary status for several EMI months in one call, with a breakdown per month
+    """
+    return await run_db(
+        db,
+        get_summary_status_by_months,
+        emi_months=emi_month,
+        branch=branch,
+        dealer=dealer,
+        lender=lender,
+        status=status,
+        rm_name=rm_name,
+        tl_name=tl_name,
+        ptp_date_filter=ptp_date_filter,
+        repayment_id=repayment_id,
+        demand_num=demand_num,
+        use_snapshot=not live
+    )
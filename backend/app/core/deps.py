@@ -1,10 +1,12 @@
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, AsyncSessionLocal
+from app.core.config import settings
 from app.core.security import verify_token
-from app.crud.user import get_user_by_id
+from app.crud.user import get_user_identity
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Callable, Optional
 
 def get_db():
     db = SessionLocal()
@@ -13,6 +15,23 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Session for read-heavy async routes: an AsyncSession when DB_ASYNC is set, else the
+# regular sync Session. Write paths keep using get_db. Use run_db to call CRUD code.
+get_read_db = get_async_db if settings.DB_ASYNC else get_db
+
+async def run_db(db, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a sync CRUD function against the session from get_read_db without blocking
+    the event loop: via AsyncSession.run_sync in async mode, else in the threadpool.
+    """
+    if AsyncSessionLocal is not None and not isinstance(db, Session):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
@@ -33,7 +52,8 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = get_user_by_id(db, int(user_id))
+    # Cached per worker for a short TTL; role/password changes and deletes invalidate it
+    user = get_user_identity(db, int(user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,12 +61,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "role": user.role
-    }
+    return user
 
 def get_current_user_optional(
     db: Session = Depends(get_db),
@@ -0,0 +1,52 @@
+from sqlalchemy import select, func, case, or_
+from typing import List
+from app.models.applicant_details import ApplicantDetails
+from app.models.applicant_search import ApplicantSearchToken, tokenize
+
+# Extra words add little to a search box query but each one costs a subquery
+MAX_SEARCH_TERMS = 5
+
+def search_terms(search: str) -> List[str]:
+    """Distinct normalized terms of a search box query, in the order typed"""
+    terms = []
+    for term in tokenize(search):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_SEARCH_TERMS]
+
+def _matching_loans(term: str):
+    # Terms are alphanumeric only, so they never contain LIKE wildcards
+    return select(ApplicantSearchToken.loan_application_id).where(ApplicantSearchToken.token.like(f"{term}%"))
+
+def search_filters(terms: List[str], loan_id_column) -> list:
+    """One clause per term: the loan has a token starting with it (every term must match)"""
+    return [loan_id_column.in_(_matching_loans(term)) for term in terms]
+
+def substring_search_filter(search: str):
+    """
+    Substring match of the whole query against applicant name and id (ILIKE '%search%').
+    Scans every applicant; used until the applicant_search_token index has been built.
+    """
+    return or_(
+        func.concat(ApplicantDetails.first_name, ' ', ApplicantDetails.last_name).ilike(f'%{search}%'),
+        ApplicantDetails.first_name.ilike(f'%{search}%'),
+        ApplicantDetails.last_name.ilike(f'%{search}%'),
+        ApplicantDetails.applicant_id.ilike(f'%{search}%')
+    )
+
+def search_relevance(terms: List[str]):
+    """
+    Subquery (loan_application_id, score) for loans matching any term. Identifier tokens
+    weigh more than name parts, and whole-token matches count double.
+    """
+    token = ApplicantSearchToken.token
+    weight = ApplicantSearchToken.weight
+    return (
+        select(
+            ApplicantSearchToken.loan_application_id,
+            func.sum(case((token.in_(terms), weight * 2), else_=weight)).label("score")
+        )
+        .where(or_(*[token.like(f"{term}%") for term in terms]))
+        .group_by(ApplicantSearchToken.loan_application_id)
+        .subquery()
+    )
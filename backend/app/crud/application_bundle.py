@@ -0,0 +1,102 @@
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Iterable, List, Optional
+from app.models.loan_details import LoanDetails
+from app.models.payment_details import PaymentDetails
+from app.schemas.comments import CommentTypeEnum
+from app.crud.contacts import get_application_contacts_batch
+from app.crud.month_dropdown import build_month_options
+from app.crud.status_management import get_payment_status
+from app.crud.comments import get_comments_by_repayment_and_type, get_comments_count_by_type
+
+# Sections of the application details panel, in response order
+BUNDLE_SECTIONS = ("contacts", "months", "status", "comments", "comment_counts")
+
+def parse_bundle_sections(sections: str) -> List[str]:
+    """Requested sections from a comma separated list; empty means all of them"""
+    requested = {section.strip() for section in sections.split(",") if section.strip()}
+    unknown = requested - set(BUNDLE_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}. Valid sections: {', '.join(BUNDLE_SECTIONS)}")
+    return [section for section in BUNDLE_SECTIONS if not requested or section in requested]
+
+def _select_payment(payments: list, repayment_id: str, loan_id_int: int):
+    """The payment asked for, else the current month's one (the dropdown's current_month)"""
+    if repayment_id:
+        for payment in payments:
+            if str(payment.id) == repayment_id:
+                return payment
+        raise ValueError(f"repayment_id {repayment_id} is not a payment of loan_id {loan_id_int}")
+
+    dated = [payment for payment in payments if payment.demand_date]
+    return (dated or payments or [None])[-1]
+
+def get_application_bundle(
+    db: Session,
+    loan_id: str,
+    repayment_id: str = "",
+    sections: Iterable[str] = BUNDLE_SECTIONS,
+    comment_type: CommentTypeEnum = CommentTypeEnum.application_details,
+    comment_limit: int = 100
+) -> Optional[Dict[str, Any]]:
+    """
+    Everything the application details panel loads for a loan, in one call: contacts,
+    month dropdown, status of the selected payment, its comments and comment counts.
+    The loan and all its payments are resolved once and shared by the sections.
+    Returns None if the loan doesn't exist.
+    """
+    try:
+        loan_id_int = int(loan_id)
+    except ValueError:
+        raise ValueError("loan_id must be a valid integer")
+    sections = set(sections)
+
+    # The loan and its payments in one query; a loan without payments gives one all-NULL payment row
+    rows = db.query(
+        LoanDetails.loan_application_id,
+        PaymentDetails.id,
+        PaymentDetails.demand_date,
+        PaymentDetails.repayment_status_id,
+        PaymentDetails.ptp_date,
+        PaymentDetails.amount_collected
+    ).outerjoin(
+        PaymentDetails, PaymentDetails.loan_application_id == LoanDetails.loan_application_id
+    ).filter(
+        LoanDetails.loan_application_id == loan_id_int
+    ).order_by(PaymentDetails.demand_date, PaymentDetails.id).all()
+
+    if not rows:
+        return None
+
+    payments = [row for row in rows if row.id is not None]
+    payment = _select_payment(payments, repayment_id, loan_id_int)
+    selected_repayment_id = str(payment.id) if payment else None
+
+    bundle = {"loan_id": loan_id_int, "repayment_id": selected_repayment_id}
+
+    if "contacts" in sections:
+        bundle["contacts"] = get_application_contacts_batch(db, [loan_id_int]).get(loan_id_int)
+
+    if "months" in sections:
+        bundle["months"] = build_month_options(str(loan_id_int), payments) if payments else None
+
+    if "status" in sections:
+        bundle["status"] = get_payment_status(db, loan_id_int, selected_repayment_id, payment) if payment else None
+
+    counts = None
+    if payment and ("comments" in sections or "comment_counts" in sections):
+        counts = get_comments_count_by_type(db, selected_repayment_id)
+
+    if "comments" in sections:
+        bundle["comments"] = {
+            "comment_type": comment_type.value,
+            "total": counts.get(comment_type.value, 0),
+            "results": get_comments_by_repayment_and_type(db, selected_repayment_id, comment_type, 0, comment_limit)
+        } if payment else None
+
+    if "comment_counts" in sections:
+        bundle["comment_counts"] = {
+            "total": sum(counts.values()),
+            "by_type": {comment_type_enum.name: counts.get(comment_type_enum.value, 0) for comment_type_enum in CommentTypeEnum}
+        } if payment else None
+
+    return bundle
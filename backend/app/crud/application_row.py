@@ -1,20 +1,58 @@
 from sqlalchemy.orm import Session, aliased
-from sqlalchemy import desc, func, or_, and_
+from sqlalchemy import desc, func, and_, false
 from app.models.loan_details import LoanDetails
 from app.models.applicant_details import ApplicantDetails
 from app.models.payment_details import PaymentDetails
-from app.models.branch import Branch
-from app.models.dealer import Dealer
-from app.models.lenders import Lender
 from app.models.comments import Comments
 from app.models.user import User
-from app.models.repayment_status import RepaymentStatus
-from app.models.calling import Calling
-from app.models.contact_calling import ContactCalling
-from app.models.ownership_type import OwnershipType  # 🎯 ADDED! For House Ownership
-from datetime import date, timedelta
+from app.models.calling_latest import load_latest_calls
+from app.models.loan_current_demand import LoanCurrentDemand
+from app.models.payment_link import payment_key, payment_key_filter
+from app.core.config import settings
+from app.crud.lookups import lookups
+from app.crud.applicant_search import search_terms, search_filters, search_relevance, substring_search_filter
+from app.utils.helpers import encode_cursor, decode_cursor, keyset_after
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Sequence
 
-def get_filtered_applications(
+# contact_type number -> key used in ApplicationItem.calling_statuses
+CONTACT_TYPE_KEYS = {
+    1: "applicant",
+    2: "co_applicant",
+    3: "guarantor",
+    4: "reference"
+}
+
+# Applications are listed by applicant name; payment_id makes the order total
+APPLICATION_SORT_COLUMNS = [ApplicantDetails.first_name, ApplicantDetails.last_name, PaymentDetails.id]
+
+# Lookup ids a payment needs to be listed (the summary cards count the same rows)
+REQUIRED_LOOKUP_COLUMNS = [
+    ApplicantDetails.branch_id,
+    ApplicantDetails.dealer_id,
+    LoanDetails.lenders_id,
+    ApplicantDetails.ownership_type_id,
+    PaymentDetails.repayment_status_id
+]
+
+def emi_month_to_date_range(emi_month: str):
+    """
+    Convert an EMI month like 'Jul-25' into a half-open [start, end) demand_date range.
+    Comparing the bare column against a range keeps the (loan_application_id, demand_date)
+    index usable, unlike wrapping demand_date in DATE_FORMAT().
+    """
+    try:
+        month_start = datetime.strptime(emi_month, '%b-%y').date()
+    except ValueError:
+        raise ValueError(f"Invalid emi_month format: {emi_month}. Use e.g. Jul-25")
+
+    if month_start.month == 12:
+        month_end = month_start.replace(year=month_start.year + 1, month=1)
+    else:
+        month_end = month_start.replace(month=month_start.month + 1)
+    return month_start, month_end
+
+def build_applications_query(
     db: Session,
     loan_id: str = "",  # 🎯 ADDED! Filter by specific loan ID
     emi_month: str = "", 
@@ -27,10 +65,9 @@ def get_filtered_applications(
     tl_name: str = "",
     ptp_date_filter: str = "",
     repayment_id: str = "",  # 🎯 ADDED! Filter by repayment_id (same as payment_id)
-    demand_num: str = "",  # 🎯 ADDED! Filter by demand number
-    offset: int = 0, 
-    limit: int = 20
+    demand_num: str = ""  # 🎯 ADDED! Filter by demand number
 ):
+    """Build the filtered (unordered, unpaginated) applications query shared by the list and export"""
     RM = aliased(User)
     TL = aliased(User)
 
@@ -42,24 +79,25 @@ def get_filtered_applications(
         ApplicantDetails.first_name,
         ApplicantDetails.last_name,
         PaymentDetails.demand_amount.label("emi_amount"),
-        RepaymentStatus.repayment_status.label("status"),
+        PaymentDetails.repayment_status_id,  # Status, branch, dealer, lender and ownership names come from the lookup registry
         PaymentDetails.demand_date.label('emi_month'),
-        Branch.name.label("branch"),
+        ApplicantDetails.branch_id,
         RM.name.label("rm_name"),
         TL.name.label("tl_name"),
-        Dealer.name.label("dealer"),
-        Lender.name.label("lender"),
+        ApplicantDetails.dealer_id,
+        LoanDetails.lenders_id,
         PaymentDetails.ptp_date.label("ptp_date"),
         PaymentDetails.mode.label("payment_mode"),
         PaymentDetails.amount_collected.label("amount_collected"),  # 🎯 ADDED! Amount collected
         PaymentDetails.id.label("payment_id"),
         LoanDetails.disbursal_amount.label("loan_amount"),  # 🎯 ADDED! Loan Amount
         LoanDetails.disbursal_date.label("disbursement_date"),  # 🎯 ADDED! Disbursement Date
-        OwnershipType.ownership_type_name.label("house_ownership")  # 🎯 ADDED! House Ownership
+        ApplicantDetails.ownership_type_id  # 🎯 ADDED! House Ownership
     ]
     
     if emi_month:
         # 🎯 FIXED! If emi_month is provided, get that specific month's payment
+        month_start, month_end = emi_month_to_date_range(emi_month)
         query = (
             db.query(*base_fields)
             .select_from(LoanDetails)
@@ -67,18 +105,25 @@ def get_filtered_applications(
             .join(
                 PaymentDetails,
                 (PaymentDetails.loan_application_id == LoanDetails.loan_application_id) &
-                (func.date_format(PaymentDetails.demand_date, '%b-%y') == emi_month)  # 🎯 Direct month filter
+                (PaymentDetails.demand_date >= month_start) &  # 🎯 Index-friendly month range
+                (PaymentDetails.demand_date < month_end)
             )
-            .join(Branch, ApplicantDetails.branch_id == Branch.id)
-            .join(Dealer, ApplicantDetails.dealer_id == Dealer.id)
-            .join(Lender, LoanDetails.lenders_id == Lender.id)
-            .join(OwnershipType, ApplicantDetails.ownership_type_id == OwnershipType.id)
             .join(RM, LoanDetails.Collection_relationship_manager_id == RM.id)
             .join(TL, LoanDetails.source_relationship_manager_id == TL.id)
-            .join(RepaymentStatus, PaymentDetails.repayment_status_id == RepaymentStatus.id)
+        )
+    elif settings.READ_LOAN_CURRENT_DEMAND:
+        # If no emi_month, use the loan's current (latest) payment from the maintained pointer
+        query = (
+            db.query(*base_fields)
+            .select_from(LoanDetails)
+            .join(ApplicantDetails, LoanDetails.applicant_id == ApplicantDetails.applicant_id)
+            .join(LoanCurrentDemand, LoanDetails.loan_application_id == LoanCurrentDemand.loan_application_id)
+            .join(PaymentDetails, PaymentDetails.id == LoanCurrentDemand.payment_id)
+            .join(RM, LoanDetails.Collection_relationship_manager_id == RM.id)
+            .join(TL, LoanDetails.source_relationship_manager_id == TL.id)
         )
     else:
-        # If no emi_month, use current logic (latest payment)
+        # Until loan_current_demand is backfilled, find the latest payment per loan directly
         latest_payment_subq = (
             db.query(
                 PaymentDetails.loan_application_id,
@@ -87,7 +132,7 @@ def get_filtered_applications(
             .group_by(PaymentDetails.loan_application_id)
             .subquery()
         )
-        
+
         query = (
             db.query(*base_fields)
             .select_from(LoanDetails)
@@ -101,39 +146,40 @@ def get_filtered_applications(
                 (PaymentDetails.loan_application_id == latest_payment_subq.c.loan_application_id) &
                 (PaymentDetails.demand_date == latest_payment_subq.c.max_demand_date)
             )
-            .join(Branch, ApplicantDetails.branch_id == Branch.id)
-            .join(Dealer, ApplicantDetails.dealer_id == Dealer.id)
-            .join(Lender, LoanDetails.lenders_id == Lender.id)
-            .join(OwnershipType, ApplicantDetails.ownership_type_id == OwnershipType.id)
             .join(RM, LoanDetails.Collection_relationship_manager_id == RM.id)
             .join(TL, LoanDetails.source_relationship_manager_id == TL.id)
-            .join(RepaymentStatus, PaymentDetails.repayment_status_id == RepaymentStatus.id)
         )
 
+    # Rows without a lookup id stay excluded, as with the former inner joins to the lookup
+    # tables. An id with no lookup row is not checked: such a row is now listed with an
+    # empty name instead of being dropped (the foreign keys normally rule it out)
+    query = query.filter(*[column.isnot(None) for column in REQUIRED_LOOKUP_COLUMNS])
+
     # Apply essential filters only
     if loan_id:
         query = query.filter(LoanDetails.loan_application_id == int(loan_id))  # 🎯 ADDED! Filter by loan_id
     
-    if search:
-        search_filter = or_(
-            func.concat(ApplicantDetails.first_name, ' ', ApplicantDetails.last_name).ilike(f'%{search}%'),
-            ApplicantDetails.first_name.ilike(f'%{search}%'),
-            ApplicantDetails.last_name.ilike(f'%{search}%'),
-            ApplicantDetails.applicant_id.ilike(f'%{search}%')
-        )
-        query = query.filter(search_filter)
+    if search and not settings.READ_APPLICANT_SEARCH:
+        query = query.filter(substring_search_filter(search))
+    elif search:
+        # Prefix match of every term against the applicant_search_token index
+        terms = search_terms(search)
+        if terms:
+            query = query.filter(*search_filters(terms, LoanDetails.loan_application_id))
+        else:
+            query = query.filter(false())  # Nothing searchable in it (e.g. only punctuation) matches nothing
     
     if branch:
-        query = query.filter(Branch.name == branch)
+        query = query.filter(ApplicantDetails.branch_id.in_(lookups.ids(db, "branch", branch)))
     
     if dealer:
-        query = query.filter(Dealer.name == dealer)
+        query = query.filter(ApplicantDetails.dealer_id.in_(lookups.ids(db, "dealer", dealer)))
     
     if lender:
-        query = query.filter(Lender.name == lender)
+        query = query.filter(LoanDetails.lenders_id.in_(lookups.ids(db, "lender", lender)))
     
     if status:
-        query = query.filter(RepaymentStatus.repayment_status == status)
+        query = query.filter(PaymentDetails.repayment_status_id.in_(lookups.ids(db, "repayment_status", status)))
     
     if rm_name:
         query = query.filter(RM.name == rm_name)
@@ -157,83 +203,153 @@ def get_filtered_applications(
         if ptp_date_filter == "overdue":
             query = query.filter(PaymentDetails.ptp_date < today)
         elif ptp_date_filter == "today":
-            query = query.filter(func.date(PaymentDetails.ptp_date) == today)
+            query = query.filter(PaymentDetails.ptp_date == today)  # Bare DATE column keeps ix_payment_details_ptp_date usable
         elif ptp_date_filter == "tomorrow":
-            query = query.filter(func.date(PaymentDetails.ptp_date) == tomorrow)
+            query = query.filter(PaymentDetails.ptp_date == tomorrow)
         elif ptp_date_filter == "future":
             query = query.filter(PaymentDetails.ptp_date > tomorrow)
         elif ptp_date_filter == "no_ptp":
             query = query.filter(PaymentDetails.ptp_date.is_(None))
     
+    return query
+
+def get_filtered_applications(
+    db: Session,
+    loan_id: str = "",  # 🎯 ADDED! Filter by specific loan ID
+    emi_month: str = "", 
+    search: str = "",
+    branch: str = "",
+    dealer: str = "",
+    lender: str = "",
+    status: str = "",
+    rm_name: str = "",
+    tl_name: str = "",
+    ptp_date_filter: str = "",
+    repayment_id: str = "",  # 🎯 ADDED! Filter by repayment_id (same as payment_id)
+    demand_num: str = "",  # 🎯 ADDED! Filter by demand number
+    offset: int = 0, 
+    limit: int = 20,
+    cursor: str = "",  # Opaque keyset cursor from a previous page's next_cursor
+    include_total: bool = True,
+    search_order: str = "name"  # "relevance": best search matches first (offset paging only)
+):
+    # Relevance needs the token index; before it is enabled results stay in name order
+    relevance_terms = search_terms(search) if search_order == "relevance" and settings.READ_APPLICANT_SEARCH else []
+    if relevance_terms and cursor:
+        raise ValueError("cursor paging is not available with search_order=relevance; use offset")
+
+    query = build_applications_query(
+        db,
+        loan_id=loan_id,
+        emi_month=emi_month,
+        search=search,
+        branch=branch,
+        dealer=dealer,
+        lender=lender,
+        status=status,
+        rm_name=rm_name,
+        tl_name=tl_name,
+        ptp_date_filter=ptp_date_filter,
+        repayment_id=repayment_id,
+        demand_num=demand_num
+    )
+
+    # Total is computed before the keyset predicate so it always covers the whole filter
+    total = query.count() if include_total else None
+
     # 🎯 ADDED! Alphabetical ordering by Applicant Name (First Name, then Last Name)
-    query = query.order_by(ApplicantDetails.first_name.asc(), ApplicantDetails.last_name.asc())
-    
-    total = query.count()
-    results = []
+    # payment_id is the tie-breaker so every row has a unique, stable position
+    sort_columns = APPLICATION_SORT_COLUMNS
+    if relevance_terms:
+        relevance = search_relevance(relevance_terms)
+        query = (
+            query.join(relevance, relevance.c.loan_application_id == LoanDetails.loan_application_id)
+            .order_by(relevance.c.score.desc())
+        )
+    query = query.order_by(*[column.asc() for column in sort_columns])
+
+    if cursor:
+        # Keyset mode: seek past the last row of the previous page instead of OFFSET
+        query = query.filter(keyset_after(sort_columns, decode_cursor(cursor, len(sort_columns))))
+    elif offset:
+        query = query.offset(offset)
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if not relevance_terms:
+            last = rows[-1]
+            next_cursor = encode_cursor([last.first_name, last.last_name, last.payment_id])
+
+    results = enrich_application_rows(db, rows)
+
+    return {
+        "total": total,
+        "results": results,
+        "next_cursor": next_cursor
+    }
 
-    for row in query.offset(offset).limit(limit).all():
-        # Get comments for this payment (only application details comments, comment_type = 1)
-        comments = db.query(Comments).filter(
-            and_(
-                Comments.repayment_id == row.payment_id,
-                Comments.comment_type == 1  # Only application details comments, not paid pending
-            )
-        ).order_by(Comments.commented_at.desc()).all()
-        comment_list = [c.comment for c in comments]
-
-        # Get calling status for ALL 4 contact types (1=applicant, 2=co-applicant, 3=guarantor, 4=reference)
-        calling_statuses = {
-            "applicant": "Not Called",      # contact_type = 1
-            "co_applicant": "Not Called",   # contact_type = 2
-            "guarantor": "Not Called",      # contact_type = 3
-            "reference": "Not Called"       # contact_type = 4
-        }
-        
-        # Get latest calling records for each contact type for this payment (repayment_id)
-        for contact_type in range(1, 5):  # 1 to 4
-            latest_calling = db.query(Calling).filter(
-                and_(
-                    Calling.repayment_id == str(row.payment_id),
-                    Calling.Calling_id == 1,  # Only contact calling, not demand calling
-                    Calling.contact_type == contact_type
-                )
-            ).order_by(Calling.created_at.desc()).first()
-            
-            if latest_calling:
-                # Get contact calling status
-                contact_status = db.query(ContactCalling).filter(
-                    ContactCalling.id == latest_calling.status_id
-                ).first()
-                if contact_status:
-                    # Map contact_type number to string key
-                    if contact_type == 1:
-                        calling_statuses["applicant"] = contact_status.contact_calling_status
-                    elif contact_type == 2:
-                        calling_statuses["co_applicant"] = contact_status.contact_calling_status
-                    elif contact_type == 3:
-                        calling_statuses["guarantor"] = contact_status.contact_calling_status
-                    elif contact_type == 4:
-                        calling_statuses["reference"] = contact_status.contact_calling_status
-
-        # Get demand calling status for this payment (repayment_id)
-        demand_calling_status = None  # Default value
-        latest_demand_calling = db.query(Calling).filter(
-            and_(
-                Calling.repayment_id == str(row.payment_id),
-                Calling.Calling_id == 2,  # Demand calling (not contact calling)
-                Calling.contact_type == 1  # For applicant only
-            )
-        ).order_by(Calling.created_at.desc()).first()
-        
-        if latest_demand_calling:
-            # Get demand calling status from demand_calling table (not contact_calling)
-            from app.models.demand_calling import DemandCalling
-            demand_status = db.query(DemandCalling).filter(
-                DemandCalling.id == latest_demand_calling.status_id
-            ).first()
-            if demand_status:
-                demand_calling_status = demand_status.demand_calling_status
 
+def _load_application_comments(db: Session, repayment_keys: List[str]) -> Dict[str, List[str]]:
+    """Load application details comments (comment_type = 1) for many payments in one query"""
+    comments_by_payment: Dict[str, List[str]] = {key: [] for key in repayment_keys}
+    if not repayment_keys:
+        return comments_by_payment
+
+    rows = db.query(payment_key(Comments).label("repayment_id"), Comments.comment).filter(
+        and_(
+            payment_key_filter(Comments, repayment_keys),
+            Comments.comment_type == 1  # Only application details comments, not paid pending
+        )
+    ).order_by(Comments.commented_at.desc()).all()
+
+    for row in rows:
+        comments_by_payment.setdefault(str(row.repayment_id), []).append(row.comment)
+    return comments_by_payment
+
+def _load_latest_calling_statuses(db: Session, repayment_keys: List[str]):
+    """
+    Load the latest contact calling status per contact_type and the latest demand
+    calling status for many payments in one query (see load_latest_calls).
+    """
+    calling_statuses: Dict[str, Dict[str, str]] = {
+        key: {contact_key: "Not Called" for contact_key in CONTACT_TYPE_KEYS.values()}
+        for key in repayment_keys
+    }
+    demand_statuses: Dict[str, Any] = {key: None for key in repayment_keys}
+
+    for row in load_latest_calls(db, repayment_keys):
+        key = str(row.payment_id)
+        if key not in demand_statuses:
+            continue
+        if row.Calling_id == 1:  # Contact calling, all contact types
+            contact_key = CONTACT_TYPE_KEYS.get(row.contact_type)
+            contact_calling_status = lookups.name(db, "contact_calling", row.status_id)
+            if contact_key and contact_calling_status:
+                calling_statuses[key][contact_key] = contact_calling_status
+        elif row.Calling_id == 2 and row.contact_type == 1:  # Demand calling, applicant only
+            demand_calling_status = lookups.name(db, "demand_calling", row.status_id)
+            if demand_calling_status:
+                demand_statuses[key] = demand_calling_status
+
+    return calling_statuses, demand_statuses
+
+def enrich_application_rows(db: Session, rows: Sequence[Any]) -> List[Dict[str, Any]]:
+    """
+    Build ApplicationItem payloads for a page of application rows.
+
+    Comments and calling statuses for every payment on the page are loaded with a
+    fixed number of set-based queries instead of one round-trip per row.
+    """
+    repayment_keys = list(dict.fromkeys(str(row.payment_id) for row in rows))
+    comments_by_payment = _load_application_comments(db, repayment_keys)
+    calling_statuses, demand_statuses = _load_latest_calling_statuses(db, repayment_keys)
+
+    results = []
+    for row in rows:
+        key = str(row.payment_id)
         results.append({
             "application_id": str(row.application_id),
             "loan_id": row.loan_id, # Added loan_id to response
@@ -241,25 +357,50 @@ def get_filtered_applications(
             "demand_num": str(row.demand_num) if row.demand_num else None,  # 🎯 ADDED! Repayment Number (converted to string)
             "applicant_name": f"{row.first_name or ''} {row.last_name or ''}".strip(),
             "emi_amount": float(row.emi_amount) if row.emi_amount else None,
-            "status": row.status,
+            "status": lookups.name(db, "repayment_status", row.repayment_status_id),
             "emi_month": row.emi_month.strftime('%b-%y') if row.emi_month else None,
-            "branch": row.branch,
+            "branch": lookups.name(db, "branch", row.branch_id),
             "rm_name": row.rm_name,
             "tl_name": row.tl_name,
-            "dealer": row.dealer,
-            "lender": row.lender,
+            "dealer": lookups.name(db, "dealer", row.dealer_id),
+            "lender": lookups.name(db, "lender", row.lenders_id),
             "ptp_date": row.ptp_date.strftime('%y-%m-%d') if row.ptp_date else None,
-            "calling_statuses": calling_statuses,  # All 4 contact types calling status
-            "demand_calling_status": demand_calling_status,  # 🎯 ADDED! Demand calling status
+            "calling_statuses": dict(calling_statuses[key]),  # All 4 contact types calling status
+            "demand_calling_status": demand_statuses[key],  # 🎯 ADDED! Demand calling status
             "payment_mode": row.payment_mode,      # Payment mode separate
             "amount_collected": float(row.amount_collected) if row.amount_collected else None,  # 🎯 ADDED! Amount collected
             "loan_amount": float(row.loan_amount) if row.loan_amount else None,  # 🎯 ADDED! Loan Amount
             "disbursement_date": row.disbursement_date.strftime('%Y-%m-%d') if row.disbursement_date else None,  # 🎯 ADDED! Disbursement Date
-            "house_ownership": row.house_ownership,  # 🎯 ADDED! House Ownership
-            "comments": comment_list
+            "house_ownership": lookups.name(db, "ownership_type", row.ownership_type_id),  # 🎯 ADDED! House Ownership
+            "comments": list(comments_by_payment.get(key, []))
         })
 
-    return {
-        "total": total,
-        "results": results
-    }
+    return results
+
+def iter_application_items(
+    db: Session,
+    enrich_db: Session,
+    batch_size: int = 1000,
+    **filters
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield ApplicationItem payloads for every row matching `filters`, in list order.
+
+    Rows are streamed from a server-side cursor on `db` and enriched in batches on
+    `enrich_db`, which must be a different session: MySQL cannot run other queries
+    on a connection while a streamed result is still open.
+    """
+    query = (
+        build_applications_query(db, **filters)
+        .order_by(*[column.asc() for column in APPLICATION_SORT_COLUMNS])
+        .yield_per(batch_size)
+    )
+
+    batch = []
+    for row in query:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield from enrich_application_rows(enrich_db, batch)
+            batch = []
+    if batch:
+        yield from enrich_application_rows(enrich_db, batch)
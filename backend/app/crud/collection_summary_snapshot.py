@@ -0,0 +1,118 @@
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, select, delete, insert, tuple_, or_
+from typing import List
+from app.models.payment_details import PaymentDetails
+from app.models.loan_details import LoanDetails
+from app.models.applicant_details import ApplicantDetails
+from app.models.user import User
+from app.models.collection_summary_snapshot import CollectionSummarySnapshot
+from app.crud.application_row import REQUIRED_LOOKUP_COLUMNS
+
+# Snapshot columns in key order, excluding repayment_status_id
+SLICE_COLUMNS = ["demand_year", "demand_month", "branch_id", "dealer_id", "lender_id", "rm_id", "tl_id"]
+
+def _source_columns():
+    """Dimension expressions over payment_details, with missing ids folded to 0"""
+    return [
+        func.coalesce(PaymentDetails.demand_year, 0).label("demand_year"),
+        func.coalesce(PaymentDetails.demand_month, 0).label("demand_month"),
+        func.coalesce(ApplicantDetails.branch_id, 0).label("branch_id"),
+        func.coalesce(ApplicantDetails.dealer_id, 0).label("dealer_id"),
+        func.coalesce(LoanDetails.lenders_id, 0).label("lender_id"),
+        func.coalesce(LoanDetails.Collection_relationship_manager_id, 0).label("rm_id"),
+        func.coalesce(LoanDetails.source_relationship_manager_id, 0).label("tl_id"),
+    ]
+
+def _with_source_joins(stmt):
+    return (
+        stmt.select_from(PaymentDetails)
+        .outerjoin(LoanDetails, PaymentDetails.loan_application_id == LoanDetails.loan_application_id)
+        .outerjoin(ApplicantDetails, LoanDetails.applicant_id == ApplicantDetails.applicant_id)
+    )
+
+def _listed_only(stmt):
+    """
+    Keep the payments the applications list shows, which are the ones the status cards
+    count. The required ids also drop payments the outer joins left without a loan or applicant.
+    """
+    RM = aliased(User)
+    TL = aliased(User)
+    return (
+        stmt.join(RM, LoanDetails.Collection_relationship_manager_id == RM.id)
+        .join(TL, LoanDetails.source_relationship_manager_id == TL.id)
+        .where(*[column.isnot(None) for column in REQUIRED_LOOKUP_COLUMNS])
+    )
+
+def _nullable_in(column, values):
+    """column IN values, where 0 stands for NULL like in the snapshot key"""
+    clause = column.in_([value for value in values if value != 0])
+    return or_(clause, column.is_(None)) if 0 in values else clause
+
+def _aggregate_select(slice_keys=None):
+    """Aggregate payment_details into snapshot rows, optionally restricted to some slices"""
+    slice_columns = _source_columns()
+    status_column = func.coalesce(PaymentDetails.repayment_status_id, 0).label("repayment_status_id")
+
+    stmt = _listed_only(_with_source_joins(select(
+        *slice_columns,
+        status_column,
+        func.count(PaymentDetails.id).label("payment_count"),
+        func.coalesce(func.sum(PaymentDetails.demand_amount), 0).label("demand_amount"),
+        func.coalesce(func.sum(PaymentDetails.amount_collected), 0).label("amount_collected")
+    )))
+    if slice_keys is not None:
+        # Plain predicates on the month columns let MySQL range-scan
+        # ix_payment_details_year_month_status; the tuple IN then keeps the exact slices
+        stmt = stmt.where(
+            _nullable_in(PaymentDetails.demand_year, {key[0] for key in slice_keys}),
+            _nullable_in(PaymentDetails.demand_month, {key[1] for key in slice_keys}),
+            tuple_(*slice_columns).in_(slice_keys)
+        )
+
+    return stmt.group_by(*slice_columns, status_column)
+
+def _insert_aggregates(connection, slice_keys=None) -> None:
+    connection.execute(
+        insert(CollectionSummarySnapshot).from_select(
+            SLICE_COLUMNS + ["repayment_status_id", "payment_count", "demand_amount", "amount_collected"],
+            _aggregate_select(slice_keys)
+        )
+    )
+
+def rebuild_collection_summary_snapshot(db: Session) -> None:
+    """Rebuild the whole snapshot from payment_details (caller commits)"""
+    connection = db.connection()
+    connection.execute(delete(CollectionSummarySnapshot))
+    _insert_aggregates(connection)
+
+def refresh_collection_summary_for_payments(db: Session, payment_ids: List[int]) -> None:
+    """
+    Recompute the snapshot slices that contain the given payments. Call after the
+    payment changes are flushed and before commit, so the snapshot changes in the
+    same transaction as the rows it summarises.
+    """
+    payment_ids = [int(payment_id) for payment_id in set(payment_ids) if payment_id is not None]
+    if not payment_ids:
+        return
+
+    db.flush()
+    connection = db.connection()
+
+    slice_keys = [
+        tuple(row) for row in connection.execute(
+            _with_source_joins(select(*_source_columns()))
+            .where(PaymentDetails.id.in_(payment_ids))
+            .distinct()
+        )
+    ]
+    if not slice_keys:
+        return
+
+    # Aggregate with a plain SELECT first: unlike INSERT ... SELECT it is a non-locking
+    # read, so a status change doesn't take shared locks on the rest of the month
+    rows = [dict(row) for row in connection.execute(_aggregate_select(slice_keys)).mappings()]
+
+    snapshot_slice = tuple_(*[getattr(CollectionSummarySnapshot, column) for column in SLICE_COLUMNS])
+    connection.execute(delete(CollectionSummarySnapshot).where(snapshot_slice.in_(slice_keys)))
+    if rows:
+        connection.execute(insert(CollectionSummarySnapshot), rows)
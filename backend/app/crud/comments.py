@@ -3,6 +3,7 @@ from sqlalchemy import desc, func
 from typing import List, Dict, Any
 from app.models.comments import Comments
 from app.models.user import User
+from app.models.payment_link import payment_key_filter
 from app.schemas.comments import CommentCreate, CommentTypeEnum
 
 def create_comment(db: Session, comment: CommentCreate, user_name: str) -> Dict[str, Any]:
@@ -33,7 +34,7 @@ def get_comments_by_repayment(db: Session, repayment_id: str, skip: int = 0, lim
     """Get all comments by repayment_id (which is payment_details.id)"""
     comments = db.query(Comments, User.name.label('user_name'))\
         .join(User, Comments.user_id == User.id)\
-        .filter(Comments.repayment_id == repayment_id)\
+        .filter(payment_key_filter(Comments, [repayment_id]))\
         .order_by(desc(Comments.commented_at))\
         .offset(skip)\
         .limit(limit)\
@@ -59,7 +60,7 @@ def get_comments_by_repayment_and_type(db: Session, repayment_id: str, comment_t
     comments = db.query(Comments, User.name.label('user_name'))\
         .join(User, Comments.user_id == User.id)\
         .filter(
-            Comments.repayment_id == repayment_id,
+            payment_key_filter(Comments, [repayment_id]),
             Comments.comment_type == comment_type.value  # Use integer value for filtering
         )\
         .order_by(desc(Comments.commented_at))\
@@ -84,11 +85,18 @@ def get_comments_by_repayment_and_type(db: Session, repayment_id: str, comment_t
 
 def get_comments_count_by_repayment(db: Session, repayment_id: str) -> int:
     """Get count of all comments for a repayment_id"""
-    return db.query(Comments).filter(Comments.repayment_id == repayment_id).count()
+    return db.query(Comments).filter(payment_key_filter(Comments, [repayment_id])).count()
 
 def get_comments_count_by_repayment_and_type(db: Session, repayment_id: str, comment_type: CommentTypeEnum) -> int:
     """Get count of comments for a repayment_id by specific type"""
     return db.query(Comments).filter(
-        Comments.repayment_id == repayment_id,
+        payment_key_filter(Comments, [repayment_id]),
         Comments.comment_type == comment_type.value  # Use integer value for filtering
-    ).count()
\ No newline at end of file
+    ).count()
+
+def get_comments_count_by_type(db: Session, repayment_id: str) -> Dict[int, int]:
+    """Count of comments for a repayment_id per comment type, from one grouped query"""
+    rows = db.query(Comments.comment_type, func.count(Comments.id)).filter(
+        payment_key_filter(Comments, [repayment_id])
+    ).group_by(Comments.comment_type).all()
+    return {comment_type: count for comment_type, count in rows}
@@ -0,0 +1,137 @@
+import logging
+from sqlalchemy import select, literal, null, String, union_all
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Iterable, Optional
+from app.models.co_applicant import CoApplicant
+from app.models.guarantor import Guarantor
+from app.models.reference import Reference
+from app.models.applicant_details import ApplicantDetails
+from app.models.loan_details import LoanDetails
+from app.models.phone_directory import PhoneDirectory, normalize_phone
+from app.schemas.contact_types import ContactTypeEnum
+
+logger = logging.getLogger(__name__)
+
+# Most loan ids accepted by one batch contacts call
+MAX_CONTACTS_BATCH = 200
+
+# Contact table and response list of each contact type, in response order
+_CONTACT_TABLES = {
+    ContactTypeEnum.co_applicant: (CoApplicant, "co_applicants"),
+    ContactTypeEnum.guarantor: (Guarantor, "guarantors"),
+    ContactTypeEnum.reference: (Reference, "references")
+}
+
+def _contacts_select(loan_ids):
+    """UNION ALL of the applicant and every co-applicant, guarantor and reference of the loans"""
+    applicants = select(
+        LoanDetails.loan_application_id,
+        literal(ContactTypeEnum.applicant.value).label("contact_type"),
+        ApplicantDetails.id.label("contact_id"),
+        ApplicantDetails.applicant_id,
+        ApplicantDetails.first_name,
+        ApplicantDetails.middle_name,
+        ApplicantDetails.last_name,
+        ApplicantDetails.mobile
+    ).join(
+        ApplicantDetails, ApplicantDetails.applicant_id == LoanDetails.applicant_id
+    ).where(LoanDetails.loan_application_id.in_(loan_ids))
+
+    contacts = [
+        select(
+            model.loan_application_id,
+            literal(contact_type.value).label("contact_type"),
+            model.id.label("contact_id"),
+            null().cast(String).label("applicant_id"),
+            model.first_name,
+            model.middle_name,
+            model.last_name,
+            model.mobile
+        ).where(model.loan_application_id.in_(loan_ids))
+        for contact_type, (model, _) in _CONTACT_TABLES.items()
+    ]
+    union = union_all(applicants, *contacts).subquery()
+    return select(union).order_by(union.c.loan_application_id, union.c.contact_type, union.c.contact_id)
+
+def _contact_info(row, contact_type: str) -> Dict[str, Any]:
+    name = " ".join(part for part in (row.first_name, row.middle_name, row.last_name) if part)
+    return {
+        "id": row.contact_id,
+        "name": name or "Unknown Name",
+        "phone": row.mobile,
+        "email": None,  # Contact tables have no email column
+        "type": contact_type
+    }
+
+def get_application_contacts_batch(db: Session, loan_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Contacts of many loans from one UNION ALL query, keyed by loan id. Loans without
+    an applicant are left out, like get_application_contacts() returning None.
+    """
+    loan_ids = sorted(set(loan_ids))
+    if len(loan_ids) > MAX_CONTACTS_BATCH:
+        raise ValueError(f"At most {MAX_CONTACTS_BATCH} loan ids per request, got {len(loan_ids)}")
+    if not loan_ids:
+        return {}
+
+    applicants = {}
+    contacts = {loan_id: {name: [] for _, name in _CONTACT_TABLES.values()} for loan_id in loan_ids}
+    for row in db.execute(_contacts_select(loan_ids)):
+        contact_type = ContactTypeEnum(row.contact_type)
+        if contact_type == ContactTypeEnum.applicant:
+            applicants[row.loan_application_id] = {
+                "id": row.applicant_id,
+                "name": f"{row.first_name or ''} {row.last_name or ''}".strip(),
+                "phone": row.mobile,
+                "email": None,
+                "type": "applicant"
+            }
+        else:
+            contacts[row.loan_application_id][_CONTACT_TABLES[contact_type][1]].append(
+                _contact_info(row, contact_type.name)
+            )
+
+    response = {
+        loan_id: {"loan_id": loan_id, "applicant": applicants[loan_id], **contacts[loan_id]}
+        for loan_id in loan_ids if loan_id in applicants
+    }
+    logger.debug("Loaded contacts of %d of %d loans", len(response), len(loan_ids))
+    return response
+
+def get_application_contacts(db: Session, loan_id_int: int) -> Optional[Dict[str, Any]]:
+    """Get all contacts (applicant, co-applicants, guarantors, references) for a loan, or None if the loan has no applicant"""
+    response = get_application_contacts_batch(db, [loan_id_int]).get(loan_id_int)
+    if response:
+        logger.debug(
+            "Contacts of loan %s: %d co-applicants, %d guarantors, %d references", loan_id_int,
+            len(response["co_applicants"]), len(response["guarantors"]), len(response["references"])
+        )
+    return response
+
+def find_contacts_by_phone(db: Session, phone: str) -> Dict[str, Any]:
+    """Loans and contact roles with this mobile number, from one probe of the phone_directory index"""
+    normalized = normalize_phone(phone)
+    if not normalized:
+        raise ValueError(f"No digits in phone number: {phone}")
+    
+    rows = db.query(
+        PhoneDirectory.loan_application_id,
+        PhoneDirectory.contact_type,
+        PhoneDirectory.contact_id
+    ).filter(
+        PhoneDirectory.phone == normalized
+    ).order_by(
+        PhoneDirectory.loan_application_id, PhoneDirectory.contact_type, PhoneDirectory.contact_id
+    ).all()
+    
+    return {
+        "phone": normalized,
+        "matches": [
+            {
+                "loan_id": row.loan_application_id,
+                "contact_type": ContactTypeEnum(row.contact_type).name,
+                "contact_id": row.contact_id
+            }
+            for row in rows
+        ]
+    }
@@ -1,69 +1,39 @@
 from sqlalchemy.orm import Session, aliased
-from app.models.branch import Branch
-from app.models.dealer import Dealer
-from app.models.lenders import Lender
-from app.models.repayment_status import RepaymentStatus
-from app.models.vehicle_status import VehicleStatus
 from app.models.payment_details import PaymentDetails
 from app.models.user import User
-from datetime import date, timedelta
+from app.crud.lookups import lookups
+from app.core.cache import TTLCache
+from app.core.config import settings
 
+# Filter options change rarely, so the whole payload is cached per worker process
+_filter_options_cache = TTLCache(ttl_seconds=settings.FILTER_OPTIONS_CACHE_TTL_SECONDS)
+_FILTER_OPTIONS_KEY = "filter_options"
 
+def invalidate_filter_options_cache() -> None:
+    """Drop the cached filter options (call after users, branches, dealers or lenders change)"""
+    _filter_options_cache.invalidate()
 
-def filter_options(db: Session):
-    today = date.today()
-    tomorrow = today + timedelta(days=1)
-
-
-    emi_months = sorted(list(set([
-    row[0].strftime("%Y-%m") 
-    for row in db.query(PaymentDetails.demand_date.distinct()).all() 
-    if row[0]
-])))
-    
-    # FIXED: Use ptp_date for PTP filtering, not payment_date
-    raw_dates = [
-        row[0] for row in db.query(PaymentDetails.ptp_date)
-        .filter(PaymentDetails.ptp_date != None)
-        .all()
-    ]
-    
-    ptp_categories = {
-        "Overdue PTP": 0,
-        "Today's PTP": 0,
-        "Tomorrow's PTP": 0,
-        "Future PTP": 0,
-        "No PTP": 0
-    }
-
-    # FIXED: Calculate PTP categories based on ptp_date
-    for ptp_date in raw_dates:
-        if hasattr(ptp_date, 'date'):
-            ptp_date = ptp_date.date()
-        if ptp_date < today:
-            ptp_categories["Overdue PTP"] += 1
-        elif ptp_date == today:
-            ptp_categories["Today's PTP"] += 1
-        elif ptp_date == tomorrow:
-            ptp_categories["Tomorrow's PTP"] += 1
-        elif ptp_date > tomorrow:
-            ptp_categories["Future PTP"] += 1
-
-    # FIXED: Count records with no PTP date (ptp_date is NULL)
-    no_ptp_count = db.query(PaymentDetails).filter(PaymentDetails.ptp_date.is_(None)).count()
-    ptp_categories["No PTP"] = no_ptp_count
+def filter_options_cache_stats() -> dict:
+    """Hit/miss counters and size of the filter options cache"""
+    return _filter_options_cache.stats()
 
-    
-
-
-
-    branches =  [b.name for b in db.query(Branch).all()]
-    dealers = [d.name for d in db.query(Dealer).all()]
-    lenders = [l.name for l in db.query(Lender).all()]
-    statuses = [r.repayment_status for r in db.query(RepaymentStatus).all()]
-    vehicle_statuses = [v.vehicle_status for v in db.query(VehicleStatus).all()]
-    team_leads = [u.name for u in db.query(User).filter(User.role == "TL")]
-    rms = [u.name for u in db.query(User).filter(User.role == "RM")]
+def filter_options(db: Session):
+    return _filter_options_cache.get_or_set(_FILTER_OPTIONS_KEY, lambda: _load_filter_options(db))
+
+def _load_filter_options(db: Session):
+    emi_months = sorted(set(
+        row[0].strftime("%Y-%m")
+        for row in db.query(PaymentDetails.demand_date.distinct()).all()
+        if row[0]
+    ))
+
+    branches = lookups.names(db, "branch")
+    dealers = lookups.names(db, "dealer")
+    lenders = lookups.names(db, "lender")
+    statuses = lookups.names(db, "repayment_status")
+    vehicle_statuses = lookups.names(db, "vehicle_status")
+    team_leads = [u.name for u in db.query(User.name).filter(User.role == "TL")]
+    rms = [u.name for u in db.query(User.name).filter(User.role == "RM")]
     demand_num = [str(row[0]) for row in db.query(PaymentDetails.demand_num.distinct()).filter(PaymentDetails.demand_num != None).all()]  # 🎯 ADDED! Unique demand numbers
 
     return {
@@ -73,12 +43,9 @@ def filter_options(db: Session):
         "lenders": lenders,
         "statuses": statuses,
         # FIXED: Return PTP filter values that match API expectations
-        "ptpDateOptions": ["overdue", "today", "tomorrow", "future", "no_ptp"], 
+        "ptpDateOptions": ["overdue", "today", "tomorrow", "future", "no_ptp"],
         "vehicle_statuses": vehicle_statuses,
         "team_leads": team_leads,
         "rms": rms,
         "demand_num": demand_num,  # 🎯 ADDED! Demand numbers for filtering
     }
-    
-
-
@@ -0,0 +1,124 @@
+import threading
+import time
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from app.models.repayment_status import RepaymentStatus
+from app.models.contact_calling import ContactCalling
+from app.models.demand_calling import DemandCalling
+from app.models.ownership_type import OwnershipType
+from app.models.vehicle_status import VehicleStatus
+from app.models.branch import Branch
+from app.models.dealer import Dealer
+from app.models.lenders import Lender
+from app.core.config import settings
+
+# Lookup name -> (id column, name column)
+LOOKUP_SOURCES = {
+    "repayment_status": (RepaymentStatus.id, RepaymentStatus.repayment_status),
+    "contact_calling": (ContactCalling.id, ContactCalling.contact_calling_status),
+    "demand_calling": (DemandCalling.id, DemandCalling.demand_calling_status),
+    "ownership_type": (OwnershipType.id, OwnershipType.ownership_type_name),
+    "vehicle_status": (VehicleStatus.id, VehicleStatus.vehicle_status),
+    "branch": (Branch.id, Branch.name),
+    "dealer": (Dealer.id, Dealer.name),
+    "lender": (Lender.id, Lender.name),
+}
+
+class LookupTable:
+    """Immutable id <-> name mapping of one lookup table"""
+
+    def __init__(self, rows):
+        self._names: Dict[int, str] = {}
+        self._ids: Dict[str, List[int]] = {}
+        for lookup_id, name in sorted(rows, key=lambda row: row[0]):
+            name = getattr(name, "value", name)  # Enum columns -> plain string
+            self._names[lookup_id] = name
+            if name is not None:
+                self._ids.setdefault(name, []).append(lookup_id)
+
+    def name(self, lookup_id: Any) -> Optional[str]:
+        return self._names.get(lookup_id)
+
+    def ids(self, name: str) -> List[int]:
+        """All ids with this name (names are not unique for branch, dealer and lender)"""
+        return list(self._ids.get(name, []))
+
+    def id(self, name: str) -> Optional[int]:
+        ids = self._ids.get(name)
+        return ids[0] if ids else None
+
+    def names(self) -> List[str]:
+        """Names in id order"""
+        return [name for name in self._names.values() if name is not None]
+
+    def __contains__(self, lookup_id: Any) -> bool:
+        return lookup_id in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+class LookupRegistry:
+    """
+    Process-wide copy of the small lookup tables, so CRUD code can translate ids to
+    names (and back) without a query. Loaded at startup or on first use, reloaded
+    when older than ttl_seconds (0 disables expiry) or on demand via reload().
+    """
+
+    def __init__(self, ttl_seconds: int = 0):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._tables: Optional[Dict[str, LookupTable]] = None
+        self._loaded_at: Optional[float] = None
+        self.loads = 0
+
+    def _is_stale(self) -> bool:
+        if self._tables is None:
+            return True
+        return bool(self.ttl_seconds) and time.monotonic() - self._loaded_at >= self.ttl_seconds
+
+    def reload(self, db: Session) -> None:
+        """Re-read every lookup table and swap the whole set in at once"""
+        tables = {
+            lookup: LookupTable(db.query(id_column, name_column).all())
+            for lookup, (id_column, name_column) in LOOKUP_SOURCES.items()
+        }
+        with self._lock:
+            self._tables = tables
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+
+    def invalidate(self) -> None:
+        """Force a reload on next use"""
+        with self._lock:
+            self._tables = None
+
+    def table(self, db: Session, lookup: str) -> LookupTable:
+        if self._is_stale():
+            self.reload(db)
+        return self._tables[lookup]
+
+    def name(self, db: Session, lookup: str, lookup_id: Any) -> Optional[str]:
+        return self.table(db, lookup).name(lookup_id)
+
+    def id(self, db: Session, lookup: str, name: str) -> Optional[int]:
+        return self.table(db, lookup).id(name)
+
+    def ids(self, db: Session, lookup: str, name: str) -> List[int]:
+        return self.table(db, lookup).ids(name)
+
+    def names(self, db: Session, lookup: str) -> List[str]:
+        return self.table(db, lookup).names()
+
+    def stats(self) -> dict:
+        with self._lock:
+            tables = self._tables
+            loaded_at = self._loaded_at
+        return {
+            "loaded": tables is not None,
+            "age_seconds": round(time.monotonic() - loaded_at, 1) if tables is not None else None,
+            "ttl_seconds": self.ttl_seconds,
+            "loads": self.loads,
+            "sizes": {lookup: len(table) for lookup, table in tables.items()} if tables is not None else {}
+        }
+
+lookups = LookupRegistry(ttl_seconds=settings.LOOKUP_TTL_SECONDS)
@@ -24,6 +24,10 @@ def get_month_dropdown_options(
     if not payment_records:
         raise ValueError(f"No payment records found for loan_id: {loan_id}")
     
+    return build_month_options(loan_id, payment_records)
+
+def build_month_options(loan_id: str, payment_records) -> Dict[str, Any]:
+    """Month dropdown response from a loan's payment records (anything with id and demand_date), in demand_date order"""
     months = []
     current_date = date.today()
     
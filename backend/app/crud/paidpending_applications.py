@@ -1,31 +1,88 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc, func
 from sqlalchemy.orm import aliased
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.models.payment_details import PaymentDetails
 from app.models.loan_details import LoanDetails
 from app.models.applicant_details import ApplicantDetails
-from app.models.branch import Branch
-from app.models.dealer import Dealer
-from app.models.lenders import Lender
 from app.models.user import User
 from app.models.comments import Comments
-from app.models.repayment_status import RepaymentStatus
+from app.models.payment_link import payment_key, payment_key_filter
+from app.crud.lookups import lookups
+from app.crud.application_row import emi_month_to_date_range
+from app.utils.helpers import encode_cursor, decode_cursor, keyset_after
+
+def _load_paid_pending_comments(
+    db: Session,
+    repayment_keys: List[str],
+    max_per_payment: Optional[int] = None
+) -> Dict[str, List[str]]:
+    """
+    Load paid pending comments (comment_type = 2) for many payments in one query,
+    newest first. With max_per_payment, only that many comments are kept per payment.
+    """
+    comments_by_payment: Dict[str, List[str]] = {key: [] for key in repayment_keys}
+    if not repayment_keys:
+        return comments_by_payment
+
+    filters = and_(
+        payment_key_filter(Comments, repayment_keys),
+        Comments.comment_type == 2  # Paid pending comments
+    )
+
+    if max_per_payment is None:
+        rows = (
+            db.query(payment_key(Comments).label("repayment_id"), Comments.comment)
+            .filter(filters)
+            .order_by(desc(Comments.commented_at), desc(Comments.id))
+            .all()
+        )
+    else:
+        # Rank comments per payment so the cap is applied in the database
+        ranked = (
+            db.query(
+                payment_key(Comments).label("repayment_id"),
+                Comments.comment,
+                func.row_number().over(
+                    partition_by=payment_key(Comments),
+                    order_by=(desc(Comments.commented_at), desc(Comments.id))
+                ).label("rn")
+            )
+            .filter(filters)
+            .subquery()
+        )
+        rows = (
+            db.query(ranked.c.repayment_id, ranked.c.comment)
+            .filter(ranked.c.rn <= max_per_payment)
+            .order_by(ranked.c.repayment_id, ranked.c.rn)
+            .all()
+        )
+
+    for row in rows:
+        comments_by_payment.setdefault(str(row.repayment_id), []).append(row.comment)
+    return comments_by_payment
+
+# Newest demand first; payment_id makes the order total for keyset paging
+PAID_PENDING_SORT_COLUMNS = [PaymentDetails.demand_date, PaymentDetails.id]
 
 def get_paid_pending_applications(
     db: Session,
     skip: int = 0,
-    limit: int = 100
-) -> List[Dict[str, Any]]:
-    """Get all applications that are in 'Paid(Pending Approval)' status"""
+    limit: int = 100,
+    branch: str = "",
+    rm_name: str = "",
+    emi_month: str = "",
+    cursor: str = "",  # Opaque keyset cursor from a previous page's next_cursor
+    include_total: bool = True,
+    max_comments: Optional[int] = None  # Newest comments kept per row; None keeps all
+) -> Dict[str, Any]:
+    """Get applications that are in 'Paid(Pending Approval)' status, one page at a time"""
     
     # Get the Paid(Pending Approval) status ID
-    paid_pending_approval_status = db.query(RepaymentStatus).filter(
-        RepaymentStatus.repayment_status == "Paid(Pending Approval)"
-    ).first()
+    paid_pending_approval_status_id = lookups.id(db, "repayment_status", "Paid(Pending Approval)")
     
-    if not paid_pending_approval_status:
-        return []
+    if paid_pending_approval_status_id is None:
+        return {"total": 0 if include_total else None, "results": [], "next_cursor": None}
     
     # Create aliases for User table (RM and TL)
     RM = aliased(User)
@@ -41,39 +98,69 @@ def get_paid_pending_applications(
             PaymentDetails.id.label("repayment_id"),  # 🎯 CHANGED! From demand_date to repayment_id
             PaymentDetails.ptp_date.label("ptp_date"),
             PaymentDetails.amount_collected.label("amount_collected"),
-            Branch.name.label("branch"),
+            PaymentDetails.demand_date,
+            ApplicantDetails.branch_id,  # Branch, dealer and lender names come from the lookup registry
             RM.name.label("rm_name"),
             TL.name.label("tl_name"),
-            Dealer.name.label("dealer"),
-            Lender.name.label("lender"),
+            ApplicantDetails.dealer_id,
+            LoanDetails.lenders_id,
             PaymentDetails.id.label("payment_id")
         )
         .select_from(PaymentDetails)
         .join(LoanDetails, PaymentDetails.loan_application_id == LoanDetails.loan_application_id)
         .join(ApplicantDetails, LoanDetails.applicant_id == ApplicantDetails.applicant_id)
-        .join(Branch, ApplicantDetails.branch_id == Branch.id)
-        .join(Dealer, ApplicantDetails.dealer_id == Dealer.id)
-        .join(Lender, LoanDetails.lenders_id == Lender.id)
         .join(RM, LoanDetails.Collection_relationship_manager_id == RM.id)
         .join(TL, LoanDetails.source_relationship_manager_id == TL.id)
-        .filter(PaymentDetails.repayment_status_id == paid_pending_approval_status.id)
-        .order_by(desc(PaymentDetails.demand_date))
+        .filter(
+            PaymentDetails.repayment_status_id == paid_pending_approval_status_id,
+            # Lookup ids replace inner joins to the lookup tables, so rows without them stay excluded
+            ApplicantDetails.branch_id.isnot(None),
+            ApplicantDetails.dealer_id.isnot(None),
+            LoanDetails.lenders_id.isnot(None)
+        )
+    )
+    
+    if branch:
+        query = query.filter(ApplicantDetails.branch_id.in_(lookups.ids(db, "branch", branch)))
+    
+    if rm_name:
+        query = query.filter(RM.name == rm_name)
+    
+    if emi_month:
+        month_start, month_end = emi_month_to_date_range(emi_month)
+        query = query.filter(
+            PaymentDetails.demand_date >= month_start,
+            PaymentDetails.demand_date < month_end
+        )
+    
+    # Total is computed before the keyset predicate so it always covers the whole filter
+    total = query.count() if include_total else None
+    
+    sort_columns = PAID_PENDING_SORT_COLUMNS
+    query = query.order_by(*[column.desc() for column in sort_columns])
+    
+    if cursor:
+        # Keyset mode: seek past the last row of the previous page instead of OFFSET
+        query = query.filter(keyset_after(sort_columns, decode_cursor(cursor, len(sort_columns)), descending=True))
+    elif skip:
+        query = query.offset(skip)
+    
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last.demand_date, last.payment_id])
+    
+    # Comments for the whole page in one query instead of one per row
+    comments_by_payment = _load_paid_pending_comments(
+        db, [str(row.payment_id) for row in rows], max_comments
     )
     
-    total = query.count()
     results = []
     
-    for row in query.offset(skip).limit(limit).all():
-        # Get comments for this payment (type 2 - paid pending comments)
-        comments = db.query(Comments).filter(
-            and_(
-                Comments.repayment_id == str(row.payment_id),
-                Comments.comment_type == 2  # Paid pending comments
-            )
-        ).order_by(desc(Comments.commented_at)).all()
-        
-        comment_list = [c.comment for c in comments]
-        
+    for row in rows:
         results.append({
             "loan_id": str(row.loan_id),
             "applicant_name": f"{row.first_name or ''} {row.last_name or ''}".strip(),
@@ -81,12 +168,16 @@ def get_paid_pending_applications(
             "repayment_id": str(row.repayment_id),  # 🎯 CHANGED! From demand_date to repayment_id
             "ptp_date": row.ptp_date.strftime('%Y-%m-%d') if row.ptp_date else None,
             "amount_collected": float(row.amount_collected) if row.amount_collected else None,
-            "branch": row.branch,
+            "branch": lookups.name(db, "branch", row.branch_id),
             "rm_name": row.rm_name,
             "tl_name": row.tl_name,
-            "dealer": row.dealer,
-            "lender": row.lender,
-            "comments": comment_list
+            "dealer": lookups.name(db, "dealer", row.dealer_id),
+            "lender": lookups.name(db, "lender", row.lenders_id),
+            "comments": comments_by_payment.get(str(row.payment_id), [])
         })
     
-    return results
+    return {
+        "total": total,
+        "results": results,
+        "next_cursor": next_cursor
+    }
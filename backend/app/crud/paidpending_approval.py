@@ -1,9 +1,11 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import Optional
+from sqlalchemy import and_, select, update
+from typing import Any, Dict, List, Optional
 from app.models.payment_details import PaymentDetails
-from app.models.repayment_status import RepaymentStatus
+from app.crud.lookups import lookups
+from app.models.audit_outbox import write_update_outbox_entries
 from app.schemas.paidpending_approval import PaidPendingApprovalRequest
+from app.crud.collection_summary_snapshot import refresh_collection_summary_for_payments
 
 def process_paidpending_approval(
     db: Session,
@@ -23,36 +25,22 @@ def process_paidpending_approval(
         raise ValueError(f"No payment record found for application {approval_data.loan_id} and repayment_id {approval_data.repayment_id}")
     
     # Get current repayment status name BEFORE updating (this is the previous status)
-    previous_status_name = None
-    if payment_record.repayment_status_id:
-        current_status_record = db.query(RepaymentStatus).filter(
-            RepaymentStatus.id == payment_record.repayment_status_id
-        ).first()
-        if current_status_record:
-            previous_status_name = current_status_record.repayment_status
+    previous_status_name = lookups.name(db, "repayment_status", payment_record.repayment_status_id)
     
-    # Check if current status is "Paid(Pending Approval)" (we need to find the ID for this)
-    paid_pending_approval_status = db.query(RepaymentStatus).filter(
-        RepaymentStatus.repayment_status == "Paid(Pending Approval)"
-    ).first()
+    # Status ids come from the lookup registry instead of one query per name
+    status_ids = {}
+    for name in ("Paid(Pending Approval)", "Paid", "Partially Paid", "Paid Rejected"):
+        status_ids[name] = lookups.id(db, "repayment_status", name)
     
-    if not paid_pending_approval_status:
+    if status_ids["Paid(Pending Approval)"] is None:
         raise ValueError("'Paid(Pending Approval)' status not found in repayment_status table")
     
-    if payment_record.repayment_status_id != paid_pending_approval_status.id:
+    if payment_record.repayment_status_id != status_ids["Paid(Pending Approval)"]:
         raise ValueError(f"Current status is '{previous_status_name}', not 'Paid(Pending Approval)'. Cannot process approval.")
     
     # Process based on action
     if approval_data.action == "accept":
         # ACCEPT: Change to "Paid"
-        paid_status = db.query(RepaymentStatus).filter(
-            RepaymentStatus.repayment_status == "Paid"
-        ).first()
-        
-        if not paid_status:
-            raise ValueError("'Paid' status not found in repayment_status table")
-        
-        payment_record.repayment_status_id = paid_status.id
         new_status_name = "Paid"
         message = "Payment approved successfully. Status changed to Paid."
         
@@ -60,29 +48,20 @@ def process_paidpending_approval(
         # REJECT: Check amount and decide status
         if payment_record.amount_collected and float(payment_record.amount_collected) > 0:
             # Has amount → "Partially Paid"
-            partially_paid_status = db.query(RepaymentStatus).filter(
-                RepaymentStatus.repayment_status == "Partially Paid"
-            ).first()
-            
-            if not partially_paid_status:
-                raise ValueError("'Partially Paid' status not found in repayment_status table")
-            
-            payment_record.repayment_status_id = partially_paid_status.id
             new_status_name = "Partially Paid"
             message = f"Payment rejected. Status changed to Partially Paid due to existing amount: {payment_record.amount_collected}"
         else:
             # No amount → "Paid Rejected"
-            paid_rejected_status = db.query(RepaymentStatus).filter(
-                RepaymentStatus.repayment_status == "Paid Rejected"
-            ).first()
-            
-            if not paid_rejected_status:
-                raise ValueError("'Paid Rejected' status not found in repayment_status table")
-            
-            payment_record.repayment_status_id = paid_rejected_status.id
             new_status_name = "Paid Rejected"
             message = "Payment rejected. Status changed to Paid Rejected due to no amount collected."
     
+    if status_ids[new_status_name] is None:
+        raise ValueError(f"'{new_status_name}' status not found in repayment_status table")
+    payment_record.repayment_status_id = status_ids[new_status_name]
+    
+    # Keep the summary snapshot in step with the status change, in the same transaction
+    refresh_collection_summary_for_payments(db, [payment_record.id])
+    
     # Commit changes
     db.commit()
     db.refresh(payment_record)
@@ -97,3 +76,133 @@ def process_paidpending_approval(
         "updated_at": payment_record.updated_at.isoformat() if payment_record.updated_at else None,
         "comments": approval_data.comments
     }
+
+
+def _apply_status_transition(db: Session, payment_ids: List[int], pending_status_id: int, new_status_id: int) -> set:
+    """
+    Move still-pending payments to new_status_id and return the ids that were skipped
+    because their status changed since they were read.
+    """
+    def guarded_update(ids):
+        return db.execute(
+            update(PaymentDetails)
+            .where(
+                PaymentDetails.id.in_(ids),
+                PaymentDetails.repayment_status_id == pending_status_id  # Guards against a concurrent change
+            )
+            .values(repayment_status_id=new_status_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    # One set-based UPDATE normally changes every row, since they are locked
+    savepoint = db.begin_nested()
+    if guarded_update(payment_ids) == len(payment_ids):
+        savepoint.commit()
+        return set()
+
+    # Otherwise undo it and find the skipped rows one by one
+    savepoint.rollback()
+    return {payment_id for payment_id in payment_ids if guarded_update([payment_id]) == 0}
+
+def bulk_process_paidpending_approval(
+    db: Session,
+    items: List[PaidPendingApprovalRequest]
+) -> Dict[str, Any]:
+    """
+    Accept or reject many 'Paid(Pending Approval)' payments in one transaction.
+
+    Status ids are resolved once, every row is checked with one query, and each
+    transition (Paid, Partially Paid, Paid Rejected) is applied with one set-based
+    UPDATE. Items that fail validation are reported and skipped.
+    """
+    status_ids = {}
+    for name in ("Paid(Pending Approval)", "Paid", "Partially Paid", "Paid Rejected"):
+        status_ids[name] = lookups.id(db, "repayment_status", name)
+        if status_ids[name] is None:
+            raise ValueError(f"'{name}' status not found in repayment_status table")
+    pending_status_id = status_ids["Paid(Pending Approval)"]
+
+    # Lock the candidate rows until commit, so no other request can approve, reject or edit
+    # them between this read and the UPDATE below; the statuses read here stay current
+    repayment_ids = {int(item.repayment_id) for item in items if item.repayment_id.isdigit()}
+    rows_by_id = {
+        row["id"]: dict(row) for row in db.execute(
+            select(PaymentDetails.__table__).where(PaymentDetails.id.in_(repayment_ids)).with_for_update()
+        ).mappings()
+    } if repayment_ids else {}
+
+    transitions: Dict[str, List[int]] = {}  # new status name -> payment ids
+    changes = []
+    seen = set()
+    results = []
+    results_by_payment = {}
+
+    for index, item in enumerate(items):
+        result = {
+            "index": index,
+            "loan_id": item.loan_id,
+            "repayment_id": item.repayment_id,
+            "action": item.action.value,
+            "success": False,
+            "previous_status": None,
+            "new_status": None,
+            "comments": item.comments
+        }
+        results.append(result)
+
+        row = rows_by_id.get(int(item.repayment_id)) if item.repayment_id.isdigit() else None
+        if row is None or str(row["loan_application_id"]) != item.loan_id:
+            result["message"] = f"No payment record found for application {item.loan_id} and repayment_id {item.repayment_id}"
+            continue
+        if row["id"] in seen:
+            result["message"] = f"Repayment ID {item.repayment_id} appears more than once in this batch"
+            continue
+        seen.add(row["id"])
+
+        previous_status_name = lookups.name(db, "repayment_status", row["repayment_status_id"])
+        result["previous_status"] = previous_status_name or "Unknown"
+        if row["repayment_status_id"] != pending_status_id:
+            result["message"] = f"Current status is '{previous_status_name}', not 'Paid(Pending Approval)'. Cannot process approval."
+            continue
+
+        if item.action == "accept":
+            new_status_name = "Paid"
+            message = "Payment approved successfully. Status changed to Paid."
+        elif row["amount_collected"] and float(row["amount_collected"]) > 0:
+            new_status_name = "Partially Paid"
+            message = f"Payment rejected. Status changed to Partially Paid due to existing amount: {row['amount_collected']}"
+        else:
+            new_status_name = "Paid Rejected"
+            message = "Payment rejected. Status changed to Paid Rejected due to no amount collected."
+
+        transitions.setdefault(new_status_name, []).append(row["id"])
+        changes.append((row, {**row, "repayment_status_id": status_ids[new_status_name]}))
+        result.update(success=True, new_status=new_status_name, message=message)
+        results_by_payment[row["id"]] = result
+
+    skipped = set()
+    for new_status_name, payment_ids in transitions.items():
+        skipped |= _apply_status_transition(db, payment_ids, pending_status_id, status_ids[new_status_name])
+
+    # Rows the guard skipped were not changed: report them as failed, without audit or snapshot work
+    for payment_id in skipped:
+        result = results_by_payment[payment_id]
+        result.update(
+            success=False, new_status=None,
+            message="Payment status changed concurrently; it is no longer 'Paid(Pending Approval)'"
+        )
+    changes = [(old, new) for old, new in changes if old["id"] not in skipped]
+    write_update_outbox_entries(db, changes)
+
+    # Keep the summary snapshot in step with the status changes, in the same transaction
+    refresh_collection_summary_for_payments(db, [old["id"] for old, _ in changes])
+
+    db.commit()
+
+    succeeded = sum(1 for result in results if result["success"])
+    return {
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "results": results
+    }
@@ -0,0 +1,367 @@
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, and_, select, cast, String
+from app.models.loan_details import LoanDetails
+from app.models.applicant_details import ApplicantDetails
+from app.models.payment_details import PaymentDetails
+from app.models.audit_payment_details import AuditPaymentDetails
+from app.models.comments import Comments
+from app.models.calling import Calling
+from app.models.user import User
+from app.models.co_applicant import CoApplicant
+from app.models.guarantor import Guarantor
+from app.models.reference import Reference
+from app.models.payment_link import payment_key, payment_key_filter
+from app.crud.lookups import lookups
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import json
+
+# Report fields, in output order (mirrors PlanVsAchievementApplication on the frontend)
+PLAN_VS_ACHIEVEMENT_COLUMNS = [
+    ("Applicant ID", "applicant_id"),
+    ("Loan ID", "loan_id"),
+    ("Repayment ID", "repayment_id"),
+    ("Repayment", "repayment"),
+    ("Applicant Name", "applicant_name"),
+    ("Branch", "branch_name"),
+    ("RM", "rm_name"),
+    ("Collection RM", "collection_rm"),
+    ("Team Lead", "team_lead"),
+    ("Dealer", "dealer_name"),
+    ("Lender", "lender_name"),
+    ("Previous PTP Date", "previous_ptp_date"),
+    ("Previous Status", "previous_status"),
+    ("Updated PTP Date", "updated_ptp_date"),
+    ("Updated Status", "updated_status"),
+    ("Calls Made", "calls_made"),
+    ("Demand Calling Status", "demand_calling_status"),
+    ("Comment Trail", "comment_trail"),
+    ("EMI Amount", "emi_amount"),
+    ("Demand Date", "demand_date"),
+    ("Principal Due", "principle_due"),
+    ("Interest Due", "interest_due"),
+    ("Applicant Mobile", "applicant_mobile"),
+    ("Applicant Address", "applicant_address"),
+    ("House Ownership", "house_ownership"),
+    ("FI Location", "fi_location"),
+    ("Co-Applicant Name", "co_applicant_name"),
+    ("Co-Applicant Mobile", "co_applicant_mobile"),
+    ("Co-Applicant Address", "co_applicant_address"),
+    ("Guarantor Name", "guarantor_name"),
+    ("Guarantor Mobile", "guarantor_mobile"),
+    ("Guarantor Address", "guarantor_address"),
+    ("Reference Name", "reference_name"),
+    ("Reference Mobile", "reference_mobile"),
+    ("Reference Address", "reference_address"),
+]
+
+# Prefix of the report fields filled from each contact table
+_CONTACT_MODELS = [
+    ("co_applicant", CoApplicant),
+    ("guarantor", Guarantor),
+    ("reference", Reference),
+]
+
+def _audit_payload(data: Any) -> Dict[str, Any]:
+    """audit_payment_details JSON columns may come back as a dict or as a JSON string"""
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return {}
+    return data if isinstance(data, dict) else {}
+
+def _payment_key(application_id: Any) -> Optional[int]:
+    """audit_payment_details.application_id holds the payment_details.id as text"""
+    try:
+        return int(application_id)
+    except (TypeError, ValueError):
+        return None
+
+def to_local_naive(moment: datetime) -> datetime:
+    """Timestamps are stored as naive local time; convert timezone-aware inputs to it"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+def _date_text(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+def _first_audit_after_subquery(db: Session, moment: datetime, payment_ids: Optional[Sequence[int]] = None):
+    """Audit entries after `moment` ranked per payment; rn = 1 is the first one"""
+    filters = [AuditPaymentDetails.changed_at > moment]
+    if payment_ids is not None:
+        filters.append(AuditPaymentDetails.application_id.in_([str(pid) for pid in payment_ids]))
+
+    return (
+        db.query(
+            AuditPaymentDetails.application_id,
+            AuditPaymentDetails.old_data,
+            func.row_number().over(
+                partition_by=AuditPaymentDetails.application_id,
+                order_by=(AuditPaymentDetails.changed_at.asc(), AuditPaymentDetails.id.asc())
+            ).label("rn")
+        )
+        .filter(*filters)
+        .subquery()
+    )
+
+def _first_audit_after(db: Session, moment: datetime, payment_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    old_data of the first audit entry after `moment`, per payment. That is the state
+    the payment was in at `moment` (empty if it was inserted later); payments without
+    a later entry are unchanged since.
+    """
+    if not payment_ids:
+        return {}
+
+    ranked = _first_audit_after_subquery(db, moment, payment_ids)
+    states: Dict[int, Dict[str, Any]] = {}
+    for row in db.query(ranked.c.application_id, ranked.c.old_data).filter(ranked.c.rn == 1):
+        payment_id = _payment_key(row.application_id)
+        if payment_id is not None:
+            states[payment_id] = _audit_payload(row.old_data)
+    return states
+
+def _planned_payment_ids(db: Session, planned_at: datetime) -> List[int]:
+    """Payments whose PTP date, as of `planned_at`, was the planned day"""
+    planned_day = planned_at.date()
+
+    # Unchanged since the plan: the live row is the state at plan time
+    changed_since = select(AuditPaymentDetails.id).where(
+        AuditPaymentDetails.application_id == cast(PaymentDetails.id, String),
+        AuditPaymentDetails.changed_at > planned_at
+    )
+    current = [
+        row.id for row in
+        db.query(PaymentDetails.id).filter(PaymentDetails.ptp_date == planned_day, ~changed_since.exists())
+    ]
+
+    # Changed since the plan: the first later audit entry holds the state at plan time.
+    # Only the ids are read; the states themselves are loaded per batch
+    ranked = _first_audit_after_subquery(db, planned_at)
+    planned_ptp = ranked.c.old_data["ptp_date"].as_string()
+    changed = [
+        _payment_key(row.application_id) for row in
+        db.query(ranked.c.application_id).filter(ranked.c.rn == 1, planned_ptp.like(f"{planned_day.isoformat()}%"))
+    ]
+    return sorted(set(current) | {payment_id for payment_id in changed if payment_id is not None})
+
+def _format_address(contact: Any) -> Optional[str]:
+    parts = [
+        contact.address_line1, contact.address_line2, contact.address_line3,
+        contact.city, contact.state, contact.pincode
+    ]
+    address = ", ".join(str(part).strip() for part in parts if part not in (None, ""))
+    return address or None
+
+def _full_name(contact: Any) -> Optional[str]:
+    name = " ".join(part for part in (contact.first_name, contact.middle_name, contact.last_name) if part)
+    return name or None
+
+def _load_contacts(db: Session, loan_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """First co-applicant, guarantor and reference per loan, one query per contact table"""
+    contacts: Dict[int, Dict[str, Any]] = {loan_id: {} for loan_id in loan_ids}
+    if not loan_ids:
+        return contacts
+
+    for prefix, model in _CONTACT_MODELS:
+        rows = (
+            db.query(model)
+            .filter(model.loan_application_id.in_(loan_ids))
+            .order_by(model.loan_application_id, model.id)
+            .all()
+        )
+        for contact in rows:
+            fields = contacts.setdefault(contact.loan_application_id, {})
+            if f"{prefix}_name" in fields:
+                continue
+            fields[f"{prefix}_name"] = _full_name(contact)
+            fields[f"{prefix}_mobile"] = contact.mobile
+            fields[f"{prefix}_address"] = _format_address(contact)
+    return contacts
+
+def _load_comment_trails(db: Session, repayment_keys: List[str], since: datetime, until: datetime) -> Dict[str, str]:
+    """Application comments made in (since, until], oldest first, as 'User: comment | ...'"""
+    if not repayment_keys:
+        return {}
+
+    rows = (
+        db.query(payment_key(Comments).label("repayment_id"), Comments.comment, User.name.label("user_name"))
+        .outerjoin(User, Comments.user_id == User.id)
+        .filter(
+            payment_key_filter(Comments, repayment_keys),
+            Comments.comment_type == 1,
+            Comments.commented_at > since,
+            Comments.commented_at <= until
+        )
+        .order_by(Comments.commented_at.asc(), Comments.id.asc())
+        .all()
+    )
+
+    trails: Dict[str, List[str]] = {}
+    for row in rows:
+        trails.setdefault(str(row.repayment_id), []).append(f"{row.user_name or 'Unknown'}: {row.comment}")
+    return {key: " | ".join(parts) for key, parts in trails.items()}
+
+def _load_call_activity(db: Session, repayment_keys: List[str], since: datetime, until: datetime):
+    """Number of calls made in (since, until] and the latest demand calling status in that window"""
+    call_counts: Dict[str, int] = {}
+    demand_statuses: Dict[str, Any] = {}
+    if not repayment_keys:
+        return call_counts, demand_statuses
+
+    key_column = payment_key(Calling)
+    window = and_(
+        payment_key_filter(Calling, repayment_keys),
+        Calling.created_at > since,
+        Calling.created_at <= until
+    )
+
+    for row in db.query(key_column.label("repayment_id"), func.count(Calling.id).label("calls")).filter(window).group_by(key_column):
+        call_counts[str(row.repayment_id)] = row.calls
+
+    ranked = (
+        db.query(
+            key_column.label("repayment_id"),
+            Calling.status_id,
+            func.row_number().over(
+                partition_by=key_column,
+                order_by=(Calling.created_at.desc(), Calling.id.desc())
+            ).label("rn")
+        )
+        .filter(window, Calling.Calling_id == 2, Calling.contact_type == 1)  # Demand calling, applicant
+        .subquery()
+    )
+    for row in db.query(ranked.c.repayment_id, ranked.c.status_id).filter(ranked.c.rn == 1):
+        demand_statuses[str(row.repayment_id)] = lookups.name(db, "demand_calling", row.status_id)
+    return call_counts, demand_statuses
+
+def _load_report_rows(db: Session, payment_ids: List[int]):
+    """Payment, loan and applicant details for a batch of payments in one joined query"""
+    RM = aliased(User)
+    TL = aliased(User)
+    return (
+        db.query(
+            PaymentDetails.id.label("repayment_id"),
+            PaymentDetails.demand_num,
+            PaymentDetails.demand_amount,
+            PaymentDetails.principal_amount,
+            PaymentDetails.interest,
+            PaymentDetails.demand_date,
+            PaymentDetails.ptp_date,
+            PaymentDetails.repayment_status_id,
+            LoanDetails.loan_application_id.label("loan_id"),
+            ApplicantDetails.applicant_id,
+            ApplicantDetails.first_name,
+            ApplicantDetails.middle_name,
+            ApplicantDetails.last_name,
+            ApplicantDetails.mobile,
+            ApplicantDetails.address_line1,
+            ApplicantDetails.address_line2,
+            ApplicantDetails.address_line3,
+            ApplicantDetails.city,
+            ApplicantDetails.state,
+            ApplicantDetails.pincode,
+            ApplicantDetails.fi_loaction,
+            ApplicantDetails.branch_id,
+            ApplicantDetails.dealer_id,
+            ApplicantDetails.ownership_type_id,
+            LoanDetails.lenders_id,
+            RM.name.label("rm_name"),
+            TL.name.label("team_lead")
+        )
+        .select_from(PaymentDetails)
+        .join(LoanDetails, PaymentDetails.loan_application_id == LoanDetails.loan_application_id)
+        .join(ApplicantDetails, LoanDetails.applicant_id == ApplicantDetails.applicant_id)
+        .outerjoin(RM, LoanDetails.Collection_relationship_manager_id == RM.id)
+        .outerjoin(TL, LoanDetails.source_relationship_manager_id == TL.id)
+        .filter(PaymentDetails.id.in_(payment_ids))
+        .all()
+    )
+
+def iter_plan_vs_achievement(
+    db: Session,
+    planned_at: datetime,
+    until: Optional[datetime] = None,
+    batch_size: int = 500
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one plan-vs-achievement row per payment that had a PTP on the day of `planned_at`.
+
+    The plan is the PTP date and status each payment had at `planned_at`; the
+    achievement is its state at `until` (default: now). Both are rebuilt from
+    audit_payment_details: the state at a moment is the old_data of the first audit
+    entry after it, or the live row if nothing changed since. Details, contacts,
+    comments and calls are loaded per batch of payments with set-based queries.
+    """
+    planned_at = to_local_naive(planned_at)
+    until = to_local_naive(until) if until is not None else datetime.now()
+    if until < planned_at:
+        raise ValueError("until must not be earlier than planned_at")
+
+    def status_name(status_id: Any) -> Optional[str]:
+        try:
+            return lookups.name(db, "repayment_status", int(status_id))
+        except (TypeError, ValueError):
+            return None
+
+    payment_ids = _planned_payment_ids(db, planned_at)
+
+    for start in range(0, len(payment_ids), batch_size):
+        batch_ids = payment_ids[start:start + batch_size]
+        repayment_keys = [str(pid) for pid in batch_ids]
+
+        # Grouped by branch name, then applicant
+        rows = sorted(
+            _load_report_rows(db, batch_ids),
+            key=lambda row: (lookups.name(db, "branch", row.branch_id) or "", row.first_name or "", row.last_name or "", row.repayment_id)
+        )
+        state_at_plan = _first_audit_after(db, planned_at, batch_ids)
+        state_at_until = _first_audit_after(db, until, batch_ids)
+        contacts = _load_contacts(db, list({row.loan_id for row in rows}))
+        comment_trails = _load_comment_trails(db, repayment_keys, planned_at, until)
+        call_counts, demand_statuses = _load_call_activity(db, repayment_keys, planned_at, until)
+
+        for row in rows:
+            key = str(row.repayment_id)
+            live = {"ptp_date": row.ptp_date, "repayment_status_id": row.repayment_status_id}
+            previous = state_at_plan.get(row.repayment_id, live)
+            updated = state_at_until.get(row.repayment_id, live)
+
+            item = {
+                "applicant_id": row.applicant_id,
+                "loan_id": row.loan_id,
+                "repayment_id": row.repayment_id,
+                "repayment": str(row.demand_num) if row.demand_num else None,
+                "applicant_name": " ".join(p for p in (row.first_name, row.middle_name, row.last_name) if p),
+                "branch_name": lookups.name(db, "branch", row.branch_id),
+                "rm_name": row.rm_name,
+                "collection_rm": row.rm_name,
+                "team_lead": row.team_lead,
+                "dealer_name": lookups.name(db, "dealer", row.dealer_id),
+                "lender_name": lookups.name(db, "lender", row.lenders_id),
+                "previous_ptp_date": _date_text(previous.get("ptp_date")),
+                "previous_status": status_name(previous.get("repayment_status_id")),
+                "updated_ptp_date": _date_text(updated.get("ptp_date")),
+                "updated_status": status_name(updated.get("repayment_status_id")),
+                "calls_made": call_counts.get(key, 0),
+                "demand_calling_status": demand_statuses.get(key),
+                "comment_trail": comment_trails.get(key, "No comments"),
+                "emi_amount": float(row.demand_amount) if row.demand_amount is not None else None,
+                "demand_date": _date_text(row.demand_date),
+                "principle_due": float(row.principal_amount) if row.principal_amount is not None else None,
+                "interest_due": float(row.interest) if row.interest is not None else None,
+                "applicant_mobile": row.mobile,
+                "applicant_address": _format_address(row),
+                "house_ownership": lookups.name(db, "ownership_type", row.ownership_type_id),
+                "fi_location": row.fi_loaction,
+            }
+            for prefix, _ in _CONTACT_MODELS:
+                for field in ("name", "mobile", "address"):
+                    item[f"{prefix}_{field}"] = contacts.get(row.loan_id, {}).get(f"{prefix}_{field}")
+            yield item
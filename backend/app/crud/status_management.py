@@ -1,13 +1,47 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from typing import Dict, Any
+from sqlalchemy import and_, func, or_, select, insert, update
+from typing import Dict, Any, List
+from decimal import Decimal
 from app.models.payment_details import PaymentDetails
 from app.models.loan_details import LoanDetails
 from app.models.calling import Calling
+from app.models.calling_latest import record_new_calls, load_latest_calls, latest_call
+from app.models.payment_link import payment_link_values
 from app.models.contact_calling import ContactCalling
 from app.models.repayment_status import RepaymentStatus
 from app.schemas.status_management import StatusManagementUpdate, CallingTypeEnum
 from app.schemas.contact_types import ContactTypeEnum
+from app.models.audit_outbox import write_update_outbox_entries
+from app.crud.collection_summary_snapshot import refresh_collection_summary_for_payments
+from app.crud.lookups import lookups
+
+def get_payment_status(db: Session, loan_id_int: int, repayment_id: str, payment_details: PaymentDetails) -> Dict[str, Any]:
+    """Current repayment, PTP and latest calling statuses of one payment"""
+    repayment_status_name = lookups.name(db, "repayment_status", payment_details.repayment_status_id)
+    
+    # Get latest calling records for this application (one row per calling and contact type)
+    latest_calls = load_latest_calls(db, [payment_details.id])
+    latest_demand_calling = latest_call(latest_calls, 2)  # Demand calling
+    latest_contact_calling = latest_call(latest_calls, 1)  # Contact calling, any contact type
+    
+    # Get status names from calling records
+    demand_calling_status = None
+    if latest_demand_calling:
+        demand_calling_status = lookups.name(db, "demand_calling", latest_demand_calling.status_id)
+    
+    contact_calling_status = None
+    if latest_contact_calling:
+        contact_calling_status = lookups.name(db, "contact_calling", latest_contact_calling.status_id)
+    
+    return {
+        "loan_id": loan_id_int,
+        "repayment_id": repayment_id,  # 🎯 ADDED! Return the repayment_id
+        "demand_calling_status": demand_calling_status,
+        "repayment_status": repayment_status_name,
+        "ptp_date": payment_details.ptp_date.isoformat() if payment_details.ptp_date else None,
+        "amount_collected": float(payment_details.amount_collected) if payment_details.amount_collected else None,
+        "contact_calling_status": contact_calling_status
+    }
 
 def update_status_management(
     db: Session, 
@@ -91,24 +125,19 @@ def update_status_management(
         calling_records_created.append("contact_calling")
         updated_fields.append("contact_calling_status")
     
+    # Keep the summary snapshot in step with the payment row, in the same transaction
+    if "repayment_status" in updated_fields or "amount_collected" in updated_fields:
+        refresh_collection_summary_for_payments(db, [payment_record.id])
+    
     # Commit all changes
     db.commit()
     
     # Get existing calling statuses for response
-    existing_demand_calling = db.query(Calling).filter(
-        and_(
-            Calling.repayment_id == repayment_id,
-            Calling.Calling_id == 2  # Demand calling
-        )
-    ).order_by(Calling.created_at.desc()).first()
-    
-    existing_contact_calling = db.query(Calling).filter(
-        and_(
-            Calling.repayment_id == repayment_id,
-            Calling.Calling_id == 1,  # Contact calling
-            Calling.contact_type == (status_data.contact_type or ContactTypeEnum.applicant).value
-        )
-    ).order_by(Calling.created_at.desc()).first()
+    latest_calls = load_latest_calls(db, [payment_record.id])
+    existing_demand_calling = latest_call(latest_calls, 2)  # Demand calling
+    existing_contact_calling = latest_call(
+        latest_calls, 1, (status_data.contact_type or ContactTypeEnum.applicant).value  # Contact calling
+    )
     
     return {
         "loan_id": loan_id,
@@ -123,3 +152,161 @@ def update_status_management(
         "message": f"Updated: {', '.join(updated_fields)}. Calling records created: {', '.join(calling_records_created)}. Repayment ID: {repayment_id}",
         "updated_at": payment_record.updated_at.isoformat() if payment_record.updated_at else None
     }
+
+
+def _resolve_bulk_targets(db: Session, items: List[StatusManagementUpdate]):
+    """
+    Load the payment_details rows targeted by a batch in one query: the given
+    repayment_id, or the loan's first payment when no repayment_id is given.
+    Returns (rows by payment id, first payment id by loan id).
+    """
+    repayment_ids, loan_ids = set(), set()
+    for item in items:
+        try:
+            if item.repayment_id:
+                repayment_ids.add(int(item.repayment_id))
+            else:
+                loan_ids.add(int(item.loan_id))
+        except ValueError:
+            continue  # Reported per item
+
+    first_payment_ids = (
+        select(func.min(PaymentDetails.id))
+        .where(PaymentDetails.loan_application_id.in_(loan_ids))
+        .group_by(PaymentDetails.loan_application_id)
+    )
+    rows = db.execute(
+        select(PaymentDetails.__table__).where(
+            or_(PaymentDetails.id.in_(repayment_ids), PaymentDetails.id.in_(first_payment_ids))
+        )
+    ).mappings().all() if repayment_ids or loan_ids else []
+
+    rows_by_id = {row["id"]: dict(row) for row in rows}
+    first_by_loan = {}
+    for row in sorted(rows_by_id.values(), key=lambda r: r["id"]):
+        if row["loan_application_id"] in loan_ids:
+            first_by_loan.setdefault(row["loan_application_id"], row["id"])
+    return rows_by_id, first_by_loan
+
+def bulk_update_status_management(
+    db: Session,
+    items: List[StatusManagementUpdate],
+    caller_user_id: int
+) -> Dict[str, Any]:
+    """
+    Apply many status management updates in one transaction.
+
+    Target payments are validated with one query, payment_details changes go out as
+    one bulk UPDATE and calling records as one bulk INSERT. Items that fail validation
+    are reported and skipped; the rest are applied.
+    """
+    rows_by_id, first_by_loan = _resolve_bulk_targets(db, items)
+    repayment_statuses = lookups.table(db, "repayment_status")
+    new_values: Dict[int, Dict[str, Any]] = {}
+    calling_rows = []
+    results = []
+
+    for index, item in enumerate(items):
+        result = {"index": index, "loan_id": item.loan_id, "repayment_id": item.repayment_id, "success": False, "updated_fields": []}
+        results.append(result)
+        try:
+            if item.repayment_id:
+                if not item.repayment_id.isdigit():
+                    raise ValueError(f"Invalid repayment_id: {item.repayment_id}")
+                payment_id = int(item.repayment_id)
+                row = rows_by_id.get(payment_id)
+                if row is None:
+                    raise ValueError(f"No payment record found for repayment ID: {item.repayment_id}")
+                if str(row["loan_application_id"]) != item.loan_id:
+                    raise ValueError(f"Repayment ID {item.repayment_id} does not belong to loan ID {item.loan_id}")
+            else:
+                if not item.loan_id.isdigit():
+                    raise ValueError(f"Invalid loan_id: {item.loan_id}")
+                payment_id = first_by_loan.get(int(item.loan_id))
+                if payment_id is None:
+                    raise ValueError(f"No payment record found for loan ID: {item.loan_id}")
+            # An unknown id would fail the foreign key and with it the whole batch
+            if item.repayment_status is not None and item.repayment_status not in repayment_statuses:
+                raise ValueError(f"Unknown repayment_status: {item.repayment_status}")
+        except ValueError as e:
+            result["message"] = str(e)
+            continue
+
+        repayment_id = str(payment_id)
+        updated_fields = result["updated_fields"]
+        values = new_values.setdefault(payment_id, dict(rows_by_id[payment_id]))
+
+        if item.repayment_status is not None:
+            values["repayment_status_id"] = item.repayment_status
+            updated_fields.append("repayment_status")
+        if item.ptp_date is not None:
+            values["ptp_date"] = item.ptp_date
+            updated_fields.append("ptp_date")
+        if item.amount_collected is not None:
+            values["amount_collected"] = Decimal(str(item.amount_collected))
+            updated_fields.append("amount_collected")
+
+        calling_type = item.calling_type or CallingTypeEnum.contact_calling
+        if calling_type == CallingTypeEnum.demand_calling and item.demand_calling_status is not None:
+            calling_rows.append({
+                **payment_link_values(payment_id),  # Core insert bypasses the dual-write events
+                "Calling_id": 2,  # 2 for demand calling
+                "status_id": item.demand_calling_status,
+                "contact_type": ContactTypeEnum.applicant.value
+            })
+            updated_fields.append("demand_calling_status")
+        elif calling_type == CallingTypeEnum.contact_calling and item.contact_calling_status is not None:
+            calling_rows.append({
+                **payment_link_values(payment_id),
+                "Calling_id": 1,  # 1 for contact calling
+                "status_id": item.contact_calling_status,
+                "contact_type": (item.contact_type or ContactTypeEnum.applicant).value
+            })
+            updated_fields.append("contact_calling_status")
+
+        result["repayment_id"] = repayment_id
+        result["success"] = True
+        result["message"] = f"Updated: {', '.join(updated_fields)}. Repayment ID: {repayment_id}"
+
+    # Only payments whose columns actually change are written
+    changes = [
+        (rows_by_id[payment_id], values) for payment_id, values in new_values.items()
+        if values != rows_by_id[payment_id]
+    ]
+    if changes:
+        db.execute(
+            update(PaymentDetails),
+            [
+                {key: values[key] for key in ("id", "repayment_status_id", "ptp_date", "amount_collected")}
+                for _, values in changes
+            ]
+        )
+        write_update_outbox_entries(db, changes)
+
+    if calling_rows:
+        connection = db.connection()
+        calling_insert = insert(Calling).values(caller_user_id=caller_user_id, call_date=func.now())
+        if connection.dialect.insert_executemany_returning:
+            call_ids = list(connection.execute(calling_insert.returning(Calling.id), calling_rows).scalars())
+        else:
+            # Without RETURNING (MySQL) only single-row inserts report their id
+            call_ids = [connection.execute(calling_insert, row).inserted_primary_key[0] for row in calling_rows]
+        # The Core insert bypasses the mapper events that maintain calling_latest
+        record_new_calls(connection, Calling.id.in_(call_ids))
+
+    # Keep the summary snapshot in step with status and amount changes, in the same transaction
+    summary_payment_ids = [
+        old["id"] for old, new in changes
+        if old["repayment_status_id"] != new["repayment_status_id"] or old["amount_collected"] != new["amount_collected"]
+    ]
+    refresh_collection_summary_for_payments(db, summary_payment_ids)
+
+    db.commit()
+
+    succeeded = sum(1 for result in results if result["success"])
+    return {
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "results": results
+    }
@@ -2,18 +2,51 @@ from sqlalchemy.orm import Session, aliased
 from app.models.payment_details import PaymentDetails
 from app.models.applicant_details import ApplicantDetails
 from app.models.loan_details import LoanDetails
-from app.models.branch import Branch
-from app.models.dealer import Dealer
-from app.models.lenders import Lender
 from app.models.user import User
-from app.models.repayment_status import RepaymentStatus
+from app.models.collection_summary_snapshot import CollectionSummarySnapshot as Snapshot
+from app.crud.lookups import lookups
+from app.crud.application_row import REQUIRED_LOOKUP_COLUMNS
+from app.core.config import settings
 from sqlalchemy import func, text, and_, or_
 from fastapi import HTTPException
 from datetime import datetime, date, timedelta
+from typing import List
 
-def get_summary_status_with_filters(
-    db: Session, 
-    emi_month: str = None,
+# Repayment status name -> summary field
+STATUS_SUMMARY_KEYS = {
+    'Future': 'future',
+    'Overdue': 'overdue',
+    'Partially Paid': 'partially_paid',
+    'Paid': 'paid',
+    'Foreclose': 'foreclose',
+    'Paid(Pending Approval)': 'paid_pending_approval',
+    'Paid Rejected': 'paid_rejected'
+}
+
+def _empty_summary() -> dict:
+    # Fixed summary with exact fields as per schema
+    return {
+        'total': 0,
+        'future': 0,
+        'overdue': 0,
+        'partially_paid': 0,
+        'paid': 0,
+        'foreclose': 0,
+        'paid_pending_approval': 0,
+        'paid_rejected': 0
+    }
+
+def _add_status_count(summary: dict, status_str, count: int) -> None:
+    if status_str:
+        key = STATUS_SUMMARY_KEYS.get(status_str)
+        if key and key in summary:
+            summary[key] += count
+        summary['total'] += count
+
+def _build_summary_query(
+    db: Session,
+    group_columns: list,
+    month_years: list = None,
     branch: str = None,
     dealer: str = None,
     lender: str = None,
@@ -23,52 +56,48 @@ def get_summary_status_with_filters(
     ptp_date_filter: str = None,
     repayment_id: str = None,
     demand_num: str = None
-) -> dict:
+):
     """
-    Get summary status with filters applied - same filters as application_row API
+    Build one aggregate query returning (*group_columns, repayment_status_id, count)
+    over the payments the applications list shows: same inner joins to loan, applicant,
+    RM and TL, same required lookup ids. Lookup names (status, branch, dealer, lender)
+    are resolved to ids in memory instead of joined.
     """
     RM = aliased(User)
     TL = aliased(User)
-    
-    # Base query with joins
     query = (
-        db.query(PaymentDetails)
+        db.query(*group_columns, PaymentDetails.repayment_status_id, func.count(PaymentDetails.id))
         .select_from(PaymentDetails)
         .join(LoanDetails, PaymentDetails.loan_application_id == LoanDetails.loan_application_id)
         .join(ApplicantDetails, LoanDetails.applicant_id == ApplicantDetails.applicant_id)
-        .join(Branch, ApplicantDetails.branch_id == Branch.id)
-        .join(Dealer, ApplicantDetails.dealer_id == Dealer.id)
-        .join(Lender, LoanDetails.lenders_id == Lender.id)
         .join(RM, LoanDetails.Collection_relationship_manager_id == RM.id)
         .join(TL, LoanDetails.source_relationship_manager_id == TL.id)
-        .join(RepaymentStatus, PaymentDetails.repayment_status_id == RepaymentStatus.id)
+        .filter(*[column.isnot(None) for column in REQUIRED_LOOKUP_COLUMNS])
     )
     
     # Apply filters (same logic as application_row API)
-    if emi_month:
-        try:
-            dt = datetime.strptime(emi_month, '%b-%y')
-            month, year = dt.month, dt.year
-            query = query.filter(
+    if month_years:
+        query = query.filter(
+            or_(*[
                 and_(
                     PaymentDetails.demand_month == month,
                     PaymentDetails.demand_year == year
                 )
-            )
-        except:
-            pass  # Invalid emi_month format
+                for month, year in month_years
+            ])
+        )
     
     if branch:
-        query = query.filter(Branch.name == branch)
+        query = query.filter(ApplicantDetails.branch_id.in_(lookups.ids(db, "branch", branch)))
     
     if dealer:
-        query = query.filter(Dealer.name == dealer)
+        query = query.filter(ApplicantDetails.dealer_id.in_(lookups.ids(db, "dealer", dealer)))
     
     if lender:
-        query = query.filter(Lender.name == lender)
+        query = query.filter(LoanDetails.lenders_id.in_(lookups.ids(db, "lender", lender)))
     
     if status:
-        query = query.filter(RepaymentStatus.repayment_status == status)
+        query = query.filter(PaymentDetails.repayment_status_id.in_(lookups.ids(db, "repayment_status", status)))
     
     if rm_name:
         query = query.filter(RM.name == rm_name)
@@ -90,54 +119,172 @@ def get_summary_status_with_filters(
         if ptp_date_filter == "overdue":
             query = query.filter(PaymentDetails.ptp_date < today)
         elif ptp_date_filter == "today":
-            query = query.filter(func.date(PaymentDetails.ptp_date) == today)
+            query = query.filter(PaymentDetails.ptp_date == today)  # Bare DATE column keeps ix_payment_details_ptp_date usable
         elif ptp_date_filter == "tomorrow":
-            query = query.filter(func.date(PaymentDetails.ptp_date) == tomorrow)
+            query = query.filter(PaymentDetails.ptp_date == tomorrow)
         elif ptp_date_filter == "future":
             query = query.filter(PaymentDetails.ptp_date > tomorrow)
         elif ptp_date_filter == "no_ptp":
             query = query.filter(PaymentDetails.ptp_date.is_(None))
     
-    # Get filtered results
-    results = (
-        query.with_entities(PaymentDetails.repayment_status_id, func.count(PaymentDetails.id))
-        .group_by(PaymentDetails.repayment_status_id)
-        .all()
+    return query.group_by(*group_columns, PaymentDetails.repayment_status_id)
+
+def _build_snapshot_summary_query(
+    db: Session,
+    group_columns: list,
+    month_years: list = None,
+    branch: str = None,
+    dealer: str = None,
+    lender: str = None,
+    status: str = None,
+    rm_name: str = None,
+    tl_name: str = None
+):
+    """
+    Same result shape as _build_summary_query, answered from collection_summary_snapshot.
+    Filters that are not part of the snapshot key (PTP date, repayment ID, demand
+    number) can only be answered by the live query.
+    """
+    query = (
+        db.query(*group_columns, Snapshot.repayment_status_id, func.sum(Snapshot.payment_count))
+        .select_from(Snapshot)
     )
     
-    # Fixed summary with exact fields as per schema
-    summary = {
-        'total': 0,
-        'future': 0,
-        'overdue': 0,
-        'partially_paid': 0,
-        'paid': 0,
-        'foreclose': 0,
-        'paid_pending_approval': 0,
-        'paid_rejected': 0
-    }
+    if month_years:
+        query = query.filter(
+            or_(*[
+                and_(Snapshot.demand_month == month, Snapshot.demand_year == year)
+                for month, year in month_years
+            ])
+        )
     
-    # Status mapping to exact fields
-    status_map = {
-        'Future': 'future',
-        'Overdue': 'overdue',
-        'Partially Paid': 'partially_paid',
-        'Paid': 'paid',
-        'Foreclose': 'foreclose',
-        'Paid(Pending Approval)': 'paid_pending_approval',
-        'Paid Rejected': 'paid_rejected'
-    }
+    if branch:
+        query = query.filter(Snapshot.branch_id.in_(lookups.ids(db, "branch", branch)))
+    
+    if dealer:
+        query = query.filter(Snapshot.dealer_id.in_(lookups.ids(db, "dealer", dealer)))
+    
+    if lender:
+        query = query.filter(Snapshot.lender_id.in_(lookups.ids(db, "lender", lender)))
     
-    for status_id, count in results:
-        status_str = db.query(RepaymentStatus.repayment_status).filter(RepaymentStatus.id == status_id).scalar()
-        if status_str:
-            key = status_map.get(status_str)
-            if key and key in summary:
-                summary[key] += count
-            summary['total'] += count
+    if status:
+        query = query.filter(Snapshot.repayment_status_id.in_(lookups.ids(db, "repayment_status", status)))
+    
+    if rm_name:
+        RM = aliased(User)
+        query = query.join(RM, Snapshot.rm_id == RM.id).filter(RM.name == rm_name)
+    
+    if tl_name:
+        TL = aliased(User)
+        query = query.join(TL, Snapshot.tl_id == TL.id).filter(TL.name == tl_name)
+    
+    return query.group_by(*group_columns, Snapshot.repayment_status_id)
+
+def _summary_query(
+    db: Session,
+    use_snapshot: bool,
+    live_group_columns: list,
+    snapshot_group_columns: list,
+    month_years: list,
+    ptp_date_filter: str = None,
+    repayment_id: str = None,
+    demand_num: str = None,
+    **dimension_filters
+):
+    """
+    Pick the snapshot query when it is enabled (READ_SUMMARY_SNAPSHOT, after the first
+    rebuild) and can answer the filters, else the live query
+    """
+    if use_snapshot and settings.READ_SUMMARY_SNAPSHOT and not (ptp_date_filter or repayment_id or demand_num):
+        return _build_snapshot_summary_query(db, snapshot_group_columns, month_years, **dimension_filters)
+    
+    return _build_summary_query(
+        db, live_group_columns, month_years,
+        ptp_date_filter=ptp_date_filter, repayment_id=repayment_id, demand_num=demand_num,
+        **dimension_filters
+    )
+
+def get_summary_status_with_filters(
+    db: Session, 
+    emi_month: str = None,
+    branch: str = None,
+    dealer: str = None,
+    lender: str = None,
+    status: str = None,
+    rm_name: str = None,
+    tl_name: str = None,
+    ptp_date_filter: str = None,
+    repayment_id: str = None,
+    demand_num: str = None,
+    use_snapshot: bool = False
+) -> dict:
+    """
+    Get summary status with filters applied - same filters as application_row API.
+    With use_snapshot, counts come from collection_summary_snapshot when possible.
+    """
+    month_years = []
+    if emi_month:
+        try:
+            dt = datetime.strptime(emi_month, '%b-%y')
+            month_years.append((dt.month, dt.year))
+        except:
+            pass  # Invalid emi_month format
+    
+    query = _summary_query(
+        db, use_snapshot, [], [], month_years,
+        branch=branch, dealer=dealer, lender=lender, status=status,
+        rm_name=rm_name, tl_name=tl_name, ptp_date_filter=ptp_date_filter,
+        repayment_id=repayment_id, demand_num=demand_num
+    )
+    
+    summary = _empty_summary()
+    for status_id, count in query.all():
+        _add_status_count(summary, lookups.name(db, "repayment_status", status_id), int(count or 0))
     
     return summary
 
+def get_summary_status_by_months(
+    db: Session,
+    emi_months: List[str],
+    branch: str = None,
+    dealer: str = None,
+    lender: str = None,
+    status: str = None,
+    rm_name: str = None,
+    tl_name: str = None,
+    ptp_date_filter: str = None,
+    repayment_id: str = None,
+    demand_num: str = None,
+    use_snapshot: bool = False
+) -> dict:
+    """
+    Get summary status for several EMI months at once, one breakdown per month,
+    from a single aggregate query grouped by (demand_year, demand_month, status)
+    """
+    # Keep the caller's order and drop duplicates
+    emi_months = list(dict.fromkeys(emi_months))
+    month_keys = {emi_month_to_month_year(emi_month): emi_month for emi_month in emi_months}
+    
+    query = _summary_query(
+        db, use_snapshot,
+        [PaymentDetails.demand_month, PaymentDetails.demand_year],
+        [Snapshot.demand_month, Snapshot.demand_year],
+        list(month_keys.keys()),
+        branch=branch, dealer=dealer, lender=lender, status=status,
+        rm_name=rm_name, tl_name=tl_name, ptp_date_filter=ptp_date_filter,
+        repayment_id=repayment_id, demand_num=demand_num
+    )
+    
+    summaries = {emi_month: _empty_summary() for emi_month in emi_months}
+    for month, year, status_id, count in query.all():
+        emi_month = month_keys.get((month, year))
+        if emi_month:
+            _add_status_count(summaries[emi_month], lookups.name(db, "repayment_status", status_id), int(count or 0))
+    
+    return {
+        "months": [{"emi_month": emi_month, **summaries[emi_month]} for emi_month in emi_months]
+    }
+
 def emi_month_to_month_year(emi_month: str):
     try:
         dt = datetime.strptime(emi_month, '%b-%y')
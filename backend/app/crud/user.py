@@ -2,9 +2,18 @@ from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate
 from app.core.security import verify_password, get_password_hash
+from app.crud.filter_main import invalidate_filter_options_cache
+from app.core.cache import TTLCache
+from app.core.config import settings
 from typing import Optional
 from datetime import datetime
 
+# user id -> identity dict used by get_current_user, so auth skips the users query on a hit
+_user_identity_cache = TTLCache(
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    max_size=settings.USER_CACHE_MAX_SIZE
+)
+
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Get user by email"""
     return db.query(User).filter(User.email == email).first()
@@ -13,6 +22,34 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     """Get user by ID"""
     return db.query(User).filter(User.id == user_id).first()
 
+def get_user_identity(db: Session, user_id: int) -> Optional[dict]:
+    """Get (id, name, email, role, status) for a user, served from a short-lived LRU cache"""
+    identity = _user_identity_cache.get(user_id)
+    if identity is not None:
+        return dict(identity)
+    
+    user = get_user_by_id(db, user_id)
+    if user is None:
+        return None
+    
+    identity = {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "role": user.role,
+        "status": user.status
+    }
+    _user_identity_cache.set(user_id, identity)
+    return dict(identity)
+
+def invalidate_user_identity(user_id: Optional[int] = None) -> None:
+    """Drop a cached user identity (or all of them when user_id is None)"""
+    _user_identity_cache.invalidate(user_id)
+
+def user_identity_cache_stats() -> dict:
+    """Hit/miss counters and size of the user identity cache"""
+    return _user_identity_cache.stats()
+
 def create_user(db: Session, user: UserCreate) -> User:
     """Create new user with hashed password"""
     hashed_password = get_password_hash(user.password)
@@ -28,6 +65,7 @@ def create_user(db: Session, user: UserCreate) -> User:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_filter_options_cache()  # RM/TL lists come from users
     return db_user
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
@@ -49,6 +87,7 @@ def update_user_password(db: Session, user_id: int, new_password: str) -> bool:
     user.password = hashed_password
     user.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_user_identity(user_id)
     return True
 
 def verify_user_password(db: Session, user_id: int, password: str) -> bool:
@@ -71,6 +110,8 @@ def update_user_role(db: Session, user_id: int, new_role: str) -> bool:
     user.role = new_role
     user.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_user_identity(user_id)
+    invalidate_filter_options_cache()  # RM/TL lists come from users
     return True
 
 def delete_user(db: Session, user_id: int) -> bool:
@@ -81,6 +122,8 @@ def delete_user(db: Session, user_id: int) -> bool:
     
     db.delete(user)
     db.commit()
+    invalidate_user_identity(user_id)
+    invalidate_filter_options_cache()  # RM/TL lists come from users
     return True
 
 def get_users(db: Session, skip: int = 0, limit: int = 100) -> list[User]:
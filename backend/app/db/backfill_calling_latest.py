@@ -0,0 +1,58 @@
+import sys
+from app.db.session import SessionLocal
+from app.models.calling import Calling
+from app.models.payment_details import PaymentDetails
+from app.models.calling_latest import CallingLatest, refresh_calling_latest
+from app.db.backfill_payment_id_keys import backfill_model_payment_id
+
+def backfill_calling_latest(payment_ids=None, batch_size: int = 1000):
+    """
+    Rebuild the calling_latest projection from calling in payment id ranges, one short
+    transaction per batch, so status updates aren't blocked while it runs
+    """
+    db = SessionLocal()
+
+    try:
+        # The projection is keyed on calling.payment_id, so older rows need it filled first
+        filled, unresolved = backfill_model_payment_id(db, Calling, batch_size)
+        if filled:
+            print(f"Filled calling.payment_id on {filled} rows ({unresolved} point at no payment)")
+
+        if payment_ids is not None:
+            payment_ids = sorted(set(payment_ids))
+            batches = (payment_ids[start:start + batch_size] for start in range(0, len(payment_ids), batch_size))
+        else:
+            batches = _payment_id_batches(db, batch_size)
+
+        payments = 0
+        for batch in batches:
+            refresh_calling_latest(db.connection(), batch)
+            db.commit()
+            payments += len(batch)
+
+        total = db.query(CallingLatest).count()
+        print(f"Successfully rebuilt calling_latest for {payments} payments ({total} rows)")
+        print("READ_CALLING_LATEST=true can now be enabled")
+
+    except Exception as e:
+        print(f"Error backfilling calling_latest: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def _payment_id_batches(db, batch_size: int):
+    """All payment ids in id order, batch_size at a time"""
+    last_id = 0
+    while True:
+        batch = [
+            payment_id for (payment_id,) in
+            db.query(PaymentDetails.id).filter(PaymentDetails.id > last_id).order_by(PaymentDetails.id).limit(batch_size)
+        ]
+        if not batch:
+            break
+        last_id = batch[-1]
+        yield batch
+
+if __name__ == "__main__":
+    # Optional payment ids: python -m app.db.backfill_calling_latest 101 102
+    backfill_calling_latest([int(arg) for arg in sys.argv[1:]] or None)
@@ -0,0 +1,51 @@
+import sys
+from app.db.session import SessionLocal
+from app.models.loan_details import LoanDetails
+from app.models.loan_current_demand import LoanCurrentDemand, refresh_loan_current_demand
+
+def backfill_loan_current_demand(loan_ids=None, batch_size: int = 1000):
+    """
+    Rebuild the loan_current_demand projection from payment_details in loan id order,
+    one short transaction per batch
+    """
+    db = SessionLocal()
+    
+    try:
+        if loan_ids is not None:
+            loan_ids = sorted(set(loan_ids))
+            batches = (loan_ids[start:start + batch_size] for start in range(0, len(loan_ids), batch_size))
+        else:
+            batches = _loan_id_batches(db, batch_size)
+        
+        loans = 0
+        for batch in batches:
+            refresh_loan_current_demand(db.connection(), batch)
+            db.commit()
+            loans += len(batch)
+        
+        total = db.query(LoanCurrentDemand).count()
+        print(f"Successfully rebuilt loan_current_demand for {loans} loans ({total} rows)")
+        print("READ_LOAN_CURRENT_DEMAND=true can now be enabled")
+        
+    except Exception as e:
+        print(f"Error backfilling loan_current_demand: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def _loan_id_batches(db, batch_size: int):
+    """All loan ids in id order, batch_size at a time"""
+    last_id = None
+    while True:
+        query = db.query(LoanDetails.loan_application_id)
+        if last_id is not None:
+            query = query.filter(LoanDetails.loan_application_id > last_id)
+        batch = [loan_id for (loan_id,) in query.order_by(LoanDetails.loan_application_id).limit(batch_size)]
+        if not batch:
+            break
+        last_id = batch[-1]
+        yield batch
+
+if __name__ == "__main__":
+    # Optional loan ids: python -m app.db.backfill_loan_current_demand 12 15 18
+    backfill_loan_current_demand([int(arg) for arg in sys.argv[1:]] or None)
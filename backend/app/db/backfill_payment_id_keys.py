@@ -0,0 +1,64 @@
+import sys
+from sqlalchemy import update
+from app.db.session import SessionLocal
+from app.models.payment_details import PaymentDetails
+from app.models.payment_link import PAYMENT_LINKED_MODELS, parse_payment_id
+
+def backfill_model_payment_id(db, model, batch_size: int = 1000):
+    """Fill payment_id from repayment_id in id order, one short transaction per batch"""
+    filled = unresolved = 0
+    last_id = 0
+
+    while True:
+        rows = (
+            db.query(model.id, model.repayment_id)
+            .filter(model.id > last_id, model.payment_id.is_(None), model.repayment_id.isnot(None))
+            .order_by(model.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        candidates = {row.id: parse_payment_id(row.repayment_id) for row in rows}
+        wanted = {payment_id for payment_id in candidates.values() if payment_id is not None}
+        existing = {
+            payment_id for (payment_id,) in
+            db.query(PaymentDetails.id).filter(PaymentDetails.id.in_(wanted))
+        } if wanted else set()
+
+        # Only ids of existing payments satisfy the foreign key; the rest stay NULL
+        links = [
+            {"id": row_id, "payment_id": payment_id}
+            for row_id, payment_id in candidates.items() if payment_id in existing
+        ]
+        if links:
+            db.execute(update(model), links)
+        db.commit()
+
+        filled += len(links)
+        unresolved += len(rows) - len(links)
+
+    return filled, unresolved
+
+def backfill_payment_id_keys(batch_size: int = 1000):
+    """Copy the text repayment_id of calling, comments and contacts into the integer payment_id"""
+    db = SessionLocal()
+
+    try:
+        for model in PAYMENT_LINKED_MODELS:
+            filled, unresolved = backfill_model_payment_id(db, model, batch_size)
+            print(f"{model.__tablename__}: filled payment_id on {filled} rows ({unresolved} point at no payment)")
+
+        print("Successfully backfilled payment_id; READ_PAYMENT_ID_KEYS=true can now be enabled")
+
+    except Exception as e:
+        print(f"Error backfilling payment_id: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Optional batch size: python -m app.db.backfill_payment_id_keys 5000
+    backfill_payment_id_keys(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
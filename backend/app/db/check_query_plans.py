@@ -0,0 +1,113 @@
+import itertools
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.db.session import SessionLocal, engine
+from app.models.payment_details import PaymentDetails
+from app.crud.application_row import get_filtered_applications
+from app.crud.paidpending_applications import get_paid_pending_applications
+from app.crud.summary_status import get_summary_status_with_filters
+from app.crud.comments import get_comments_by_repayment_and_type
+from app.crud.contacts import get_application_contacts, find_contacts_by_phone
+from app.crud.plan_vs_achievement import iter_plan_vs_achievement
+from app.crud.application_bundle import get_application_bundle
+from app.schemas.comments import CommentTypeEnum
+
+# Large tables that hot queries must reach through an index
+INDEXED_TABLES = {
+    "payment_details", "calling", "comments", "audit_payment_details", "applicant_search_token", "phone_directory",
+    "applicant_details"
+}
+
+# The optimizer may prefer a full scan on tiny tables, so only estimates above this count
+MIN_ROWS = 1000
+
+def _hot_queries(db):
+    """(name, callable) for each hot CRUD path, with parameters taken from the data"""
+    latest = db.query(PaymentDetails).order_by(PaymentDetails.id.desc()).first()
+    if latest is None:
+        return []
+    emi_month = latest.demand_date.strftime('%b-%y') if latest.demand_date else ""
+    yesterday = datetime.combine(datetime.now().date() - timedelta(days=1), datetime.min.time())
+    next_cursor = get_filtered_applications(db, limit=20, include_total=False)["next_cursor"]
+
+    return [
+        ("applications (current demand)", lambda: get_filtered_applications(db, limit=20)),
+        ("applications (next page)", lambda: get_filtered_applications(db, limit=20, cursor=next_cursor or "")),
+        ("applications (EMI month)", lambda: get_filtered_applications(db, emi_month=emi_month, limit=20)),
+        ("applications (PTP today)", lambda: get_filtered_applications(db, ptp_date_filter="today", limit=20)),
+        ("applications (search)", lambda: get_filtered_applications(db, search="a", limit=20)),
+        ("paid pending list", lambda: get_paid_pending_applications(db, limit=20)),
+        ("summary (EMI month)", lambda: get_summary_status_with_filters(db, emi_month=emi_month)),
+        ("summary (PTP today)", lambda: get_summary_status_with_filters(db, ptp_date_filter="today")),
+        ("comments by repayment", lambda: get_comments_by_repayment_and_type(
+            db, str(latest.id), CommentTypeEnum.application_details
+        )),
+        ("application contacts", lambda: get_application_contacts(db, latest.loan_application_id)),
+        ("application bundle", lambda: get_application_bundle(db, str(latest.loan_application_id))),
+        ("phone lookup", lambda: find_contacts_by_phone(db, "9876543210")),
+        ("plan vs achievement", lambda: list(itertools.islice(
+            iter_plan_vs_achievement(db, yesterday, datetime.now(), batch_size=100), 100
+        ))),
+    ]
+
+def _capture_selects(run):
+    """Run `run` and return the SELECT statements (with parameters) it executed"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+def _full_scans(db, statement, parameters, min_rows: int):
+    """EXPLAIN rows that read a whole indexed table"""
+    plan = db.connection().exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+    return [
+        row for row in plan
+        if row["table"] in INDEXED_TABLES and row["type"] == "ALL" and (row["rows"] or 0) >= min_rows
+    ]
+
+def check_query_plans(min_rows: int = MIN_ROWS):
+    """EXPLAIN every hot query and exit non-zero if any of them full-scans a large table"""
+    db = SessionLocal()
+    regressions = 0
+
+    try:
+        if engine.dialect.name != "mysql":
+            print(f"Query plan check needs MySQL, not {engine.dialect.name}")
+            return 1
+
+        queries = _hot_queries(db)
+        if not queries:
+            print("No payment_details rows: nothing to check")
+            return 0
+
+        for name, run in queries:
+            statements = _capture_selects(run)
+            scans = [scan for statement, parameters in statements for scan in _full_scans(db, statement, parameters, min_rows)]
+            if scans:
+                regressions += 1
+                print(f"❌ {name}: full scan of " + ", ".join(f"{row['table']} (~{row['rows']} rows)" for row in scans))
+            else:
+                print(f"✅ {name}: {len(statements)} queries, all indexed")
+
+        print(f"{regressions} of {len(queries)} hot queries regressed to a full scan")
+        return 1 if regressions else 0
+
+    except Exception as e:
+        print(f"Error checking query plans: {e}")
+        return 1
+    finally:
+        db.rollback()
+        db.close()
+
+if __name__ == "__main__":
+    # Optional minimum estimated row count: python -m app.db.check_query_plans 5000
+    sys.exit(check_query_plans(int(sys.argv[1]) if len(sys.argv) > 1 else MIN_ROWS))
@@ -0,0 +1,27 @@
+from app.db.session import SessionLocal
+from app.models.audit_outbox import AuditOutbox
+from app.services.audit import move_outbox_entries
+
+def flush_audit_outbox(batch_size: int = 500):
+    """Move every pending audit_outbox entry into audit_payment_details"""
+    db = SessionLocal()
+    
+    try:
+        total = 0
+        while True:
+            moved = move_outbox_entries(db, limit=batch_size)
+            total += moved
+            if moved < batch_size:
+                break
+        
+        remaining = db.query(AuditOutbox).count()
+        print(f"Moved {total} audit entries to audit_payment_details ({remaining} still pending)")
+        
+    except Exception as e:
+        print(f"Error flushing audit_outbox: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    flush_audit_outbox()
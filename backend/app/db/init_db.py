@@ -1,10 +1,5 @@
-from app.core.config import settings
-from sqlalchemy import create_engine
 from app.models import Base
-from app.db.session import SessionLocal
-
-# Create database engine
-engine = create_engine(settings.DATABASE_URL)
+from app.db.session import engine
 
 # Create all tables
 def init_db():
@@ -0,0 +1,38 @@
+import sys
+from app.db.session import SessionLocal
+from app.models.loan_details import LoanDetails
+from app.models.applicant_search import ApplicantSearchToken, refresh_applicant_search
+
+def rebuild_applicant_search(batch_size: int = 1000):
+    """Rebuild the applicant_search_token index in loan id order, one short transaction per batch"""
+    db = SessionLocal()
+    
+    try:
+        last_id = None
+        loans = 0
+        while True:
+            query = db.query(LoanDetails.loan_application_id)
+            if last_id is not None:
+                query = query.filter(LoanDetails.loan_application_id > last_id)
+            loan_ids = [loan_id for (loan_id,) in query.order_by(LoanDetails.loan_application_id).limit(batch_size)]
+            if not loan_ids:
+                break
+            last_id = loan_ids[-1]
+            
+            refresh_applicant_search(db.connection(), loan_ids)
+            db.commit()
+            loans += len(loan_ids)
+        
+        total = db.query(ApplicantSearchToken).count()
+        print(f"Successfully rebuilt applicant search index ({loans} loans, {total} tokens)")
+        print("READ_APPLICANT_SEARCH=true can now be enabled")
+        
+    except Exception as e:
+        print(f"Error rebuilding applicant search index: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Optional batch size: python -m app.db.rebuild_applicant_search 5000
+    rebuild_applicant_search(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,23 @@
+from app.db.session import SessionLocal
+from app.models.collection_summary_snapshot import CollectionSummarySnapshot
+from app.crud.collection_summary_snapshot import rebuild_collection_summary_snapshot
+
+def rebuild_snapshot():
+    """Fully rebuild collection_summary_snapshot from payment_details"""
+    db = SessionLocal()
+    
+    try:
+        rebuild_collection_summary_snapshot(db)
+        db.commit()
+        
+        total = db.query(CollectionSummarySnapshot).count()
+        print(f"Successfully rebuilt collection_summary_snapshot ({total} rows)")
+        
+    except Exception as e:
+        print(f"Error rebuilding collection_summary_snapshot: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_snapshot()
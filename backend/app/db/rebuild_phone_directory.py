@@ -0,0 +1,37 @@
+import sys
+from app.db.session import SessionLocal
+from app.models.loan_details import LoanDetails
+from app.models.phone_directory import PhoneDirectory, refresh_phone_directory
+
+def rebuild_phone_directory(batch_size: int = 1000):
+    """Rebuild the phone_directory in loan id order, one short transaction per batch"""
+    db = SessionLocal()
+    
+    try:
+        last_id = None
+        loans = 0
+        while True:
+            query = db.query(LoanDetails.loan_application_id)
+            if last_id is not None:
+                query = query.filter(LoanDetails.loan_application_id > last_id)
+            loan_ids = [loan_id for (loan_id,) in query.order_by(LoanDetails.loan_application_id).limit(batch_size)]
+            if not loan_ids:
+                break
+            last_id = loan_ids[-1]
+            
+            refresh_phone_directory(db.connection(), loan_ids)
+            db.commit()
+            loans += len(loan_ids)
+        
+        total = db.query(PhoneDirectory).count()
+        print(f"Successfully rebuilt phone directory ({loans} loans, {total} numbers)")
+        
+    except Exception as e:
+        print(f"Error rebuilding phone directory: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Optional batch size: python -m app.db.rebuild_phone_directory 5000
+    rebuild_phone_directory(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
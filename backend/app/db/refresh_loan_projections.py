@@ -0,0 +1,58 @@
+import sys
+from typing import Iterable
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.models.payment_details import PaymentDetails
+from app.models.loan_current_demand import refresh_loan_current_demand
+from app.models.applicant_search import refresh_applicant_search
+from app.models.phone_directory import refresh_phone_directory
+from app.crud.collection_summary_snapshot import refresh_collection_summary_for_payments
+
+def refresh_loan_projections(db: Session, loan_ids: Iterable[int]) -> None:
+    """
+    Bring every loan-keyed projection up to date for the given loans: current demand
+    pointer, applicant search index, phone directory and their summary snapshot slices.
+    ORM writes keep these in sync on their own; ingest jobs that write loans, applicants,
+    contacts or payments with bulk/Core statements must call this for the loans they
+    touched before committing (caller commits).
+    """
+    loan_ids = sorted({int(loan_id) for loan_id in loan_ids if loan_id is not None})
+    if not loan_ids:
+        return
+
+    db.flush()
+    connection = db.connection()
+    refresh_loan_current_demand(connection, loan_ids)
+    refresh_applicant_search(connection, loan_ids)
+    refresh_phone_directory(connection, loan_ids)
+
+    payment_ids = [
+        payment_id for (payment_id,) in
+        db.query(PaymentDetails.id).filter(PaymentDetails.loan_application_id.in_(loan_ids))
+    ]
+    refresh_collection_summary_for_payments(db, payment_ids)
+
+def refresh_loans(loan_ids, batch_size: int = 1000):
+    """Refresh the projections of the given loans, one short transaction per batch"""
+    db = SessionLocal()
+    
+    try:
+        loan_ids = sorted(set(loan_ids))
+        for start in range(0, len(loan_ids), batch_size):
+            refresh_loan_projections(db, loan_ids[start:start + batch_size])
+            db.commit()
+        
+        print(f"Successfully refreshed projections for {len(loan_ids)} loans")
+        
+    except Exception as e:
+        print(f"Error refreshing loan projections: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Loan ids touched by an import: python -m app.db.refresh_loan_projections 12 15 18
+    if len(sys.argv) < 2:
+        print("Usage: python -m app.db.refresh_loan_projections <loan_id> [<loan_id> ...]")
+        sys.exit(1)
+    refresh_loans([int(arg) for arg in sys.argv[1:]])
@@ -1,6 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.deps import require_admin
+from app.db.session import SessionLocal, get_pool_status
+from app.crud.filter_main import filter_options_cache_stats, invalidate_filter_options_cache
+from app.crud.lookups import lookups
+from app.crud.user import user_identity_cache_stats
+from app.services.audit import audit_writer
 from app.api.v1.routes import (
     application_row,
     filter_main,
@@ -11,7 +17,8 @@ from app.api.v1.routes import (
     paidpending_approval,
     paidpending_applications,
     contacts,
-    month_dropdown
+    month_dropdown,
+    plan_vs_achievement
 )
 
 app = FastAPI(title="Prosparity Collection Dashboard API", version="1.0.0")
@@ -25,6 +32,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def load_lookups():
+    db = SessionLocal()
+    try:
+        lookups.reload(db)
+    except Exception as e:
+        # Not fatal: the registry loads itself on first use
+        print(f"Could not preload lookup tables: {e}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def start_audit_writer():
+    if settings.AUDIT_WRITER_ENABLED:
+        audit_writer.start()
+
+@app.on_event("shutdown")
+def stop_audit_writer():
+    audit_writer.stop()
+
 # Include routers
 app.include_router(user.router, prefix="/api/v1/users", tags=["Users"])
 app.include_router(application_row.router, prefix="/api/v1/applications", tags=["Applications"])
@@ -36,6 +63,7 @@ app.include_router(paidpending_approval.router, prefix="/api/v1/paidpending-appr
 app.include_router(paidpending_applications.router, prefix="/api/v1/paidpending-applications", tags=["PaidPending Applications"])
 app.include_router(contacts.router, prefix="/api/v1/contacts", tags=["Contacts"])
 app.include_router(month_dropdown.router, prefix="/api/v1/month-dropdown", tags=["Month Dropdown"])
+app.include_router(plan_vs_achievement.router, prefix="/api/v1/reports", tags=["Reports"])
 
 @app.get("/")
 def read_root():
@@ -43,4 +71,34 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/internal/db-pool")
+def db_pool_status(current_user: dict = Depends(require_admin)):
+    """Connection pool occupancy and checkout wait metrics for this worker (Admin only)"""
+    return get_pool_status()
+
+@app.get("/internal/caches")
+def cache_stats(current_user: dict = Depends(require_admin)):
+    """Hit/miss counters of the in-process caches for this worker (Admin only)"""
+    return {
+        "filter_options": filter_options_cache_stats(),
+        "user_identity": user_identity_cache_stats(),
+        "lookups": lookups.stats()
+    }
+
+@app.post("/internal/lookups/reload")
+def reload_lookups(current_user: dict = Depends(require_admin)):
+    """Re-read the lookup tables (statuses, branches, dealers, lenders) in this worker (Admin only)"""
+    db = SessionLocal()
+    try:
+        lookups.reload(db)
+    finally:
+        db.close()
+    invalidate_filter_options_cache()  # Its lists come from the registry
+    return lookups.stats()
+
+@app.get("/internal/audit-writer")
+def audit_writer_status(current_user: dict = Depends(require_admin)):
+    """Queue depth and counters of the background audit writer for this worker (Admin only)"""
+    return audit_writer.stats()
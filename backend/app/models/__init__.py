@@ -17,6 +17,13 @@ from .reference import Reference
 from .audit_applicant_details import AuditApplicantDetails
 from .audit_payment_details import AuditPaymentDetails
 from .vehicle_status import VehicleStatus
+from .loan_current_demand import LoanCurrentDemand
+from .collection_summary_snapshot import CollectionSummarySnapshot
+from .audit_outbox import AuditOutbox
+from . import payment_link  # Dual-writes repayment_id/payment_id on calling, comments and contacts
+from .calling_latest import CallingLatest
+from .applicant_search import ApplicantSearchToken
+from .phone_directory import PhoneDirectory
 
 # Import Base for database operations
 from app.db.base import Base 
\ No newline at end of file
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, String, Integer, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, String, Integer, Text, TIMESTAMP, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 #NEW MODELS WITHOUT FOREIGN KEYS
 class ApplicantDetails(Base):
     __tablename__ = "applicant_details"
+    __table_args__ = (
+        # Applications list order and its keyset cursor (first_name, last_name, payment_id)
+        Index("ix_applicant_details_name", "first_name", "last_name"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     applicant_id = Column(String(100), unique=True, index=True)
     first_name = Column(String(100))
@@ -0,0 +1,125 @@
+import re
+from sqlalchemy import Column, Integer, String, ForeignKey, event, select, delete, insert
+from sqlalchemy.orm.attributes import get_history
+from app.db.base import Base
+from app.models.applicant_details import ApplicantDetails
+from app.models.loan_details import LoanDetails
+
+TOKEN_MAX_LENGTH = 64
+
+# Relevance weight of a token by where it came from: identifiers beat name parts
+NAME_WEIGHT = 1
+IDENTIFIER_WEIGHT = 3
+
+class ApplicantSearchToken(Base):
+    """
+    Normalized search tokens per loan (applicant name parts, applicant_id, loan id and
+    mobile). The primary key doubles as the index for prefix (token LIKE 'term%') search.
+    """
+    __tablename__ = "applicant_search_token"
+    token = Column(String(TOKEN_MAX_LENGTH), primary_key=True)
+    loan_application_id = Column(
+        Integer, ForeignKey("loan_details.loan_application_id", ondelete="CASCADE"), primary_key=True
+    )
+    weight = Column(Integer, nullable=False, default=NAME_WEIGHT)
+
+def tokenize(text) -> list:
+    """Lowercase alphanumeric runs of `text`; search terms are split the same way"""
+    if text is None:
+        return []
+    return [token[:TOKEN_MAX_LENGTH] for token in re.findall(r"[0-9a-z]+", str(text).lower())]
+
+def loan_search_tokens(loan_application_id, applicant_id, first_name, middle_name, last_name, mobile) -> dict:
+    """token -> weight for one loan"""
+    tokens = {}
+
+    def add(token, weight):
+        if token:
+            tokens[token] = max(weight, tokens.get(token, 0))
+
+    for name in (first_name, middle_name, last_name):
+        for token in tokenize(name):
+            add(token, NAME_WEIGHT)
+
+    # Identifiers are also indexed without separators, so 'APP-001' and 'app001' both match
+    for identifier in (applicant_id, loan_application_id):
+        parts = tokenize(identifier)
+        for token in parts:
+            add(token, IDENTIFIER_WEIGHT)
+        add("".join(parts)[:TOKEN_MAX_LENGTH], IDENTIFIER_WEIGHT)
+
+    digits = "".join(tokenize(mobile))
+    add(digits, IDENTIFIER_WEIGHT)
+    if len(digits) > 10:
+        add(digits[-10:], IDENTIFIER_WEIGHT)  # Number without the country code
+    return tokens
+
+def refresh_applicant_search(connection, loan_ids=None) -> None:
+    """Recompute the search tokens of the given loans (all loans when loan_ids is None)"""
+    if loan_ids is not None:
+        loan_ids = [loan_id for loan_id in set(loan_ids) if loan_id is not None]
+        if not loan_ids:
+            return
+
+    delete_stmt = delete(ApplicantSearchToken)
+    source = (
+        select(
+            LoanDetails.loan_application_id,
+            LoanDetails.applicant_id,
+            ApplicantDetails.first_name,
+            ApplicantDetails.middle_name,
+            ApplicantDetails.last_name,
+            ApplicantDetails.mobile
+        )
+        .select_from(LoanDetails)
+        .outerjoin(ApplicantDetails, LoanDetails.applicant_id == ApplicantDetails.applicant_id)
+    )
+    if loan_ids is not None:
+        delete_stmt = delete_stmt.where(ApplicantSearchToken.loan_application_id.in_(loan_ids))
+        source = source.where(LoanDetails.loan_application_id.in_(loan_ids))
+    connection.execute(delete_stmt)
+
+    rows = [
+        {"token": token, "loan_application_id": row.loan_application_id, "weight": weight}
+        for row in connection.execute(source)
+        for token, weight in loan_search_tokens(*row).items()
+    ]
+    if rows:
+        connection.execute(insert(ApplicantSearchToken), rows)
+
+_SEARCHED_APPLICANT_FIELDS = ("applicant_id", "first_name", "middle_name", "last_name", "mobile")
+
+def applicant_loan_ids(connection, applicant_ids) -> list:
+    """Ids of the loans of the given applicants"""
+    applicant_ids = [applicant_id for applicant_id in applicant_ids if applicant_id is not None]
+    if not applicant_ids:
+        return []
+    return list(connection.execute(
+        select(LoanDetails.loan_application_id).where(LoanDetails.applicant_id.in_(applicant_ids))
+    ).scalars())
+
+# Keep the tokens in sync with ORM writes to loans and applicants (same transaction as the write)
+@event.listens_for(LoanDetails, "after_insert")
+@event.listens_for(LoanDetails, "after_delete")
+def _loan_inserted_or_deleted(mapper, connection, target):
+    refresh_applicant_search(connection, [target.loan_application_id])
+
+@event.listens_for(LoanDetails, "after_update")
+def _loan_updated(mapper, connection, target):
+    if get_history(target, "applicant_id").has_changes():
+        refresh_applicant_search(connection, [target.loan_application_id])
+
+@event.listens_for(ApplicantDetails, "after_insert")
+@event.listens_for(ApplicantDetails, "after_delete")
+def _applicant_inserted_or_deleted(mapper, connection, target):
+    refresh_applicant_search(connection, applicant_loan_ids(connection, [target.applicant_id]))
+
+@event.listens_for(ApplicantDetails, "after_update")
+def _applicant_updated(mapper, connection, target):
+    histories = {key: get_history(target, key) for key in _SEARCHED_APPLICANT_FIELDS}
+    if not any(history.has_changes() for history in histories.values()):
+        return
+
+    # A changed applicant_id leaves loans still pointing at the old one
+    applicant_ids = [target.applicant_id] + list(histories["applicant_id"].deleted or [])
+    refresh_applicant_search(connection, applicant_loan_ids(connection, applicant_ids))
@@ -0,0 +1,121 @@
+from sqlalchemy import Column, Integer, Text, Enum, TIMESTAMP, ForeignKey, JSON, event, func, select, insert
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import get_history
+from app.db.base import Base
+from app.models.payment_details import PaymentDetails
+from app.models.audit_payment_details import AuditActionEnum
+from datetime import date, datetime
+from decimal import Decimal
+
+class AuditOutbox(Base):
+    """
+    Write-ahead copy of an audit_payment_details entry, written in the same transaction
+    as the payment_details change and moved to the audit table by the audit writer.
+    """
+    __tablename__ = "audit_outbox"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    application_id = Column(Text)  # payment_details.id, as in audit_payment_details
+    changed_by_user_id = Column(Integer, ForeignKey("users.id"))
+    action = Column(Enum(AuditActionEnum))
+    old_data = Column(JSON)
+    new_data = Column(JSON)
+    changed_at = Column(TIMESTAMP, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+# Session.info keys: the acting user, and outbox ids written in the current transaction
+AUDIT_USER_KEY = "audit_user_id"
+PENDING_OUTBOX_KEY = "audit_outbox_ids"
+
+# Timestamps are maintained by the database and carry no business meaning
+_SNAPSHOT_COLUMNS = [
+    column.key for column in PaymentDetails.__table__.columns
+    if column.key not in ("created_at", "updated_at")
+]
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _current_values(connection, target) -> dict:
+    """Column values of `target` as flushed, reading unloaded columns from the row"""
+    loaded = target.__dict__
+    values = {key: loaded[key] for key in _SNAPSHOT_COLUMNS if key in loaded}
+    missing = [key for key in _SNAPSHOT_COLUMNS if key not in values]
+    if missing:
+        table = PaymentDetails.__table__
+        row = connection.execute(
+            select(*[table.c[key] for key in missing]).where(table.c.id == target.id)
+        ).mappings().first()
+        values.update(row or {key: None for key in missing})
+    return values
+
+def _snapshot(values: dict) -> dict:
+    return {key: _json_value(values.get(key)) for key in _SNAPSHOT_COLUMNS}
+
+def _write_outbox(connection, target, action, old_data, new_data) -> None:
+    session = object_session(target)
+    info = session.info if session is not None else {}
+
+    result = connection.execute(
+        insert(AuditOutbox).values(
+            application_id=str(target.id),
+            changed_by_user_id=info.get(AUDIT_USER_KEY),
+            action=action,
+            old_data=old_data,
+            new_data=new_data,
+            changed_at=datetime.now()
+        )
+    )
+    if session is not None:
+        session.info.setdefault(PENDING_OUTBOX_KEY, []).append(result.inserted_primary_key[0])
+
+def write_update_outbox_entries(session, changes) -> None:
+    """
+    Bulk-insert outbox rows for payment_details updates made outside the unit of work
+    (bulk UPDATE statements), given (old_values, new_values) column dicts per payment.
+    """
+    entries = []
+    changed_at = datetime.now()
+    for old_values, new_values in changes:
+        old_data, new_data = _snapshot(old_values), _snapshot(new_values)
+        if old_data == new_data:
+            continue
+        entries.append({
+            "application_id": str(old_values["id"]),
+            "changed_by_user_id": session.info.get(AUDIT_USER_KEY),
+            "action": AuditActionEnum.update,
+            "old_data": old_data,
+            "new_data": new_data,
+            "changed_at": changed_at
+        })
+    if not entries:
+        return
+
+    session.execute(insert(AuditOutbox), entries)
+    # An executemany insert doesn't report its ids, so the writer is asked to sweep instead
+    session.info.setdefault(PENDING_OUTBOX_KEY, []).append(None)
+
+# Record every ORM write to payment_details in the outbox (same transaction as the write)
+@event.listens_for(PaymentDetails, "after_insert")
+def _audit_payment_inserted(mapper, connection, target):
+    _write_outbox(connection, target, AuditActionEnum.insert, None, _snapshot(_current_values(connection, target)))
+
+@event.listens_for(PaymentDetails, "after_update")
+def _audit_payment_updated(mapper, connection, target):
+    new_values = _current_values(connection, target)
+    old_values = dict(new_values)
+    for key in _SNAPSHOT_COLUMNS:
+        history = get_history(target, key)
+        if history.deleted:
+            old_values[key] = history.deleted[0]
+
+    old_data, new_data = _snapshot(old_values), _snapshot(new_values)
+    if old_data != new_data:
+        _write_outbox(connection, target, AuditActionEnum.update, old_data, new_data)
+
+@event.listens_for(PaymentDetails, "before_delete")
+def _audit_payment_deleted(mapper, connection, target):
+    _write_outbox(connection, target, AuditActionEnum.delete, _snapshot(_current_values(connection, target)), None)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, Enum, TIMESTAMP, ForeignKey, JSON, func
+from sqlalchemy import Column, Integer, Text, Enum, TIMESTAMP, ForeignKey, JSON, Index, func
 from app.db.base import Base
 import enum
 
@@ -9,6 +9,11 @@ class AuditActionEnum(str, enum.Enum):
 
 class AuditPaymentDetails(Base):
     __tablename__ = "audit_payment_details"
+    __table_args__ = (
+        # History of one payment since a moment (plan vs achievement report)
+        Index("ix_audit_payment_details_application_changed_at", "application_id", "changed_at", mysql_length={"application_id": 32}),
+        Index("ix_audit_payment_details_changed_at", "changed_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     application_id = Column(Text)
     changed_by_user_id = Column(Integer, ForeignKey("users.id"))
@@ -1,11 +1,22 @@
-from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class Calling(Base):
     __tablename__ = "calling"
+    __table_args__ = (
+        # Latest status per (repayment, calling type, contact type); repayment_id is TEXT,
+        # so MySQL indexes a prefix of it
+        Index(
+            "ix_calling_repayment_type_contact_created",
+            "repayment_id", "Calling_id", "contact_type", "created_at",
+            mysql_length={"repayment_id": 32}
+        ),
+        Index("ix_calling_payment_type_contact_created", "payment_id", "Calling_id", "contact_type", "created_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    repayment_id = Column(Text)
+    repayment_id = Column(Text)  # Legacy text key, written alongside payment_id
+    payment_id = Column(Integer, ForeignKey("payment_details.id", ondelete="SET NULL"))
     caller_user_id = Column(Integer, ForeignKey("users.id"))
     Calling_id = Column(Integer)
     status_id = Column(Integer)
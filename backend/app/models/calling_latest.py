@@ -0,0 +1,200 @@
+from sqlalchemy import Column, Integer, TIMESTAMP, ForeignKey, event, func, select, delete, insert, and_, or_, case
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm.attributes import get_history
+from app.core.config import settings
+from app.db.base import Base
+from app.models.calling import Calling
+from app.models.payment_link import payment_key, payment_key_values, parse_payment_id
+
+class CallingLatest(Base):
+    """Projection of the latest calling row per (payment, calling type, contact type)"""
+    __tablename__ = "calling_latest"
+    payment_id = Column(Integer, ForeignKey("payment_details.id", ondelete="CASCADE"), primary_key=True)
+    Calling_id = Column(Integer, primary_key=True)  # 1 = contact calling, 2 = demand calling
+    contact_type = Column(Integer, primary_key=True)  # 1=applicant, 2=co_applicant, 3=guarantor, 4=reference
+    calling_row_id = Column(Integer, nullable=False)  # calling.id of the latest call
+    status_id = Column(Integer)
+    called_at = Column(TIMESTAMP)  # calling.created_at of the latest call
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+def latest_calling_select(payment_ids=None, key_column=Calling.payment_id):
+    """
+    SELECT the latest calling row per (payment, Calling_id, contact_type), with the
+    payment identified by key_column (payment_id, or the legacy text repayment_id)
+    """
+    ranked = select(
+        key_column.label("payment_id"),
+        Calling.Calling_id,
+        Calling.contact_type,
+        Calling.id.label("calling_row_id"),
+        Calling.status_id,
+        Calling.created_at.label("called_at"),
+        func.row_number().over(
+            partition_by=(key_column, Calling.Calling_id, Calling.contact_type),
+            order_by=(Calling.created_at.desc(), Calling.id.desc())
+        ).label("rn")
+    ).where(
+        key_column.isnot(None),
+        Calling.Calling_id.isnot(None),
+        Calling.contact_type.isnot(None)
+    )
+    if payment_ids is not None:
+        ranked = ranked.where(key_column.in_(payment_ids))
+    ranked = ranked.subquery()
+
+    return select(
+        ranked.c.payment_id, ranked.c.Calling_id, ranked.c.contact_type,
+        ranked.c.calling_row_id, ranked.c.status_id, ranked.c.called_at
+    ).where(ranked.c.rn == 1)
+
+def load_latest_calls(db, payment_ids) -> list:
+    """
+    Latest call per (payment, Calling_id, contact_type) of the given payments, as rows of
+    payment_id, Calling_id, contact_type, calling_row_id, status_id and called_at.
+    Read from calling_latest once READ_CALLING_LATEST is on (after the backfill), else
+    ranked from calling, matched on payment_key() like the other calling readers.
+    """
+    payment_ids = list(payment_ids)
+    if not payment_ids:
+        return []
+
+    if settings.READ_CALLING_LATEST:
+        ids = [payment_id for payment_id in map(parse_payment_id, payment_ids) if payment_id is not None]
+        return db.query(
+            CallingLatest.payment_id,
+            CallingLatest.Calling_id,
+            CallingLatest.contact_type,
+            CallingLatest.calling_row_id,
+            CallingLatest.status_id,
+            CallingLatest.called_at
+        ).filter(CallingLatest.payment_id.in_(ids)).all() if ids else []
+
+    return db.execute(latest_calling_select(payment_key_values(payment_ids), payment_key(Calling))).all()
+
+def latest_call(calls, calling_id: int, contact_type: int = None):
+    """The newest of the given latest-call rows for a calling type (and contact type), or None"""
+    calls = [
+        call for call in calls
+        if call.Calling_id == calling_id and (contact_type is None or call.contact_type == contact_type)
+    ]
+    return max(calls, key=lambda call: (call.called_at is not None, call.called_at, call.calling_row_id), default=None)
+
+def refresh_calling_latest(connection, payment_ids=None) -> None:
+    """Recompute the latest calls of the given payments (all payments when payment_ids is None)"""
+    if payment_ids is not None:
+        payment_ids = [payment_id for payment_id in set(payment_ids) if payment_id is not None]
+        if not payment_ids:
+            return
+
+    delete_stmt = delete(CallingLatest)
+    if payment_ids is not None:
+        delete_stmt = delete_stmt.where(CallingLatest.payment_id.in_(payment_ids))
+    connection.execute(delete_stmt)
+
+    connection.execute(
+        insert(CallingLatest).from_select(
+            ["payment_id", "Calling_id", "contact_type", "calling_row_id", "status_id", "called_at"],
+            latest_calling_select(payment_ids)
+        )
+    )
+
+_PROJECTION_KEY = ("payment_id", "Calling_id", "contact_type")
+
+def _upsert_statement(connection, rows):
+    """
+    INSERT of projection rows that, on an existing key, only replaces an older
+    (called_at, calling_row_id). None if the dialect has no upsert.
+    """
+    current = CallingLatest.__table__.c
+    dialect = connection.dialect.name
+
+    if dialect == "mysql":
+        stmt = mysql_insert(CallingLatest).values(rows)
+        new = stmt.inserted
+        newer = or_(
+            current.called_at.is_(None),
+            new.called_at > current.called_at,
+            and_(new.called_at == current.called_at, new.calling_row_id > current.calling_row_id)
+        )
+        # MySQL applies the assignments in order and later ones see earlier results, so
+        # called_at, which the guard compares first, is assigned last
+        return stmt.on_duplicate_key_update([
+            ("updated_at", case((newer, func.now()), else_=current.updated_at)),
+            ("status_id", case((newer, new.status_id), else_=current.status_id)),
+            ("calling_row_id", case((newer, new.calling_row_id), else_=current.calling_row_id)),
+            ("called_at", case((newer, new.called_at), else_=current.called_at)),
+        ])
+
+    if dialect == "sqlite":
+        stmt = sqlite_insert(CallingLatest).values(rows)
+        new = stmt.excluded
+        return stmt.on_conflict_do_update(
+            index_elements=list(_PROJECTION_KEY),
+            set_={
+                "status_id": new.status_id,
+                "calling_row_id": new.calling_row_id,
+                "called_at": new.called_at,
+                "updated_at": func.now()
+            },
+            where=or_(
+                current.called_at.is_(None),
+                new.called_at > current.called_at,
+                and_(new.called_at == current.called_at, new.calling_row_id > current.calling_row_id)
+            )
+        )
+
+    return None
+
+def record_new_calls(connection, condition) -> None:
+    """
+    Fold newly inserted calling rows (those matching `condition`) into the projection
+    with a guarded upsert. Unlike refresh_calling_latest() it reads only the new rows,
+    with a plain non-locking SELECT, so concurrent calls on one payment don't contend
+    for locks on its call history.
+    """
+    latest = {}
+    for row in connection.execute(
+        select(
+            Calling.payment_id, Calling.Calling_id, Calling.contact_type,
+            Calling.id.label("calling_row_id"), Calling.status_id, Calling.created_at.label("called_at")
+        ).where(condition)
+    ).mappings():
+        if any(row[key] is None for key in _PROJECTION_KEY):
+            continue
+        key = tuple(row[key] for key in _PROJECTION_KEY)
+        rank = (row["called_at"] is not None, row["called_at"], row["calling_row_id"])
+        if key not in latest or rank > latest[key][0]:
+            latest[key] = (rank, dict(row))
+    if not latest:
+        return
+
+    rows = [row for _, row in latest.values()]
+    stmt = _upsert_statement(connection, rows)
+    if stmt is None:
+        refresh_calling_latest(connection, [row["payment_id"] for row in rows])
+        return
+    connection.execute(stmt)
+
+# Keep the projection in sync with ORM writes to calling (same transaction as the write).
+# A new call is upserted; updates and deletes re-rank the payment's own history.
+@event.listens_for(Calling, "after_insert")
+def _calling_inserted(mapper, connection, target):
+    record_new_calls(connection, Calling.id == target.id)
+
+@event.listens_for(Calling, "after_delete")
+def _calling_deleted(mapper, connection, target):
+    refresh_calling_latest(connection, [target.payment_id])
+
+@event.listens_for(Calling, "after_update")
+def _calling_updated(mapper, connection, target):
+    histories = {
+        key: get_history(target, key)
+        for key in ("payment_id", "Calling_id", "contact_type", "status_id", "created_at")
+    }
+    if not any(history.has_changes() for history in histories.values()):
+        return
+
+    # A payment change moves the call between payments, so both sides need recomputing
+    payment_ids = [target.payment_id] + list(histories["payment_id"].deleted or [])
+    refresh_calling_latest(connection, payment_ids)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, DECIMAL, TIMESTAMP, func
+from app.db.base import Base
+
+class CollectionSummarySnapshot(Base):
+    """
+    Pre-aggregated payment_details counts and amounts per month and dimension.
+    Missing dimension ids are stored as 0 so every column can be part of the key.
+    """
+    __tablename__ = "collection_summary_snapshot"
+    demand_year = Column(Integer, primary_key=True, autoincrement=False)
+    demand_month = Column(Integer, primary_key=True, autoincrement=False)
+    branch_id = Column(Integer, primary_key=True, autoincrement=False)
+    dealer_id = Column(Integer, primary_key=True, autoincrement=False)
+    lender_id = Column(Integer, primary_key=True, autoincrement=False)
+    rm_id = Column(Integer, primary_key=True, autoincrement=False)
+    tl_id = Column(Integer, primary_key=True, autoincrement=False)
+    repayment_status_id = Column(Integer, primary_key=True, autoincrement=False)
+    payment_count = Column(Integer, nullable=False, default=0)
+    demand_amount = Column(DECIMAL(14,2), nullable=False, default=0)
+    amount_collected = Column(DECIMAL(14,2), nullable=False, default=0)
+    refreshed_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
@@ -1,11 +1,22 @@
-from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class Comments(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        # Comments of one type per repayment, newest first; repayment_id is TEXT,
+        # so MySQL indexes a prefix of it
+        Index(
+            "ix_comments_repayment_type_commented_at",
+            "repayment_id", "comment_type", "commented_at",
+            mysql_length={"repayment_id": 32}
+        ),
+        Index("ix_comments_payment_type_commented_at", "payment_id", "comment_type", "commented_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    repayment_id = Column(Text)
+    repayment_id = Column(Text)  # Legacy text key, written alongside payment_id
+    payment_id = Column(Integer, ForeignKey("payment_details.id", ondelete="SET NULL"))
     user_id = Column(Integer, ForeignKey("users.id"))
     comment = Column(Text)
     comment_type = Column(Integer, default=1)  # 1 for application details, 2 for paid pending
@@ -6,7 +6,8 @@ class Guarantor(Base):
     __tablename__ = "guarantor"
     id = Column(Integer, primary_key=True, index=True)
     loan_application_id = Column(Integer, ForeignKey("loan_details.loan_application_id"))
-    repayment_id = Column(String(55))  # Links to payment_details.id
+    repayment_id = Column(String(55))  # Links to payment_details.id (legacy text key)
+    payment_id = Column(Integer, ForeignKey("payment_details.id", ondelete="SET NULL"))  # Same link as an integer FK
     first_name = Column(String(55))
     middle_name = Column(String(55))
     last_name = Column(String(55))
@@ -0,0 +1,68 @@
+from sqlalchemy import Column, Integer, DATE, TIMESTAMP, ForeignKey, event, func, select, delete, insert
+from sqlalchemy.orm.attributes import get_history
+from app.db.base import Base
+from app.models.payment_details import PaymentDetails
+
+class LoanCurrentDemand(Base):
+    """Projection of each loan's current (latest demand_date) payment_details row"""
+    __tablename__ = "loan_current_demand"
+    loan_application_id = Column(Integer, ForeignKey("loan_details.loan_application_id"), primary_key=True)
+    payment_id = Column(Integer, ForeignKey("payment_details.id", ondelete="CASCADE"), nullable=False, unique=True)
+    demand_date = Column(DATE)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+def latest_payment_select(loan_ids=None):
+    """SELECT (loan_application_id, payment_id, demand_date) of the latest payment per loan"""
+    ranked = select(
+        PaymentDetails.loan_application_id,
+        PaymentDetails.id.label("payment_id"),
+        PaymentDetails.demand_date,
+        func.row_number().over(
+            partition_by=PaymentDetails.loan_application_id,
+            order_by=(PaymentDetails.demand_date.desc(), PaymentDetails.id.desc())
+        ).label("rn")
+    ).where(
+        PaymentDetails.loan_application_id.isnot(None),
+        PaymentDetails.demand_date.isnot(None)
+    )
+    if loan_ids is not None:
+        ranked = ranked.where(PaymentDetails.loan_application_id.in_(loan_ids))
+    ranked = ranked.subquery()
+
+    return select(ranked.c.loan_application_id, ranked.c.payment_id, ranked.c.demand_date).where(ranked.c.rn == 1)
+
+def refresh_loan_current_demand(connection, loan_ids=None) -> None:
+    """Recompute the current demand pointer for the given loans (all loans when loan_ids is None)"""
+    if loan_ids is not None:
+        loan_ids = [loan_id for loan_id in set(loan_ids) if loan_id is not None]
+        if not loan_ids:
+            return
+
+    delete_stmt = delete(LoanCurrentDemand)
+    if loan_ids is not None:
+        delete_stmt = delete_stmt.where(LoanCurrentDemand.loan_application_id.in_(loan_ids))
+    connection.execute(delete_stmt)
+
+    connection.execute(
+        insert(LoanCurrentDemand).from_select(
+            ["loan_application_id", "payment_id", "demand_date"],
+            latest_payment_select(loan_ids)
+        )
+    )
+
+# Keep the projection in sync with ORM writes to payment_details (same transaction as the write)
+@event.listens_for(PaymentDetails, "after_insert")
+@event.listens_for(PaymentDetails, "after_delete")
+def _payment_details_inserted_or_deleted(mapper, connection, target):
+    refresh_loan_current_demand(connection, [target.loan_application_id])
+
+@event.listens_for(PaymentDetails, "after_update")
+def _payment_details_updated(mapper, connection, target):
+    loan_history = get_history(target, "loan_application_id")
+    date_history = get_history(target, "demand_date")
+    if not loan_history.has_changes() and not date_history.has_changes():
+        return
+
+    # A loan change moves the row between loans, so both sides need recomputing
+    loan_ids = [target.loan_application_id] + list(loan_history.deleted or [])
+    refresh_loan_current_demand(connection, loan_ids)
@@ -1,9 +1,19 @@
-from sqlalchemy import Column, Integer, DECIMAL, DATE, String, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Integer, DECIMAL, DATE, String, TIMESTAMP, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class PaymentDetails(Base):
     __tablename__ = "payment_details"
+    __table_args__ = (
+        # Supports per-loan lookups and demand_date range filters (EMI month)
+        Index("ix_payment_details_loan_demand_date", "loan_application_id", "demand_date"),
+        # Status lists (e.g. paid pending) ordered by demand_date
+        Index("ix_payment_details_status_demand_date", "repayment_status_id", "demand_date"),
+        # PTP date filters and the plan vs achievement report
+        Index("ix_payment_details_ptp_date", "ptp_date"),
+        # Monthly summaries: covers the month filter and the per-status count
+        Index("ix_payment_details_year_month_status", "demand_year", "demand_month", "repayment_status_id"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     loan_application_id = Column(Integer, ForeignKey("loan_details.loan_application_id"))
     demand_amount = Column(DECIMAL(12,2))
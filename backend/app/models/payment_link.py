@@ -0,0 +1,64 @@
+from sqlalchemy import event, inspect
+from typing import Any, Iterable, List, Optional
+from app.core.config import settings
+from app.models.calling import Calling
+from app.models.comments import Comments
+from app.models.co_applicant import CoApplicant
+from app.models.guarantor import Guarantor
+from app.models.reference import Reference
+
+# Tables that point at payment_details.id through both the legacy text repayment_id
+# and the integer payment_id foreign key. Both are written while reads move over.
+PAYMENT_LINKED_MODELS = [Calling, Comments, CoApplicant, Guarantor, Reference]
+
+def parse_payment_id(value: Any) -> Optional[int]:
+    """Integer payment id from a repayment_id value, or None if it isn't one"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+def payment_key(model):
+    """
+    Column to match payments on: the integer payment_id once READ_PAYMENT_ID_KEYS is
+    on (after the backfill), else the legacy text repayment_id.
+    """
+    return model.payment_id if settings.READ_PAYMENT_ID_KEYS else model.repayment_id
+
+def payment_key_values(payment_ids: Iterable[Any]) -> List[Any]:
+    """Payment ids in the type payment_key() compares against; ids that aren't integers match nothing"""
+    if settings.READ_PAYMENT_ID_KEYS:
+        ids = [parse_payment_id(payment_id) for payment_id in payment_ids]
+        return [payment_id for payment_id in ids if payment_id is not None]
+    return [str(payment_id) for payment_id in payment_ids]
+
+def payment_key_filter(model, payment_ids: Iterable[Any]):
+    """WHERE clause selecting rows of `model` linked to any of `payment_ids`"""
+    return payment_key(model).in_(payment_key_values(payment_ids))
+
+def payment_link_values(payment_id: Any) -> dict:
+    """Both link columns for a Core insert, which bypasses the dual-write events"""
+    payment_id = parse_payment_id(payment_id)
+    return {
+        "payment_id": payment_id,
+        "repayment_id": str(payment_id) if payment_id is not None else None
+    }
+
+# Dual-write: whichever link column the caller set, fill in the other one
+def _sync_on_insert(mapper, connection, target):
+    if target.payment_id is None and target.repayment_id is not None:
+        target.payment_id = parse_payment_id(target.repayment_id)
+    elif target.repayment_id is None and target.payment_id is not None:
+        target.repayment_id = str(target.payment_id)
+
+def _sync_on_update(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if attrs.repayment_id.history.has_changes():
+        target.payment_id = parse_payment_id(target.repayment_id)
+    elif attrs.payment_id.history.has_changes():
+        target.repayment_id = str(target.payment_id) if target.payment_id is not None else None
+
+for _model in PAYMENT_LINKED_MODELS:
+    event.listen(_model, "before_insert", _sync_on_insert)
+    event.listen(_model, "before_update", _sync_on_update)
@@ -0,0 +1,134 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, event, select, delete, insert
+from sqlalchemy.orm.attributes import get_history
+from app.db.base import Base
+from app.models.applicant_details import ApplicantDetails
+from app.models.loan_details import LoanDetails
+from app.models.co_applicant import CoApplicant
+from app.models.guarantor import Guarantor
+from app.models.reference import Reference
+from app.models.applicant_search import applicant_loan_ids
+from app.schemas.contact_types import ContactTypeEnum
+
+# Length of a national mobile number; longer numbers carry a country or trunk prefix
+NATIONAL_NUMBER_LENGTH = 10
+
+class PhoneDirectory(Base):
+    """
+    Normalized mobile numbers of every applicant, co-applicant, guarantor and reference,
+    one row per loan they belong to. The primary key doubles as the index for lookups by number.
+    """
+    __tablename__ = "phone_directory"
+    phone = Column(String(15), primary_key=True)  # Digits only, see normalize_phone()
+    loan_application_id = Column(
+        Integer, ForeignKey("loan_details.loan_application_id", ondelete="CASCADE"), primary_key=True
+    )
+    contact_type = Column(Integer, primary_key=True)  # 1=applicant, 2=co_applicant, 3=guarantor, 4=reference
+    contact_id = Column(Integer, primary_key=True)  # id of the applicant_details / co_applicant / guarantor / reference row
+
+    __table_args__ = (
+        Index("ix_phone_directory_loan_application_id", "loan_application_id"),
+    )
+
+def normalize_phone(value) -> str:
+    """Digits of a phone number without the country code, e.g. '+91 98765-43210' -> '9876543210'"""
+    if value is None:
+        return ""
+    digits = "".join(ch for ch in str(value) if ch.isdigit())
+    return digits[-NATIONAL_NUMBER_LENGTH:]
+
+# Contact tables linked to a loan through loan_application_id
+_LOAN_CONTACT_MODELS = {
+    CoApplicant: ContactTypeEnum.co_applicant,
+    Guarantor: ContactTypeEnum.guarantor,
+    Reference: ContactTypeEnum.reference
+}
+
+def _directory_sources(loan_ids=None) -> list:
+    """(contact_type, SELECT loan_application_id, contact_id, mobile) for each contact table"""
+    applicants = (
+        select(LoanDetails.loan_application_id, ApplicantDetails.id, ApplicantDetails.mobile)
+        .join(ApplicantDetails, LoanDetails.applicant_id == ApplicantDetails.applicant_id)
+    )
+    sources = [(ContactTypeEnum.applicant, applicants, LoanDetails.loan_application_id)]
+    for model, contact_type in _LOAN_CONTACT_MODELS.items():
+        sources.append((
+            contact_type,
+            select(model.loan_application_id, model.id, model.mobile).where(model.loan_application_id.isnot(None)),
+            model.loan_application_id
+        ))
+
+    if loan_ids is None:
+        return [(contact_type, source) for contact_type, source, _ in sources]
+    return [(contact_type, source.where(loan_column.in_(loan_ids))) for contact_type, source, loan_column in sources]
+
+def refresh_phone_directory(connection, loan_ids=None) -> None:
+    """Recompute the directory entries of the given loans (all loans when loan_ids is None)"""
+    if loan_ids is not None:
+        loan_ids = [loan_id for loan_id in set(loan_ids) if loan_id is not None]
+        if not loan_ids:
+            return
+
+    delete_stmt = delete(PhoneDirectory)
+    if loan_ids is not None:
+        delete_stmt = delete_stmt.where(PhoneDirectory.loan_application_id.in_(loan_ids))
+    connection.execute(delete_stmt)
+
+    rows = {}
+    for contact_type, source in _directory_sources(loan_ids):
+        for loan_id, contact_id, mobile in connection.execute(source):
+            phone = normalize_phone(mobile)
+            if phone:
+                key = (phone, loan_id, int(contact_type), contact_id)
+                rows[key] = dict(zip(("phone", "loan_application_id", "contact_type", "contact_id"), key))
+    if rows:
+        connection.execute(insert(PhoneDirectory), list(rows.values()))
+
+# Keep the directory in sync with ORM writes to loans and contacts (same transaction as the write)
+@event.listens_for(LoanDetails, "after_insert")
+@event.listens_for(LoanDetails, "after_delete")
+def _loan_inserted_or_deleted(mapper, connection, target):
+    refresh_phone_directory(connection, [target.loan_application_id])
+
+@event.listens_for(LoanDetails, "after_update")
+def _loan_updated(mapper, connection, target):
+    if get_history(target, "applicant_id").has_changes():
+        refresh_phone_directory(connection, [target.loan_application_id])
+
+@event.listens_for(ApplicantDetails, "after_insert")
+@event.listens_for(ApplicantDetails, "after_delete")
+def _applicant_inserted_or_deleted(mapper, connection, target):
+    refresh_phone_directory(connection, applicant_loan_ids(connection, [target.applicant_id]))
+
+@event.listens_for(ApplicantDetails, "after_update")
+def _applicant_updated(mapper, connection, target):
+    applicant_id_history = get_history(target, "applicant_id")
+    if not (applicant_id_history.has_changes() or get_history(target, "mobile").has_changes()):
+        return
+
+    # A changed applicant_id leaves loans still pointing at the old one
+    applicant_ids = [target.applicant_id] + list(applicant_id_history.deleted or [])
+    refresh_phone_directory(connection, applicant_loan_ids(connection, applicant_ids))
+
+def _contact_inserted_or_deleted(mapper, connection, target):
+    refresh_phone_directory(connection, [target.loan_application_id])
+
+def _contact_updated(mapper, connection, target):
+    loan_history = get_history(target, "loan_application_id")
+    if not (loan_history.has_changes() or get_history(target, "mobile").has_changes()):
+        return
+
+    # A contact moved to another loan leaves the old loan's entry behind
+    refresh_phone_directory(connection, [target.loan_application_id] + list(loan_history.deleted or []))
+
+def _load_replaced_value(target, value, oldvalue, initiator):
+    pass
+
+for _model in _LOAN_CONTACT_MODELS:
+    event.listen(_model, "after_insert", _contact_inserted_or_deleted)
+    event.listen(_model, "after_delete", _contact_inserted_or_deleted)
+    event.listen(_model, "after_update", _contact_updated)
+
+# Setting these on an object expired by a commit would otherwise not load the value being
+# replaced, and the hooks above would miss the loans a contact or applicant moved away from
+for _attribute in [ApplicantDetails.applicant_id] + [model.loan_application_id for model in _LOAN_CONTACT_MODELS]:
+    event.listen(_attribute, "set", _load_replaced_value, active_history=True)
@@ -43,8 +43,11 @@ class ApplicationFilters(BaseModel):
     repayment_id: Optional[str] = ""  # 🎯 ADDED! Filter by repayment_id
     offset: Optional[int] = 0
     limit: Optional[int] = 20
+    cursor: Optional[str] = ""
+    include_total: Optional[bool] = True
 
 class AppplicationFilterResponse(BaseModel):
-    total: int
+    total: Optional[int] = None  # None when the count was skipped (include_total=false)
     results: List[ApplicationItem]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to fetch the next page
     
\ No newline at end of file
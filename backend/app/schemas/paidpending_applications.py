@@ -16,5 +16,6 @@ class PaidPendingApplication(BaseModel):
     comments: List[str] = []
 
 class PaidPendingApplicationsResponse(BaseModel):
-    total: int
+    total: Optional[int]  # None when the count was skipped (include_total=false)
     results: List[PaidPendingApplication]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to fetch the next page
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from enum import Enum
 
 class ApprovalActionEnum(str, Enum):
@@ -22,3 +22,24 @@ class PaidPendingApprovalResponse(BaseModel):
     message: str
     updated_at: str
     comments: Optional[str] = None
+
+
+class PaidPendingBulkApprovalRequest(BaseModel):
+    items: List[PaidPendingApprovalRequest] = Field(..., min_length=1, max_length=1000)
+
+class PaidPendingBulkApprovalItemResult(BaseModel):
+    index: int  # Position of the item in the request
+    loan_id: str
+    repayment_id: str
+    action: str
+    success: bool
+    previous_status: Optional[str] = None
+    new_status: Optional[str] = None
+    message: str
+    comments: Optional[str] = None
+
+class PaidPendingBulkApprovalResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[PaidPendingBulkApprovalItemResult]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Union
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
 from datetime import date
 from enum import Enum
 from app.schemas.contact_types import ContactTypeEnum
@@ -42,3 +42,21 @@ class StatusManagementResponse(BaseModel):
     contact_type: Optional[int] = None
     message: str
     updated_at: str
+
+
+class StatusManagementBulkRequest(BaseModel):
+    items: List[StatusManagementUpdate] = Field(..., min_length=1, max_length=5000)
+
+class StatusManagementBulkItemResult(BaseModel):
+    index: int  # Position of the item in the request
+    loan_id: str
+    repayment_id: Optional[str] = None
+    success: bool
+    updated_fields: List[str] = []
+    message: str
+
+class StatusManagementBulkResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[StatusManagementBulkItemResult]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class SummaryStatusRequest(BaseModel):
     emi_month: Optional[str] = None
@@ -21,4 +21,10 @@ class SummaryStatusResponse(BaseModel):
     paid: int
     foreclose: int
     paid_pending_approval: int
-    paid_rejected: int 
\ No newline at end of file
+    paid_rejected: int
+
+class SummaryStatusMonth(SummaryStatusResponse):
+    emi_month: str  # Format: "Jul-25"
+
+class SummaryStatusByMonthResponse(BaseModel):
+    months: List[SummaryStatusMonth]
@@ -0,0 +1,174 @@
+import logging
+import queue
+import threading
+import time
+from typing import List, Optional
+from sqlalchemy import event, select, delete, insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.audit_outbox import AuditOutbox, AUDIT_USER_KEY, PENDING_OUTBOX_KEY
+from app.models.audit_payment_details import AuditPaymentDetails
+
+logger = logging.getLogger(__name__)
+
+_AUDIT_COLUMNS = ["application_id", "changed_by_user_id", "action", "old_data", "new_data", "changed_at"]
+
+def set_audit_user(db: Session, user_id: Optional[int]) -> None:
+    """Record who is changing payment_details through this session"""
+    db.info[AUDIT_USER_KEY] = user_id
+
+def move_outbox_entries(db: Session, outbox_ids: Optional[List[int]] = None, limit: int = 500) -> int:
+    """
+    Copy outbox entries into audit_payment_details and delete them, in one transaction.
+    Takes the given ids, or the oldest `limit` entries when outbox_ids is None. Rows
+    locked by another worker are skipped, so concurrent writers don't double-insert.
+    """
+    query = select(AuditOutbox.id).order_by(AuditOutbox.id).with_for_update(skip_locked=True)
+    if outbox_ids is not None:
+        if not outbox_ids:
+            return 0
+        query = query.where(AuditOutbox.id.in_(outbox_ids))
+    else:
+        query = query.limit(limit)
+
+    ids = db.execute(query).scalars().all()
+    if not ids:
+        db.commit()
+        return 0
+
+    db.execute(
+        insert(AuditPaymentDetails).from_select(
+            _AUDIT_COLUMNS,
+            select(*[getattr(AuditOutbox, column) for column in _AUDIT_COLUMNS])
+            .where(AuditOutbox.id.in_(ids))
+            .order_by(AuditOutbox.id)
+        )
+    )
+    db.execute(delete(AuditOutbox).where(AuditOutbox.id.in_(ids)))
+    db.commit()
+    return len(ids)
+
+class AuditWriter:
+    """
+    Background thread that moves committed outbox entries to audit_payment_details in
+    bulk. Ids arrive through an in-process queue right after commit; a periodic sweep
+    of the outbox table picks up anything the queue missed (e.g. after a restart), so
+    every entry is delivered at least once.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, sweep_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sweep_interval = sweep_interval
+        self._queue: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def enqueue(self, outbox_ids: List[Optional[int]]) -> None:
+        """Queue committed outbox ids; None stands for entries of unknown id and triggers a sweep"""
+        if self.running:
+            for outbox_id in outbox_ids:
+                self._queue.put(outbox_id)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the thread after it has flushed everything still queued"""
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self.running,
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "failures": self.failures
+            }
+
+    def _drain(self, first: Optional[int]) -> List[Optional[int]]:
+        """`first` plus whatever else is queued, up to batch_size"""
+        ids = [first]
+        while len(ids) < self.batch_size:
+            try:
+                ids.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return ids
+
+    def _flush(self, outbox_ids: Optional[List[int]]) -> int:
+        db = SessionLocal()
+        try:
+            moved = move_outbox_entries(db, outbox_ids, limit=self.batch_size)
+            with self._lock:
+                self.written += moved
+            return moved
+        except Exception:
+            # Entries stay in the outbox and are picked up by the next sweep
+            db.rollback()
+            with self._lock:
+                self.failures += 1
+            logger.exception("Failed to move audit outbox entries")
+            return 0
+        finally:
+            db.close()
+
+    def _sweep(self) -> None:
+        """Move everything left in the outbox, one batch at a time"""
+        while self._flush(None) >= self.batch_size:
+            pass
+
+    def _run(self) -> None:
+        next_sweep = time.monotonic()  # Sweep first: entries left behind by a previous process
+        while not self._stop.is_set():
+            if time.monotonic() >= next_sweep:
+                self._sweep()
+                next_sweep = time.monotonic() + self.sweep_interval
+
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            # Everything queued meanwhile goes into the same bulk insert
+            self._flush_queued(self._drain(first))
+
+        # Shutting down: flush what is still queued
+        while not self._queue.empty():
+            self._flush_queued(self._drain(self._queue.get_nowait()))
+
+    def _flush_queued(self, queued: List[Optional[int]]) -> None:
+        self._flush([outbox_id for outbox_id in queued if outbox_id is not None])
+        if None in queued:
+            self._sweep()
+
+audit_writer = AuditWriter(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    sweep_interval=settings.AUDIT_SWEEP_INTERVAL_SECONDS
+)
+
+# Hand outbox ids to the writer only once their transaction has committed
+@event.listens_for(Session, "after_commit")
+def _enqueue_committed_outbox(session):
+    outbox_ids = session.info.pop(PENDING_OUTBOX_KEY, None)
+    if outbox_ids:
+        audit_writer.enqueue(outbox_ids)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_outbox(session):
+    session.info.pop(PENDING_OUTBOX_KEY, None)
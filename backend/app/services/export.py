@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# (header, ApplicationItem key) in export column order
+APPLICATION_EXPORT_COLUMNS = [
+    ("Application ID", "application_id"),
+    ("Loan ID", "loan_id"),
+    ("Repayment ID", "payment_id"),
+    ("Repayment Number", "demand_num"),
+    ("Applicant Name", "applicant_name"),
+    ("EMI Amount", "emi_amount"),
+    ("Status", "status"),
+    ("EMI Month", "emi_month"),
+    ("Branch", "branch"),
+    ("RM", "rm_name"),
+    ("Team Lead", "tl_name"),
+    ("Dealer", "dealer"),
+    ("Lender", "lender"),
+    ("PTP Date", "ptp_date"),
+    ("Applicant Calling Status", "calling_statuses.applicant"),
+    ("Co-Applicant Calling Status", "calling_statuses.co_applicant"),
+    ("Guarantor Calling Status", "calling_statuses.guarantor"),
+    ("Reference Calling Status", "calling_statuses.reference"),
+    ("Demand Calling Status", "demand_calling_status"),
+    ("Payment Mode", "payment_mode"),
+    ("Amount Collected", "amount_collected"),
+    ("Loan Amount", "loan_amount"),
+    ("Disbursement Date", "disbursement_date"),
+    ("House Ownership", "house_ownership"),
+    ("Comments", "comments"),
+]
+
+def _export_value(item: Dict[str, Any], key: str) -> Any:
+    value: Any = item
+    for part in key.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    if isinstance(value, list):
+        return " | ".join(str(v) for v in value)
+    if hasattr(value, "value"):  # Enum-typed columns
+        return value.value
+    return value
+
+def application_export_row(item: Dict[str, Any]) -> List[Any]:
+    """Flatten one ApplicationItem payload into export column order"""
+    return [_export_value(item, key) for _, key in APPLICATION_EXPORT_COLUMNS]
+
+def iter_csv(items: Iterable[Dict[str, Any]], columns: List[Tuple[str, str]], chunk_rows: int = 500) -> Iterator[str]:
+    """Yield CSV text for (header, key) `columns` in chunks of `chunk_rows` rows, starting with the header"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in columns])
+
+    pending = 0
+    for item in items:
+        writer.writerow([_export_value(item, key) for _, key in columns])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+
+    yield buffer.getvalue()
+
+def iter_applications_csv(items: Iterable[Dict[str, Any]], chunk_rows: int = 500) -> Iterator[str]:
+    """Yield the applications export as CSV text in chunks of `chunk_rows` rows"""
+    return iter_csv(items, APPLICATION_EXPORT_COLUMNS, chunk_rows)
+
+def iter_json_lines(items: Iterable[Dict[str, Any]], chunk_rows: int = 500) -> Iterator[str]:
+    """Yield items as JSON lines (one object per line) in chunks of `chunk_rows` rows"""
+    lines = []
+    for item in items:
+        lines.append(json.dumps(item, default=str))
+        if len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+def write_applications_xlsx(items: Iterable[Dict[str, Any]], fileobj) -> None:
+    """
+    Write items to `fileobj` as an XLSX workbook. Uses openpyxl's write-only mode so
+    rows are flushed to disk as they are written. Raises ImportError without openpyxl.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Applications")
+    sheet.append([header for header, _ in APPLICATION_EXPORT_COLUMNS])
+    for item in items:
+        sheet.append(application_export_row(item))
+    workbook.save(fileobj)
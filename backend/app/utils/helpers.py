@@ -1 +1,44 @@
-# Placeholder for helper functions 
\ No newline at end of file
+import base64
+import json
+from typing import Any, List, Sequence
+from sqlalchemy import and_, or_, false
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor token"""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor token created by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """
+    Build a WHERE clause selecting rows that sort strictly after `values` when
+    ordered by `columns`, all ascending or all descending. NULLs are treated as
+    sorting first, which is how MySQL orders them (so last when descending).
+    """
+    column, value = columns[0], values[0]
+
+    if value is None:
+        # Ascending: every non-NULL value comes after NULL; descending: nothing does
+        after = false() if descending else column.isnot(None)
+    elif descending:
+        after = or_(column < value, column.is_(None))
+    else:
+        after = column > value
+
+    if len(columns) == 1:
+        return after
+
+    rest = keyset_after(columns[1:], values[1:], descending)
+    same = column.is_(None) if value is None else column == value
+    return or_(after, and_(same, rest))